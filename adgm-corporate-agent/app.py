@@ -1,14 +1,86 @@
 import streamlit as st
 import os
-import tempfile
-import json
 from docx.shared import RGBColor
-from modules.document_parser import DocumentParser
-from modules.document_checker import DocumentChecker
+from modules.document_parser import DOCUMENT_HANDLE, DocumentParser, paragraph_table
+from modules.document_checker import CHECKLISTS_PATH, DocumentChecker, load_checklists
+from modules.red_flag_rules import RULES_PATH, load_red_flag_rules
 from modules.comment_inserter import CommentInserter
 from modules.report_generator import ReportGenerator
+from modules.review_pipeline import reviewed_filenames
+from modules.batch_analyzer import REVIEWED_DOCUMENT, BatchAnalyzer
+from modules.resources import get_rag_system, resource_manager
+from modules.vector_store import GenerationStore
 import config
 
+@st.cache_resource(show_spinner=False)
+def live_analyzers():
+    """BatchAnalyzers built by load_components, kept outside its cache entries.
+    
+    Streamlit drops an evicted entry without closing it, so load_components
+    shuts the previous analyzer's worker pool down itself.
+    """
+    return []
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_components(checklists_mtime: float, rules_mtime: float):
+    """Load checklists and rules and build the shared components once per version.
+    
+    The mtime arguments are only part of the cache key: editing the checklist
+    or rule file changes them, which rebuilds everything on the next rerun.
+    """
+    checklists = load_checklists(CHECKLISTS_PATH)
+    rules = load_red_flag_rules(RULES_PATH)
+    analyzers = live_analyzers()
+    while analyzers:
+        analyzers.pop().close()
+    components = {
+        'checklists': checklists,
+        'parser': DocumentParser(),
+        'checker': DocumentChecker(checklists, rules),
+        'comment_inserter': CommentInserter(),
+        'report_generator': ReportGenerator(),
+        # Long-lived, so its worker pool and in-memory parse cache serve every upload
+        'batch_analyzer': BatchAnalyzer(
+            config.ANALYSIS_WORKERS or None,
+            cache_options={
+                'max_entries': config.PARSE_CACHE_MAX_ENTRIES,
+                'disk_dir': config.PARSE_CACHE_DIR,
+                'max_disk_mb': config.PARSE_CACHE_MAX_DISK_MB
+            },
+            # Comments go in where each DOCX was parsed, in the pool workers. Regulatory
+            # references are only known after analysis, so with them the app annotates
+            # and pool results are parsed a second time
+            keep_documents=config.REGULATORY_REFERENCES,
+            annotate=not config.REGULATORY_REFERENCES,
+            checklists=checklists,
+            rules=rules
+        )
+    }
+    analyzers.append(components['batch_analyzer'])
+    return components
+
+def regulatory_references_enabled():
+    """Whether red flags get ADGM references: configured on and a vector store has been built"""
+    return config.REGULATORY_REFERENCES and GenerationStore(config.VECTOR_STORE_PATH).current_dir() is not None
+
+def attach_regulatory_context(documents, k=2):
+    """Attach ADGM reference URLs to every red flag using one batched RAG search"""
+    flags = [flag for doc in documents for flag in doc.get('red_flags', [])
+             if flag.get('type') != 'document_error']
+    if not flags:
+        return
+    
+    def flag_query(flag):
+        return f"ADGM {flag.get('message', '')}. {flag.get('suggestion', '')}"
+    
+    # Identical flags across documents share one query
+    queries = list(dict.fromkeys(flag_query(flag) for flag in flags))
+    results = dict(zip(queries, get_rag_system().search_batch(queries, k)))
+    
+    for flag in flags:
+        urls = [result['metadata'].get('url') for result in results.get(flag_query(flag), [])]
+        flag['references'] = [url for url in dict.fromkeys(urls) if url]
+
 def main():
     """Main application function"""
     # Set page config
@@ -32,25 +104,30 @@ def main():
     st.title("⚖️ ADGM Corporate Agent")
     st.subheader("AI-Powered Legal Document Review & Compliance Checker")
     
-    # Load process checklists
-    try:
-        with open('templates/checklists.json', 'r') as f:
-            checklists = json.load(f)
-    except Exception as e:
-        st.error(f"Error loading process checklists: {e}")
-        st.stop()
-    
-    # Initialize components with error handling
+    # Load process checklists and components (cached across reruns and sessions)
     try:
-        parser = DocumentParser()
-        checker = DocumentChecker()
-        comment_inserter = CommentInserter()
-        report_generator = ReportGenerator()
+        components = load_components(os.path.getmtime(CHECKLISTS_PATH), os.path.getmtime(RULES_PATH))
+        checklists = components['checklists']
+        parser = components['parser']
+        checker = components['checker']
+        comment_inserter = components['comment_inserter']
+        report_generator = components['report_generator']
+        batch_analyzer = components['batch_analyzer']
         st.success("✅ All components initialized successfully")
     except Exception as e:
         st.error(f"❌ Error initializing components: {e}")
         st.stop()
     
+    # Only the regulatory lookup needs the embedding model; start loading it
+    # in the background so the first analysis does not wait for it
+    references_enabled = regulatory_references_enabled()
+    if references_enabled:
+        resource_manager.warm_up()
+        load_times = resource_manager.stats()['load_times']
+        if load_times:
+            st.caption("Regulatory index loaded: " +
+                       ", ".join(f"{name} {seconds:.1f}s" for name, seconds in load_times.items()))
+    
     # Process Selection Section
     st.header("🎯 Select ADGM Process Type")
     
@@ -151,29 +228,25 @@ def main():
         if st.button("🔍 Analyze Documents", type="primary"):
             with st.spinner(f"🔄 Analyzing {process_info['name']} documents..."):
                 try:
-                    # Process documents with selected process context
-                    documents = []
-                    temp_files = []
-                    
                     # Progress bar
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
-                    for i, uploaded_file in enumerate(uploaded_files):
-                        status_text.text(f"Processing {uploaded_file.name}...")
-                        progress_bar.progress((i + 1) / len(uploaded_files))
-                        
-                        # Save uploaded file temporarily
-                        file_extension = os.path.splitext(uploaded_file.name)[1]
-                        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
-                        temp_file.write(uploaded_file.read())
-                        temp_file.close()
-                        temp_files.append(temp_file.name)
-                        
-                        # Parse document
-                        doc_analysis = parser.parse_document(temp_file.name)
-                        doc_analysis['filename'] = uploaded_file.name
-                        documents.append(doc_analysis)
+                    # Uploads stay in memory end to end; nothing is written to disk
+                    file_contents = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+                    
+                    # Parse documents and detect red flags in parallel, advancing
+                    # the progress bar as each document actually completes
+                    status_text.text("Parsing documents and detecting red flags...")
+                    documents = [None] * len(uploaded_files)
+                    results = batch_analyzer.analyze(
+                        file_contents,
+                        filenames=[uploaded_file.name for uploaded_file in uploaded_files]
+                    )
+                    for completed, (index, doc_analysis) in enumerate(results, 1):
+                        documents[index] = doc_analysis
+                        status_text.text(f"Processed {doc_analysis['filename']}")
+                        progress_bar.progress(completed / len(uploaded_files))
                     
                     status_text.text("Checking completeness against selected process...")
                     
@@ -187,20 +260,18 @@ def main():
                     # Use selected process for completeness checking
                     completeness = checker.check_completeness(valid_documents, selected_process)
                     
-                    status_text.text("Detecting red flags and compliance issues...")
+                    # Point out when the uploads fit another process better than the selected one
+                    suggestions = checker.suggest_processes(valid_documents, top_n=len(checklists))
+                    scores = {suggestion['process']: suggestion['score'] for suggestion in suggestions}
+                    if suggestions and suggestions[0]['score'] > scores.get(selected_process, 0):
+                        st.info(f"💡 The uploaded documents look more like a **{suggestions[0]['name']}** package")
                     
-                    # Detect red flags for each document
-                    for i, doc in enumerate(documents):
-                        if 'error' not in doc:
-                            red_flags = checker.detect_red_flags(doc)
-                            documents[i]['red_flags'] = red_flags
-                        else:
-                            documents[i]['red_flags'] = [{
-                                'type': 'document_error',
-                                'severity': 'high',
-                                'message': doc.get('error', 'Unknown error'),
-                                'suggestion': 'Please check the document format and try again'
-                            }]
+                    if references_enabled:
+                        status_text.text("Looking up ADGM regulatory references...")
+                        try:
+                            attach_regulatory_context(documents)
+                        except Exception as e:
+                            st.warning(f"Could not look up regulatory references: {e}")
                     
                     # Clear progress indicators
                     progress_bar.empty()
@@ -210,20 +281,12 @@ def main():
                     display_results(documents, completeness, selected_process, process_info)
                     
                     # Generate reports and modified documents
-                    generate_outputs(documents, completeness, temp_files, 
+                    generate_outputs(documents, completeness, file_contents, 
                                    comment_inserter, report_generator, uploaded_files, process_info)
                     
                 except Exception as e:
                     st.error(f"❌ Error during analysis: {e}")
                     st.info("Please check your files and try again.")
-                finally:
-                    # Cleanup temp files
-                    for temp_file in temp_files:
-                        try:
-                            if os.path.exists(temp_file):
-                                os.unlink(temp_file)
-                        except Exception as e:
-                            st.warning(f"Could not delete temporary file: {e}")
     else:
         # Show process-specific examples when no files uploaded
         st.info(f"👆 Please upload your {process_info['name']} documents to get started")
@@ -362,17 +425,28 @@ def display_results(documents, completeness, process_key, process_info):
                             severity = flag.get('severity', 'medium').upper()
                             severity_icon = "🔴" if severity == "HIGH" else "🟡" if severity == "MEDIUM" else "🟢"
                             
-                            st.write(f"{severity_icon} **{severity}:** {flag.get('message', 'No message')}")
+                            # DOCX flags point at a Word paragraph, PDF flags at a line of extracted text
+                            unit = 'line' if doc['filename'].lower().endswith('.pdf') else 'paragraph'
+                            location = (f" *({unit} {flag['paragraph_index'] + 1})*"
+                                        if flag.get('paragraph_index') is not None else '')
+                            st.write(f"{severity_icon} **{severity}:** {flag.get('message', 'No message')}{location}")
                             if flag.get('suggestion'):
                                 st.write(f"   💡 *Suggestion: {flag['suggestion']}*")
+                            if flag.get('references'):
+                                st.write(f"   📚 *ADGM references: {', '.join(flag['references'])}*")
                     else:
                         st.success("✅ No major issues detected")
 
-def generate_outputs(documents, completeness, temp_files, comment_inserter, 
+def generate_outputs(documents, completeness, file_contents, comment_inserter, 
                     report_generator, uploaded_files, process_info):
     """Generate output files with process context"""
     st.header("📤 Download Results")
     
+    # Take the parsed Documents out of every analysis: the report must not see
+    # them and none should outlive this run
+    document_handles = [doc.pop(DOCUMENT_HANDLE, None) for doc in documents]
+    reviewed_documents = [doc.pop(REVIEWED_DOCUMENT, None) for doc in documents]
+    
     # Enhanced analysis results with process context
     analysis_results = {
         'process': completeness.get('process', 'unknown'),
@@ -395,7 +469,7 @@ def generate_outputs(documents, completeness, temp_files, comment_inserter,
             st.subheader("📋 Analysis Report")
             st.download_button(
                 label=f"📊 Download {process_info['name']} Report",
-                data=json.dumps(report, indent=2),
+                data=report_generator.report_bytes(report),
                 file_name=f"adgm_{completeness.get('process', 'unknown')}_analysis_report.json",
                 mime="application/json",
                 help=f"Download detailed analysis report for {process_info['name']} process"
@@ -411,37 +485,38 @@ def generate_outputs(documents, completeness, temp_files, comment_inserter,
             documents_with_issues = [doc for doc in documents if doc.get('red_flags') and 'error' not in doc]
             
             if documents_with_issues:
-                for i, (doc, temp_file, uploaded_file) in enumerate(zip(documents, temp_files, uploaded_files)):
+                # Numbered where several uploads share a name, so no download replaces another
+                output_names = reviewed_filenames([uploaded_file.name for uploaded_file in uploaded_files])
+                for i, (doc, file_content, uploaded_file) in enumerate(zip(documents, file_contents, uploaded_files)):
                     red_flags = doc.get('red_flags', [])
                     if red_flags and 'error' not in doc:
                         try:
+                            output_name = output_names[i]
                             # Determine output file extension
                             file_extension = os.path.splitext(uploaded_file.name)[1].lower()
                             if file_extension == '.pdf':
-                                output_path = f"reviewed_{os.path.splitext(uploaded_file.name)[0]}_report.docx"
                                 label_text = f"📄 {uploaded_file.name} (Review Report)"
                             else:
-                                output_path = f"reviewed_{uploaded_file.name}"
                                 label_text = f"📄 {uploaded_file.name} (Reviewed)"
                             
-                            # Create reviewed document
-                            result_path = comment_inserter.add_comments_to_document(temp_file, red_flags, output_path)
+                            # Annotated during analysis, or now, reusing the Document
+                            # parsed during analysis when it is available
+                            reviewed_content = reviewed_documents[i]
+                            if reviewed_content is None:
+                                reviewed_content = comment_inserter.review_document_bytes(
+                                    file_content, uploaded_file.name, red_flags, document_handles[i],
+                                    paragraph_table(doc))
                             
-                            if result_path and os.path.exists(result_path):
-                                # Read the reviewed document
-                                with open(result_path, 'rb') as f:
-                                    reviewed_content = f.read()
-                                
+                            if reviewed_content is not None:
                                 st.download_button(
                                     label=label_text,
                                     data=reviewed_content,
-                                    file_name=os.path.basename(output_path),
+                                    file_name=output_name,
                                     mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                    help=f"Download review for {uploaded_file.name} with inline comments and suggestions"
+                                    help=f"Download review for {uploaded_file.name} with inline comments and suggestions",
+                                    # Uploads may share a name; the position keeps the buttons apart
+                                    key=f"reviewed_document_{i}"
                                 )
-                                
-                                # Cleanup
-                                os.unlink(result_path)
                             else:
                                 st.error(f"Could not create reviewed version of {uploaded_file.name}")
                                 
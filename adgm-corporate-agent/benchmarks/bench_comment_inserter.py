@@ -0,0 +1,78 @@
+# benchmarks/bench_comment_inserter.py
+"""Time to anchor native Word comments as the number of red flags grows.
+
+Builds a synthetic DOCX (about 12 paragraphs of three runs per page), parses
+it once, then times CommentInserter on flags with random content spans.
+
+Usage: python benchmarks/bench_comment_inserter.py [--pages 200] [--flags 10 100 1000]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from modules.comment_inserter import CommentInserter
+from modules.document_parser import DocumentParser
+
+FILLER = (
+    "the company shall maintain its registered office within abu dhabi global market "
+    "and the directors may exercise all powers subject to these articles"
+).split()
+
+
+def make_document(pages, seed=0):
+    """Return DOCX bytes with roughly 12 three-run paragraphs per page"""
+    rng = random.Random(seed)
+    doc = Document()
+    for _ in range(pages * 12):
+        paragraph = doc.add_paragraph()
+        for _ in range(3):
+            paragraph.add_run(' '.join(rng.choice(FILLER) for _ in range(10)) + ' ')
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=200)
+    arg_parser.add_argument('--flags', type=int, nargs='+', default=[10, 100, 1000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    data = make_document(args.pages)
+    parser = DocumentParser()
+    inserter = CommentInserter()
+    content = parser.parse_bytes(data, 'bench.docx')['content']
+    rng = random.Random(1)
+    print(f"{args.pages} pages, {len(data) / 1024:.0f} KB, {len(content)} characters")
+
+    print(f"{'flags':>6} {'reparse ms':>11} {'reuse ms':>9}")
+    for n_flags in args.flags:
+        flags = []
+        for _ in range(n_flags):
+            start = rng.randrange(len(content) - 20)
+            flags.append({'severity': 'medium', 'message': 'Benchmark flag', 'span': [start, start + 20]})
+
+        reparse, reuse = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            inserter.review_document_bytes(data, 'bench.docx', flags)
+            reparse.append(time.perf_counter() - start)
+
+            # Handle from the analysis parse, as the review pipeline passes it on
+            document = parser.parse_bytes(data, 'bench.docx', keep_document=True)['document_handle']
+            start = time.perf_counter()
+            inserter.review_document_bytes(data, 'bench.docx', flags, document)
+            reuse.append(time.perf_counter() - start)
+        print(f"{n_flags:>6} {min(reparse) * 1000:>11.1f} {min(reuse) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_document_type.py
+"""Compare per-keyword str.count scoring with the compiled single-pass matcher.
+
+Usage: python benchmarks/bench_document_type.py [--pages N] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.document_parser import DocumentParser
+from modules.keyword_matcher import KeywordMatcher, ahocorasick
+
+FILLER = (
+    "the parties agree that the company shall comply with all applicable laws "
+    "and regulations in force from time to time including any amendment thereto"
+).split()
+
+
+def legacy_scores(document_types, content):
+    """Scoring as implemented before the compiled matcher (one scan per keyword)"""
+    content_lower = content.lower()
+    scores = {}
+    for doc_type, keywords in document_types.items():
+        score = 0
+        for keyword in keywords:
+            count = content_lower.count(keyword.lower())
+            score += count * len(keyword.split())
+        scores[doc_type] = score
+    return scores
+
+
+def matcher_scores(document_types, matcher, content):
+    """Scoring from a single pass of the compiled matcher"""
+    keyword_counts = matcher.count(content.lower())
+    return {
+        doc_type: sum(keyword_counts[k.lower()] * len(k.split()) for k in keywords)
+        for doc_type, keywords in document_types.items()
+    }
+
+
+def make_document(document_types, pages, seed=42):
+    """Build a synthetic document of roughly 3 KB per page with scattered keywords"""
+    rng = random.Random(seed)
+    keywords = [k for ks in document_types.values() for k in ks]
+    words = []
+    length = 0
+    while length < pages * 3000:
+        if rng.random() < 0.02:
+            words.append(rng.choice(keywords).title())
+        else:
+            words.append(rng.choice(FILLER))
+        length += len(words[-1]) + 1
+    return ' '.join(words)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100, 300])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    document_types = DocumentParser().document_types
+    all_keywords = [k.lower() for ks in document_types.values() for k in ks]
+    backends = ['regex'] + (['automaton'] if ahocorasick is not None else [])
+    matchers = {backend: KeywordMatcher(all_keywords, backend=backend) for backend in backends}
+
+    print(f"{'pages':>6} {'chars':>10} {'legacy ms':>10} " + ' '.join(f"{b + ' ms':>13}" for b in backends))
+    for pages in args.pages:
+        content = make_document(document_types, pages)
+        expected = legacy_scores(document_types, content)
+        for backend, matcher in matchers.items():
+            actual = matcher_scores(document_types, matcher, content)
+            assert actual == expected, f"{backend} scores differ from legacy scoring"
+
+        legacy_time = best_of(args.repeat, lambda: legacy_scores(document_types, content))
+        backend_times = [
+            best_of(args.repeat, lambda m=matcher: matcher_scores(document_types, m, content))
+            for matcher in matchers.values()
+        ]
+        print(f"{pages:>6} {len(content):>10} {legacy_time * 1000:>10.2f} "
+              + ' '.join(f"{t * 1000:>13.2f}" for t in backend_times))
+
+
+if __name__ == "__main__":
+    main()
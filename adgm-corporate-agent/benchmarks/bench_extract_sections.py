@@ -0,0 +1,132 @@
+# benchmarks/bench_extract_sections.py
+"""Benchmark section extraction on synthetic ~1 MB documents.
+
+Compares the previous per-pattern re.search implementation with the merged,
+bounded single-pass extraction in DocumentParser.extract_sections.
+
+Usage: python benchmarks/bench_extract_sections.py [--size BYTES] [--repeat N]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.document_parser import DocumentParser
+
+LEGACY_PATTERNS = {
+    'company_name': [
+        r'company name[:\s]+(.*?)(?:\n|\.)',
+        r'name of the company[:\s]+(.*?)(?:\n|\.)',
+        r'proposed company name[:\s]+(.*?)(?:\n|\.)'
+    ],
+    'jurisdiction': [
+        r'jurisdiction[:\s]+(.*?)(?:\n|\.)',
+        r'governing law[:\s]+(.*?)(?:\n|\.)',
+        r'courts?[:\s]+(.*?)(?:\n|\.)'
+    ],
+    'registered_office': [
+        r'registered office[:\s]+(.*?)(?:\n|\.)',
+        r'office address[:\s]+(.*?)(?:\n|\.)'
+    ],
+    'share_capital': [
+        r'share capital[:\s]+(.*?)(?:\n|\.)',
+        r'capital[:\s]+(.*?)(?:\n|\.)',
+        r'nominal value[:\s]+(.*?)(?:\n|\.)'
+    ],
+    'directors': [
+        r'director[s]?[:\s]+(.*?)(?:\n|\.)',
+        r'appointment of director[s]?[:\s]+(.*?)(?:\n|\.)'
+    ]
+}
+
+FILLER = (
+    "the parties agree that the company shall comply with all applicable laws "
+    "and regulations in force from time to time including any amendment thereto"
+).split()
+
+CLAUSES = [
+    "Company name: XYZ Technologies Limited.",
+    "This agreement is subject to the jurisdiction of the ADGM Courts.",
+    "The registered office of the company is in Abu Dhabi Global Market.",
+    "The share capital of the company is AED 100,000.",
+    "The directors of the company are listed in the register."
+]
+
+
+def legacy_extract_sections(content):
+    """Section extraction as implemented before precompiled, bounded scanning"""
+    sections = {}
+    for section, pattern_list in LEGACY_PATTERNS.items():
+        for pattern in pattern_list:
+            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+            if match:
+                sections[section] = match.group(1).strip()[:200]
+                break
+    return sections
+
+
+def make_document(size, kind, seed=7):
+    """Build a synthetic document of about size characters"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        if kind == 'typical':
+            # Labelled clauses near the top, prose after
+            part = rng.choice(CLAUSES) if length < 4000 else ' '.join(rng.sample(FILLER, 12)) + '.'
+        elif kind == 'no_labels':
+            part = ' '.join(rng.sample(FILLER, 12)) + '.'
+        else:
+            # Labels everywhere, but never a '.' or newline to end a value
+            part = ' '.join(rng.sample(FILLER, 12)) + ' director: capital: court:'
+        parts.append(part)
+        length += len(part) + 1
+    return ' '.join(parts)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=1024 * 1024)
+    arg_parser.add_argument('--legacy-unterminated-size', type=int, default=32 * 1024,
+                            help='size used for the legacy run of the unterminated case, '
+                                 'which is quadratic in the document length')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    parser = DocumentParser()
+
+    print(f"{'case':<14} {'chars':>9} {'legacy ms':>11} {'compiled ms':>12}")
+    for kind in ('typical', 'no_labels', 'unterminated'):
+        content = make_document(args.size, kind)
+        compiled_time = best_of(args.repeat, lambda: parser.extract_sections(content))
+
+        if kind == 'unterminated':
+            # Run legacy on a smaller document and compare like for like
+            small = make_document(args.legacy_unterminated_size, kind)
+            legacy_time = best_of(1, lambda: legacy_extract_sections(small))
+            small_time = best_of(args.repeat, lambda: parser.extract_sections(small))
+            print(f"{kind:<14} {len(small):>9} {legacy_time * 1000:>11.2f} {small_time * 1000:>12.2f}")
+            print(f"{kind:<14} {len(content):>9} {'(skipped)':>11} {compiled_time * 1000:>12.2f}")
+            continue
+
+        expected = legacy_extract_sections(content)
+        assert parser.extract_sections(content) == expected, f"{kind}: sections differ from legacy"
+        legacy_time = best_of(args.repeat, lambda: legacy_extract_sections(content))
+        print(f"{kind:<14} {len(content):>9} {legacy_time * 1000:>11.2f} {compiled_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_red_flag_rules.py
+"""Per-document red flag check time as the declarative rule set grows.
+
+Pads templates/red_flag_rules.json with synthetic term groups and rules
+(each rule flags the absence of its own group) and times RedFlagRules.evaluate
+on documents of several sizes.
+
+Usage: python benchmarks/bench_red_flag_rules.py [--scales 1 10 100] [--pages N]
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.red_flag_rules import RULES_PATH, RedFlagRules, load_red_flag_rules
+
+FILLER = (
+    "the parties agree that the company shall comply with all applicable laws "
+    "and regulations in force from time to time including any amendment thereto"
+).split()
+
+
+def scaled_rules(rule_config, scale, terms_per_group=5, seed=0):
+    """Return a copy of rule_config with (scale - 1) times as many extra rules"""
+    rng = random.Random(seed)
+    scaled = copy.deepcopy(rule_config)
+    for i in range((scale - 1) * len(rule_config['rules'])):
+        group = f'synthetic_{i}'
+        scaled['term_groups'][group] = [f'clause {i}.{j} {rng.choice(FILLER)}' for j in range(terms_per_group)]
+        scaled['rules'].append({
+            'id': group,
+            'type': 'missing_clause',
+            'severity': 'low',
+            'absent': [group],
+            'message': f'Synthetic clause {i} appears to be missing',
+            'suggestion': 'Benchmark rule'
+        })
+    return scaled
+
+
+def make_document(pages, seed=42):
+    """Roughly 3 KB of lowercased filler per page, with a signature and an ADGM reference"""
+    rng = random.Random(seed)
+    words = [rng.choice(FILLER) for _ in range(pages * 500)]
+    return ' '.join(words + ['signed', 'under', 'adgm', 'law']).lower()
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    arg_parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    base_rules = load_red_flag_rules(os.path.join(ROOT, RULES_PATH))
+    documents = {pages: make_document(pages) for pages in args.pages}
+
+    print(f"{'rules':>6} {'terms':>7} " + ' '.join(f"{f'{p}p ms':>9}" for p in args.pages))
+    for scale in args.scales:
+        rule_config = scaled_rules(base_rules, scale)
+        rules = RedFlagRules(rule_config)
+        n_terms = sum(len(terms) for terms in rule_config['term_groups'].values())
+        timings = [
+            best_of(args.repeat, lambda d=document: rules.evaluate(d, 'articles_of_association'))
+            for document in documents.values()
+        ]
+        print(f"{len(rules.rules):>6} {n_terms:>7} " + ' '.join(f"{t * 1000:>9.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# benchmarks/bench_retrieval.py
+"""Latency and hit rate of dense, sparse (BM25) and hybrid retrieval.
+
+Builds a synthetic corpus of regulatory clauses, each tagged with a unique
+citation such as "Companies Regulations 2020 s.12", and runs two query sets:
+keyword queries (the exact citation; the hit is the chunk that cites it) and
+semantic queries (a paraphrase of a clause topic; a hit is any chunk on that
+topic). Needs sentence-transformers and the embedding model.
+
+Usage: python benchmarks/bench_retrieval.py [--chunks N] [--queries N] [--k K]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentence_transformers import SentenceTransformer
+
+from modules.bm25_index import BM25Index, build_bm25_index, reciprocal_rank_fusion
+from modules.vector_index import build_index
+
+# Clause wording per topic, and paraphrased questions that avoid most of that wording
+TOPICS = {
+    'registered_office': (
+        ["The company shall maintain a registered office within Abu Dhabi Global Market.",
+         "All notices may be served at the registered office address of the company."],
+        ["where must the business keep its official address",
+         "which location receives legal correspondence for the firm"]
+    ),
+    'share_capital': (
+        ["The authorised share capital is divided into ordinary shares of nominal value.",
+         "The company may allot further shares by ordinary resolution of the members."],
+        ["how much equity can the firm issue",
+         "can new stock be created for investors"]
+    ),
+    'directors': (
+        ["The board shall consist of not less than two directors appointed by the members.",
+         "A director may be removed by resolution before the expiry of the term of office."],
+        ["how many people must sit on the board",
+         "can a board member be dismissed early"]
+    ),
+    'jurisdiction': (
+        ["This agreement is governed by the laws of ADGM and the ADGM Courts have jurisdiction.",
+         "Any dispute shall be submitted exclusively to the courts of Abu Dhabi Global Market."],
+        ["which judges decide conflicts under the contract",
+         "what legal system applies to disagreements"]
+    ),
+    'beneficial_ownership': (
+        ["Every individual who holds more than twenty five percent is an ultimate beneficial owner.",
+         "The register of beneficial owners must be filed with the Registration Authority."],
+        ["who counts as the real owner of a company",
+         "must the controllers of the entity be disclosed"]
+    ),
+    'employment': (
+        ["The employee is entitled to annual leave and end of service gratuity under the Employment Regulations.",
+         "The probation period shall not exceed six months from the commencement date."],
+        ["how long is the trial period for new staff",
+         "what holidays do workers receive"]
+    ),
+}
+
+REGULATIONS = ['Companies Regulations', 'Employment Regulations', 'Insolvency Regulations',
+               'Commercial Licensing Regulations', 'Data Protection Regulations']
+
+FILLER = ("subject to the provisions of these articles and any applicable rules made by the "
+          "registrar from time to time in accordance with the regulations").split()
+
+
+def make_corpus(n_chunks, seed=0):
+    """Return (texts, topics, citations) for n_chunks synthetic clauses"""
+    rng = random.Random(seed)
+    texts, topics, citations = [], [], []
+    topic_names = list(TOPICS)
+    for i in range(n_chunks):
+        topic = topic_names[i % len(topic_names)]
+        citation = f"{REGULATIONS[i % len(REGULATIONS)]} {2015 + i % 10} s.{i}"
+        sentences = list(TOPICS[topic][0])
+        rng.shuffle(sentences)
+        filler = ' '.join(rng.choice(FILLER) for _ in range(rng.randint(20, 120)))
+        texts.append(f"{' '.join(sentences)} See {citation}. {filler}")
+        topics.append(topic)
+        citations.append(citation)
+    return texts, topics, citations
+
+
+def make_queries(texts, topics, citations, n_queries, seed=1):
+    """Keyword queries as (query, relevant chunk ids) and semantic queries likewise"""
+    rng = random.Random(seed)
+    keyword = []
+    for i in rng.sample(range(len(texts)), min(n_queries, len(texts))):
+        keyword.append((citations[i], {i}))
+    by_topic = {}
+    for i, topic in enumerate(topics):
+        by_topic.setdefault(topic, set()).add(i)
+    semantic = []
+    for _ in range(n_queries):
+        topic = rng.choice(list(TOPICS))
+        semantic.append((rng.choice(TOPICS[topic][1]), by_topic[topic]))
+    return keyword, semantic
+
+
+def run(search, queries, k):
+    """Return (hit rate@k, mean reciprocal rank, microseconds per query)"""
+    hits = 0
+    reciprocal_ranks = 0.0
+    start = time.perf_counter()
+    ranked = [search(query, k) for query, _ in queries]
+    latency = (time.perf_counter() - start) / len(queries)
+    for ids, (_, relevant) in zip(ranked, queries):
+        for rank, chunk_id in enumerate(ids):
+            if chunk_id in relevant:
+                hits += 1
+                reciprocal_ranks += 1.0 / (rank + 1)
+                break
+    return hits / len(queries), reciprocal_ranks / len(queries), latency * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--chunks', type=int, default=20000)
+    arg_parser.add_argument('--queries', type=int, default=200)
+    arg_parser.add_argument('--k', type=int, default=5)
+    arg_parser.add_argument('--candidates', type=int, default=50, help='per-side depth before hybrid fusion')
+    arg_parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    args = arg_parser.parse_args()
+
+    texts, topics, citations = make_corpus(args.chunks)
+    keyword, semantic = make_queries(texts, topics, citations, args.queries)
+
+    model = SentenceTransformer(args.model)
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=64)
+    index, _ = build_index(embeddings, {'type': 'flat'})
+    dense_build = time.perf_counter() - start
+
+    store_dir = tempfile.mkdtemp(prefix='bench_bm25_')
+    start = time.perf_counter()
+    build_bm25_index(store_dir, enumerate(texts))
+    sparse = BM25Index(store_dir)
+    sparse_build = time.perf_counter() - start
+
+    def dense_search(query, k):
+        _, ids = index.search(np.asarray(model.encode([query]), dtype='float32'), k)
+        return [int(i) for i in ids[0] if i >= 0]
+
+    def sparse_search(query, k):
+        return [int(i) for i in sparse.search(query, k)[0]]
+
+    def hybrid_search(query, k):
+        depth = max(k, args.candidates)
+        _, dense_ids = index.search(np.asarray(model.encode([query]), dtype='float32'), depth)
+        sparse_ids, _ = sparse.search(query, depth)
+        return [chunk_id for chunk_id, _ in reciprocal_rank_fusion([dense_ids[0], sparse_ids], k)]
+
+    print(f"{args.chunks} chunks, {args.queries} queries per set, k={args.k}")
+    print(f"build: dense {dense_build:.1f}s (includes encoding), BM25 {sparse_build:.2f}s")
+    print(f"{'queries':<10} {'mode':<8} {'hit@k':>7} {'MRR':>7} {'us/query':>10}")
+    for name, queries in (('keyword', keyword), ('semantic', semantic)):
+        for mode, search in (('dense', dense_search), ('sparse', sparse_search), ('hybrid', hybrid_search)):
+            hit_rate, mrr, latency = run(search, queries, args.k)
+            print(f"{name:<10} {mode:<8} {hit_rate:>7.3f} {mrr:>7.3f} {latency:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_vector_index.py
+"""Recall@k vs. latency of the approximate index types against the flat baseline.
+
+Uses synthetic clustered vectors shaped like all-MiniLM-L6-v2 embeddings (384-d),
+so it runs without downloading the model or the ADGM corpus.
+
+Usage: python benchmarks/bench_vector_index.py [--vectors N] [--queries N] [--k K]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.vector_index import apply_search_params, build_index
+
+
+def make_vectors(n_vectors, n_queries, dimension, n_clusters, seed=0):
+    """Gaussian clusters, roughly normalised like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dimension)).astype('float32')
+    def sample(n):
+        points = centers[rng.integers(0, n_clusters, n)] + 0.5 * rng.standard_normal((n, dimension))
+        points /= np.linalg.norm(points, axis=1, keepdims=True)
+        return points.astype('float32')
+    return sample(n_vectors), sample(n_queries)
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    return found, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--vectors', type=int, default=100000)
+    arg_parser.add_argument('--queries', type=int, default=1000)
+    arg_parser.add_argument('--dimension', type=int, default=384)
+    arg_parser.add_argument('--clusters', type=int, default=200)
+    arg_parser.add_argument('--k', type=int, default=10)
+    arg_parser.add_argument('--pq-m', type=int, default=48, help='PQ sub-quantizers for ivf_pq')
+    args = arg_parser.parse_args()
+
+    vectors, queries = make_vectors(args.vectors, args.queries, args.dimension, args.clusters)
+
+    start = time.perf_counter()
+    flat, _ = build_index(vectors, {'type': 'flat'})
+    flat_build = time.perf_counter() - start
+    truth, flat_latency = timed_search(flat, queries, args.k)
+
+    print(f"{args.vectors} vectors, {args.queries} queries, k={args.k}")
+    print(f"{'index':<10} {'param':<14} {'build s':>8} {'recall@k':>9} {'us/query':>9}")
+    print(f"{'flat':<10} {'-':<14} {flat_build:>8.2f} {1.0:>9.3f} {flat_latency * 1e6:>9.1f}")
+
+    sweeps = [
+        ('ivf_flat', 'nprobe', [1, 4, 16, 64]),
+        ('ivf_pq', 'nprobe', [1, 4, 16, 64]),
+        ('hnsw', 'ef_search', [16, 32, 64, 128, 256]),
+    ]
+    for index_type, knob, values in sweeps:
+        start = time.perf_counter()
+        index, config = build_index(vectors, {'type': index_type, 'pq_m': args.pq_m})
+        build_time = time.perf_counter() - start
+        for value in values:
+            config[knob] = value
+            apply_search_params(index, config)
+            found, latency = timed_search(index, queries, args.k)
+            print(f"{index_type:<10} {f'{knob}={value}':<14} {build_time:>8.2f} "
+                  f"{recall_at_k(found, truth):>9.3f} {latency * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/load_test_service.py
+"""Load test for the analysis service (service.py) running locally.
+
+Sends --requests uploads of the sample documents with --concurrency requests
+in flight and reports throughput, the number of 429 rejections, and p50/p99
+latency of the successful requests. Start the service first:
+
+    python service.py --workers 4
+    python benchmarks/load_test_service.py --concurrency 16 --requests 200
+
+Usage: python benchmarks/load_test_service.py [--url URL] [--concurrency N] [--requests N] [--files PATH ...]
+"""
+import argparse
+import asyncio
+import glob
+import os
+import time
+
+import aiohttp
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_form(files):
+    form = aiohttp.FormData()
+    for name, content in files:
+        form.add_field('files', content, filename=name)
+    return form
+
+
+async def worker(session, url, files, remaining, latencies, statuses):
+    while remaining:
+        remaining.pop()
+        start = time.perf_counter()
+        async with session.post(url, data=make_form(files)) as response:
+            await response.read()
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+            elif response.status == 429:
+                # Honour the server's backpressure instead of hammering it
+                await asyncio.sleep(float(response.headers.get('Retry-After', 1)))
+
+
+async def run(url, files, concurrency, n_requests):
+    latencies, statuses = [], {}
+    remaining = list(range(n_requests))
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session, url, files, remaining, latencies, statuses)
+                               for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, statuses, elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--url', default='http://127.0.0.1:8080/analyze?documents=0')
+    arg_parser.add_argument('--concurrency', type=int, default=16)
+    arg_parser.add_argument('--requests', type=int, default=200)
+    arg_parser.add_argument('--files', nargs='+', help='documents per request (default: the sample documents)')
+    args = arg_parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(os.path.join(ROOT, 'Sample doc', '*.docx')))
+    files = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            files.append((os.path.basename(path), f.read()))
+
+    latencies, statuses, elapsed = asyncio.run(run(args.url, files, args.concurrency, args.requests))
+
+    print(f"{args.requests} requests of {len(files)} documents, concurrency {args.concurrency}: "
+          f"{elapsed:.1f}s, {len(latencies) / elapsed:.1f} req/s, "
+          f"{len(latencies) * len(files) / elapsed:.1f} docs/s")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    if latencies:
+        p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+        print(f"latency ms: p50 {p50:.1f}  p99 {p99:.1f}  max {max(latencies) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# cli.py
+"""Headless bulk review of document packages.
+
+Runs parser -> checker -> comment inserter -> report generator for every
+package with a pool of worker processes and writes, per package:
+
+    OUTPUT/<package id>/report.json          structured analysis report
+    OUTPUT/<package id>/reviewed_<name>      reviewed DOCX for each flagged document
+    OUTPUT/<package id>/.complete            fingerprint of the finished review
+
+Packages come from a directory tree (every directory holding .docx/.pdf files
+is one package, identified by its relative path) or from a JSON manifest:
+
+    [{"id": "acme-2024", "files": ["acme/aoa.docx", ...], "process": "company_incorporation"}]
+
+File paths in a manifest are relative to the manifest. Finished packages whose
+inputs, parser version, checklists and rules are unchanged are skipped, so an
+interrupted run can simply be restarted. Needs no API keys.
+
+Usage: python cli.py INPUT_DIR_OR_MANIFEST -o OUTPUT [--workers N] [--process KEY] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from modules.document_checker import CHECKLISTS_PATH, load_checklists
+from modules.document_parser import PARSER_VERSION
+from modules.red_flag_rules import RULES_PATH, load_red_flag_rules
+from modules.review_pipeline import init_worker, review_package
+
+SUPPORTED_EXTENSIONS = ('.docx', '.pdf')
+REPORT_FILENAME = 'report.json'
+COMPLETE_FILENAME = '.complete'
+
+
+def discover_packages(input_path: str, exclude: Optional[str] = None) -> List[Dict]:
+    """Build the package list from a directory tree or a JSON manifest.
+
+    exclude is a directory (normally the output directory) not to treat as
+    input when it lies inside the tree. Package ids must be unique.
+    """
+    if os.path.isfile(input_path):
+        with open(input_path, 'r') as f:
+            manifest = json.load(f)
+        entries = manifest.get('packages', []) if isinstance(manifest, dict) else manifest
+        base_dir = os.path.dirname(input_path)
+        packages = []
+        for entry in entries:
+            package_id = os.path.normpath(entry['id'])
+            if os.path.isabs(package_id) or package_id.startswith('..'):
+                raise ValueError(f"Package id must be a relative path inside the output directory: {entry['id']}")
+            packages.append({
+                'id': package_id,
+                'files': [os.path.join(base_dir, path) for path in entry['files']],
+                'process': entry.get('process')
+            })
+        return _check_unique_ids(packages)
+
+    exclude = os.path.abspath(exclude) if exclude else None
+    packages = []
+    for directory, subdirectories, filenames in os.walk(input_path):
+        # Reviewed documents written by an earlier run are not new input
+        subdirectories[:] = sorted(name for name in subdirectories
+                                   if os.path.abspath(os.path.join(directory, name)) != exclude)
+        files = sorted(os.path.join(directory, name) for name in filenames
+                       if name.lower().endswith(SUPPORTED_EXTENSIONS) and not name.startswith('~$'))
+        if files:
+            package_id = os.path.relpath(directory, input_path)
+            packages.append({'id': package_id if package_id != '.' else 'root', 'files': files, 'process': None})
+    return _check_unique_ids(packages)
+
+
+def _check_unique_ids(packages: List[Dict]) -> List[Dict]:
+    """Packages sharing an id would write to the same output directory"""
+    seen = set()
+    for package in packages:
+        if package['id'] in seen:
+            raise ValueError(f"Duplicate package id: {package['id']}")
+        seen.add(package['id'])
+    return packages
+
+
+def package_fingerprint(package: Dict, process: Optional[str]) -> str:
+    """Hash of everything a review depends on: inputs, requested process, parser and rule versions"""
+    digest = hashlib.sha256()
+    digest.update(f"{PARSER_VERSION}\0{process or package.get('process') or 'auto'}\0".encode('utf-8'))
+    for path in (CHECKLISTS_PATH, RULES_PATH):
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    for path in package['files']:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_complete(package_dir: str, fingerprint: str) -> bool:
+    try:
+        with open(os.path.join(package_dir, COMPLETE_FILENAME), 'r') as f:
+            return f.read().strip() == fingerprint
+    except FileNotFoundError:
+        return False
+
+
+def _atomic_write_text(path: str, text: str):
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    finally:
+        # Still there only if the write or rename failed
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def review_and_mark(package: Dict, package_dir: str, fingerprint: str,
+                    process: Optional[str] = None, cache_options: Optional[Dict] = None) -> Dict:
+    """Review one package into package_dir and mark it complete; returns a summary for progress output"""
+    os.makedirs(package_dir, exist_ok=True)
+    report, reviewed = review_package(package['files'], package_dir, process=process or package.get('process'),
+                                      cache_options=cache_options)
+    report['package_id'] = package['id']
+    report['reviewed_documents'] = [os.path.basename(path) for path in reviewed]
+    _atomic_write_text(os.path.join(package_dir, REPORT_FILENAME), json.dumps(report, indent=2))
+
+    # Written last: its presence with a matching fingerprint marks the package as done
+    _atomic_write_text(os.path.join(package_dir, COMPLETE_FILENAME), fingerprint)
+
+    documents = report['document_details']
+    return {
+        'documents': len(documents),
+        'errors': sum(1 for doc in documents
+                      if any(issue['type'] == 'document_error' for issue in doc['issues_found'])),
+        'issues': report['issues_summary']['total_issues'],
+        'process': report['analysis_summary']['process']
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('input', help='directory tree of packages, or a JSON manifest')
+    arg_parser.add_argument('-o', '--output', required=True, help='output directory')
+    arg_parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--process', help='checklist process for every package (default: identify per package)')
+    arg_parser.add_argument('--cache-dir', help='on-disk parse cache shared across runs')
+    arg_parser.add_argument('--force', action='store_true', help='re-review packages that are already complete')
+    args = arg_parser.parse_args(argv)
+
+    input_path = os.path.abspath(args.input)
+    output_dir = os.path.abspath(args.output)
+    # Templates are resolved relative to the project, wherever the command is run from
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if not os.path.exists(input_path):
+        print(f"❌ Input not found: {input_path}")
+        return 2
+
+    cache_options = {'disk_dir': os.path.abspath(args.cache_dir)} if args.cache_dir else None
+
+    pending = []
+    skipped = 0
+    try:
+        packages = discover_packages(input_path, exclude=output_dir)
+        for package in packages:
+            package_dir = os.path.join(output_dir, package['id'])
+            fingerprint = package_fingerprint(package, args.process)
+            if not args.force and is_complete(package_dir, fingerprint):
+                skipped += 1
+            else:
+                pending.append((package, package_dir, fingerprint))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Invalid input: {e}")
+        return 2
+
+    print(f"📦 {len(packages)} packages found, {skipped} already complete, {len(pending)} to review "
+          f"with {args.workers} worker(s)")
+
+    reviewed_documents = 0
+    failed = 0
+    start = time.perf_counter()
+
+    # Templates are read once here and handed to the workers
+    executor = ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=init_worker,
+                                   initargs=(cache_options, load_checklists(), load_red_flag_rules()))
+    try:
+        futures = {
+            executor.submit(review_and_mark, package, package_dir, fingerprint, args.process, cache_options): package
+            for package, package_dir, fingerprint in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            package = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ [{done}/{len(pending)}] {package['id']}: {e}")
+                continue
+            reviewed_documents += summary['documents']
+            print(f"✅ [{done}/{len(pending)}] {package['id']}: {summary['documents']} docs, "
+                  f"{summary['issues']} issues, process {summary['process']}"
+                  + (f", {summary['errors']} unreadable" if summary['errors'] else ''))
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted; finished packages are kept and will be skipped on the next run")
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    rate = reviewed_documents / elapsed if elapsed > 0 else 0.0
+    print(f"\n📊 Reviewed {reviewed_documents} documents in {len(pending) - failed} packages "
+          f"in {elapsed:.1f}s ({rate:.1f} docs/s); {skipped} skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
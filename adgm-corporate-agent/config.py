@@ -74,15 +74,45 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '10'))
 ALLOWED_EXTENSIONS = os.getenv('ALLOWED_EXTENSIONS', 'docx').split(',')
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '0'))  # 0 = one worker per CPU
+
+# Parse Cache Configuration
+PARSE_CACHE_DIR = os.getenv('PARSE_CACHE_DIR', 'data/parse_cache/')
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv('PARSE_CACHE_MAX_ENTRIES', '128'))
+PARSE_CACHE_MAX_DISK_MB = float(os.getenv('PARSE_CACHE_MAX_DISK_MB', '256'))
 
 # Vector Store Configuration
 VECTOR_STORE_PATH = os.getenv('VECTOR_STORE_PATH', 'data/vector_store/')
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))  # chunks encoded and indexed per step
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', 'data/embedding_cache/')
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '1024'))  # query embeddings kept in memory; 0 disables
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '256'))  # search results per (query, k, index version); 0 disables
+
+# Vector Index Configuration (index types: flat, ivf_flat, ivf_pq, hnsw)
+INDEX_TYPE = os.getenv('INDEX_TYPE', 'flat')
+IVF_NLIST = int(os.getenv('IVF_NLIST', '0'))  # 0 = about 4 * sqrt(number of chunks)
+IVF_NPROBE = int(os.getenv('IVF_NPROBE', '8'))
+PQ_M = int(os.getenv('PQ_M', '8'))
+HNSW_M = int(os.getenv('HNSW_M', '32'))
+HNSW_EF_CONSTRUCTION = int(os.getenv('HNSW_EF_CONSTRUCTION', '200'))
+HNSW_EF_SEARCH = int(os.getenv('HNSW_EF_SEARCH', '64'))
+INDEX_TRAIN_SAMPLE = int(os.getenv('INDEX_TRAIN_SAMPLE', '50000'))
+
+# ADGM Corpus Download Configuration
+DOWNLOAD_CACHE_DIR = os.getenv('DOWNLOAD_CACHE_DIR', 'data/adgm_docs/')
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '4'))
+DOWNLOAD_HOST_INTERVAL = float(os.getenv('DOWNLOAD_HOST_INTERVAL', '1.0'))  # seconds between requests per host
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '0'))  # PDF/DOCX text extraction processes; 0 = one per CPU
 
 # RAG Configuration
-CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '500'))
-CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '50'))
+CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '500'))  # words per chunk
+CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '50'))  # words repeated between consecutive chunks
 RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '5'))
+SEARCH_MODE = os.getenv('SEARCH_MODE', 'dense')  # dense, sparse (BM25) or hybrid
+HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', '50'))  # results taken from each side before fusion
+# Attach ADGM reference URLs to red flags; needs a built vector store and loads the embedding model
+REGULATORY_REFERENCES = os.getenv('REGULATORY_REFERENCES', 'False').lower() == 'true'
 
 # LLM Settings
 LLM_MODEL = os.getenv('LLM_MODEL', 'gpt-4')
@@ -203,6 +233,19 @@ def get_all_urls():
     """Get all ADGM URLs as a flat list"""
     return list(ADGM_URLS.values())
 
+def get_index_config():
+    """Get the vector index settings in the form used by modules.vector_index"""
+    return {
+        'type': INDEX_TYPE,
+        'nlist': IVF_NLIST,
+        'nprobe': IVF_NPROBE,
+        'pq_m': PQ_M,
+        'hnsw_m': HNSW_M,
+        'ef_construction': HNSW_EF_CONSTRUCTION,
+        'ef_search': HNSW_EF_SEARCH,
+        'train_sample': INDEX_TRAIN_SAMPLE
+    }
+
 if __name__ == "__main__":
     validate_config()
     print("\n📋 Available URL Categories:")
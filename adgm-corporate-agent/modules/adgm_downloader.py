@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class HostRateLimiter:
+    """Space out requests to the same host without blocking other hosts"""
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        """Block until this host's next request slot"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ADGMDownloader:
+    """Concurrent, conditional downloader with an on-disk raw response cache.
+
+    Each URL's body and validators (ETag / Last-Modified) are kept under
+    cache_dir. Later fetches send If-None-Match / If-Modified-Since, so an
+    unchanged page costs a 304 and is served from the cache.
+    """
+
+    def __init__(self, cache_dir: str = 'data/adgm_docs', max_workers: int = 4,
+                 per_host_interval: float = 1.0, timeout: float = 30,
+                 session: Optional[requests.Session] = None, headers: Optional[Dict] = None):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.rate_limiter = HostRateLimiter(per_host_interval)
+
+        if session is None:
+            # One pooled session keeps connections alive across requests to a host
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def cache_path(self, url: str, suffix: str) -> str:
+        """Path of a cache file for url (suffix: .body, .json, or a derived artifact)"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def fetch_all(self, urls: List[str]) -> List[Dict]:
+        """Fetch every URL concurrently; results keep the input order"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def fetch(self, url: str) -> Dict:
+        """Fetch one URL, revalidating any cached copy.
+
+        Returns a dict with url, status, content (bytes), content_type,
+        not_modified (served from cache after a 304), from_cache and error.
+        """
+        meta = self._read_meta(url)
+        cached_body_exists = meta is not None and os.path.exists(self.cache_path(url, '.body'))
+
+        headers = dict(self.headers)
+        if cached_body_exists:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        self.rate_limiter.wait(urlparse(url).netloc)
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+            if response.status_code == 304 and cached_body_exists:
+                return self._cached_result(url, meta, status=304, not_modified=True)
+
+            response.raise_for_status()
+        except Exception as e:
+            if cached_body_exists:
+                # Serve the last good copy rather than dropping the document
+                print(f"⚠️ Using cached copy of {url}: {e}")
+                result = self._cached_result(url, meta, status=None, not_modified=False)
+                result['error'] = str(e)
+                return result
+            return {
+                'url': url,
+                'status': getattr(getattr(e, 'response', None), 'status_code', None),
+                'content': b'',
+                'content_type': '',
+                'not_modified': False,
+                'from_cache': False,
+                'error': str(e)
+            }
+
+        content_type = response.headers.get('content-type', '').lower()
+        self._write_cache(url, response.content, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': content_type,
+            'fetched_at': time.time()
+        })
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'content': response.content,
+            'content_type': content_type,
+            'not_modified': False,
+            'from_cache': False,
+            'error': None
+        }
+
+    def _cached_result(self, url: str, meta: Dict, status, not_modified: bool) -> Dict:
+        with open(self.cache_path(url, '.body'), 'rb') as f:
+            content = f.read()
+        return {
+            'url': url,
+            'status': status,
+            'content': content,
+            'content_type': meta.get('content_type', ''),
+            'not_modified': not_modified,
+            'from_cache': True,
+            'error': None
+        }
+
+    def _read_meta(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self.cache_path(url, '.json'), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, content: bytes, meta: Dict):
+        """Write body then metadata, each atomically, so validators never describe a missing body"""
+        try:
+            self._atomic_write(self.cache_path(url, '.body'), content)
+            self._atomic_write(self.cache_path(url, '.json'), json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            print(f"⚠️ Could not cache {url}: {e}")
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
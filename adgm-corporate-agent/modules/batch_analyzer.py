@@ -0,0 +1,251 @@
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from modules.cache import ParseCache
+from modules.comment_inserter import CommentInserter
+from modules.document_parser import DOCUMENT_HANDLE, DocumentParser, open_document, paragraph_table
+from modules.document_checker import DocumentChecker, load_checklists
+from modules.red_flag_rules import load_red_flag_rules
+
+# Analysis key of the flagged DOCX annotated with its red flags as Word comments (bytes)
+REVIEWED_DOCUMENT = 'reviewed_document'
+
+# Components owned by the current (worker) process, created once per process
+_parser = None
+_checker = None
+_cache_options = None
+
+
+def _init_worker(cache_options: Optional[Dict] = None, checklists: Optional[Dict] = None,
+                 rules: Optional[Dict] = None):
+    """Create the parser and checker used by this process.
+
+    checklists and rules are the templates the parent already loaded, so
+    workers do not read and compile the template files again.
+    """
+    global _checker
+    _use_cache(cache_options)
+    _checker = DocumentChecker(checklists, rules)
+
+
+def _use_cache(cache_options: Optional[Dict]):
+    global _parser, _cache_options
+    cache = ParseCache(**cache_options) if cache_options is not None else None
+    _parser = DocumentParser(cache=cache)
+    _cache_options = cache_options
+
+
+def analyze_document(source: Union[str, bytes], filename: Optional[str] = None,
+                     cache_options: Optional[Dict] = None, keep_document: bool = False,
+                     annotate: bool = False) -> Dict:
+    """Parse a single document (path, or raw bytes plus filename) and detect its red flags.
+
+    keep_document retains the parsed DOCX handle for in-process comment insertion;
+    results sent back from a pool never carry it. annotate adds the reviewed
+    DOCX as bytes under REVIEWED_DOCUMENT instead (see annotate_analysis).
+    """
+    global _checker
+    if _parser is None or cache_options != _cache_options:
+        _use_cache(cache_options)
+    if _checker is None:
+        _checker = DocumentChecker()
+    result = _analyze(_parser, _checker, source, filename, keep_document or annotate)
+    return annotate_analysis(result, source) if annotate else result
+
+
+def needs_review(doc_analysis: Dict) -> bool:
+    """Whether an analysis is a DOCX with red flags, i.e. gets a Word-commented copy"""
+    return (bool(doc_analysis.get('red_flags')) and 'error' not in doc_analysis
+            and doc_analysis.get('filename', '').lower().endswith('.docx'))
+
+
+def annotate_analysis(doc_analysis: Dict, source: Union[str, bytes]) -> Dict:
+    """Add the reviewed DOCX of a flagged analysis under REVIEWED_DOCUMENT.
+
+    The comments go into the Document held under DOCUMENT_HANDLE, which is
+    consumed; without one, source is parsed again. Documents the comment
+    inserter cannot write get no REVIEWED_DOCUMENT.
+    """
+    document = doc_analysis.pop(DOCUMENT_HANDLE, None)
+    if needs_review(doc_analysis):
+        output = io.BytesIO()
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        if CommentInserter().add_comments_to_document(stream, doc_analysis['red_flags'], output,
+                                                      doc_analysis['filename'], document,
+                                                      paragraph_table(doc_analysis)) is not None:
+            doc_analysis[REVIEWED_DOCUMENT] = output.getvalue()
+    return doc_analysis
+
+
+def _analyze(parser: DocumentParser, checker: DocumentChecker, source: Union[str, bytes],
+             filename: Optional[str] = None, keep_document: bool = False) -> Dict:
+    if isinstance(source, (bytes, bytearray)):
+        doc_analysis = parser.parse_bytes(source, filename, keep_document)
+    else:
+        doc_analysis = parser.parse_document(source, keep_document)
+    return _add_red_flags(checker, doc_analysis, filename)
+
+
+def _add_red_flags(checker: DocumentChecker, doc_analysis: Dict, filename: Optional[str] = None) -> Dict:
+    """Complete a parse result into an analysis: filename plus red flags"""
+    if filename:
+        doc_analysis['filename'] = filename
+
+    if 'error' not in doc_analysis:
+        doc_analysis['red_flags'] = checker.detect_red_flags(doc_analysis)
+    else:
+        doc_analysis['red_flags'] = [{
+            'type': 'document_error',
+            'severity': 'high',
+            'message': doc_analysis.get('error', 'Unknown error'),
+            'suggestion': 'Please check the document format and try again',
+            'span': [0, 0],
+            'paragraph_index': 0
+        }]
+
+    return doc_analysis
+
+
+class BatchAnalyzer:
+    """Fan document parsing and red flag detection out over a process pool.
+
+    The analyzer owns the parse cache: documents are looked up in this process
+    and only misses are sent to the workers, whose results are cached here. A
+    long-lived analyzer therefore keeps both its pool and its memory tier from
+    one batch to the next.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_options: Optional[Dict] = None,
+                 keep_documents: bool = False, checklists: Optional[Dict] = None,
+                 rules: Optional[Dict] = None, annotate: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_options = cache_options  # ParseCache keyword arguments, None disables caching
+        # Attach the parsed DOCX for comment insertion, or insert the comments
+        # right away where it was parsed; see analyze()
+        self.keep_documents = keep_documents
+        self.annotate = annotate
+        # Templates are loaded once here and handed to every worker
+        self.checklists = checklists if checklists is not None else load_checklists()
+        self.rules = rules if rules is not None else load_red_flag_rules()
+        self._parser = DocumentParser(cache=ParseCache(**cache_options) if cache_options is not None else None)
+        self._checker = DocumentChecker(self.checklists, self.rules)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the worker pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Hit/miss statistics of the parse cache, or None when caching is off"""
+        return self._parser.cache.stats() if self._parser.cache is not None else None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Workers parse only documents the cache has already missed
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(None, self.checklists, self.rules)
+                )
+            return self._executor
+
+    def _lookup(self, source: Union[str, bytes], filename: Optional[str]) -> Tuple[Optional[str], Optional[Dict]]:
+        try:
+            return self._parser.lookup(source, filename or os.path.basename(source))
+        except Exception:
+            # Unreadable input: let the normal parse path report the error
+            return None, None
+
+    def _complete_cached(self, result: Dict, source: Union[str, bytes], filename: Optional[str]) -> Dict:
+        """Red flags for a cache hit, plus its Document or reviewed DOCX when asked for"""
+        result = _add_red_flags(self._checker, result, filename)
+        if (self.keep_documents or self.annotate) and needs_review(result):
+            # Extraction was skipped, so this is the only parse of the file
+            try:
+                result[DOCUMENT_HANDLE] = open_document(source)
+            except Exception:
+                # The comment inserter reports unreadable files itself
+                pass
+        return annotate_analysis(result, source) if self.annotate else result
+
+    def analyze(self, sources: List[Union[str, bytes]],
+                filenames: Optional[List[str]] = None) -> Iterator[Tuple[int, Dict]]:
+        """Yield (index, analysis) for each document as soon as it is finished.
+
+        sources are paths or raw file bytes; bytes need a filename for their format.
+        
+        With annotate, every flagged DOCX analysis carries its reviewed copy
+        under REVIEWED_DOCUMENT, made from the Document parsed for the analysis:
+        pool workers annotate before sending their results back, so each
+        review costs one parse. With keep_documents, in-process analyses carry
+        that Document under DOCUMENT_HANDLE instead. Handles cannot be pickled,
+        so pool results have none and the caller has to parse those files again;
+        cache hits get one opened here, as nothing else parsed them.
+        """
+        if filenames is None:
+            filenames = [None] * len(sources)
+
+        # A pool is not worth its startup cost for a single document
+        if self.workers <= 1 or len(sources) <= 1:
+            for index, (source, filename) in enumerate(zip(sources, filenames)):
+                result = _analyze(self._parser, self._checker, source, filename,
+                                  self.keep_documents or self.annotate)
+                yield index, annotate_analysis(result, source) if self.annotate else result
+            return
+
+        cached = []
+        misses = []
+        for index, (source, filename) in enumerate(zip(sources, filenames)):
+            key, result = self._lookup(source, filename)
+            if result is None:
+                misses.append((index, source, filename, key))
+            else:
+                cached.append((index, result, filename))
+
+        futures = {}
+        if misses:
+            executor = self._get_executor()
+            futures = {
+                executor.submit(analyze_document, source, filename, None, False, self.annotate): (index, key)
+                for index, source, filename, key in misses
+            }
+        try:
+            # Cached documents only need their red flags while the pool parses the rest
+            for index, result, filename in cached:
+                yield index, self._complete_cached(result, sources[index], filename)
+
+            for future in as_completed(futures):
+                index, key = futures[future]
+                result = future.result()
+                if key is not None:
+                    self._parser.remember(key, {name: value for name, value in result.items()
+                                                if name not in ('red_flags', REVIEWED_DOCUMENT)})
+                yield index, result
+        finally:
+            # Drop queued work if the caller stops consuming early
+            for future in futures:
+                future.cancel()
+
+
+def analyze_batch(sources: List[Union[str, bytes]], workers: Optional[int] = None,
+                  filenames: Optional[List[str]] = None,
+                  cache_options: Optional[Dict] = None,
+                  keep_documents: bool = False, checklists: Optional[Dict] = None,
+                  rules: Optional[Dict] = None, annotate: bool = False) -> Iterator[Tuple[int, Dict]]:
+    """Analyze a batch of documents in parallel, streaming results in completion order"""
+    with BatchAnalyzer(workers, cache_options, keep_documents, checklists, rules, annotate) as analyzer:
+        yield from analyzer.analyze(sources, filenames)
@@ -0,0 +1,135 @@
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter, defaultdict
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+VOCAB_FILENAME = 'bm25_vocab.json'
+OFFSETS_FILENAME = 'bm25_offsets.npy'
+POSTINGS_FILENAME = 'bm25_postings.npy'
+WEIGHTS_FILENAME = 'bm25_weights.npy'
+DOC_IDS_FILENAME = 'bm25_doc_ids.npy'
+
+BM25_FILES = (VOCAB_FILENAME, OFFSETS_FILENAME, POSTINGS_FILENAME, WEIGHTS_FILENAME, DOC_IDS_FILENAME)
+
+# Words, numbers and dotted/hyphenated citations such as "s.12", "2020" or "12.5"
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms used for both indexing and querying"""
+    return _TOKEN.findall(text.lower())
+
+
+def build_bm25_index(directory: str, chunks: Iterable[Tuple[int, str]],
+                     k1: float = 1.5, b: float = 0.75) -> int:
+    """Build and write the inverted index for (chunk id, text) pairs; returns the chunk count.
+
+    Each posting stores its precomputed BM25 term weight, so a query only adds
+    up the weights found in its terms' posting lists.
+    """
+    postings = defaultdict(lambda: array('i'))
+    frequencies = defaultdict(lambda: array('i'))
+    doc_ids = []
+    doc_lengths = array('i')
+
+    for chunk_id, text in chunks:
+        position = len(doc_ids)
+        terms = tokenize(text)
+        doc_ids.append(chunk_id)
+        doc_lengths.append(len(terms))
+        for term, frequency in Counter(terms).items():
+            postings[term].append(position)
+            frequencies[term].append(frequency)
+
+    n_docs = len(doc_ids)
+    avg_length = (sum(doc_lengths) / n_docs) if n_docs else 0.0
+    doc_lengths = np.asarray(doc_lengths, dtype='float32')
+
+    vocabulary = sorted(postings)
+    offsets = np.zeros(len(vocabulary) + 1, dtype='int64')
+    all_postings = []
+    all_weights = []
+    for term_index, term in enumerate(vocabulary):
+        positions = np.asarray(postings[term], dtype='int32')
+        tf = np.asarray(frequencies[term], dtype='float32')
+        df = len(positions)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * doc_lengths[positions] / (avg_length or 1.0))
+        all_postings.append(positions)
+        all_weights.append((idf * tf * (k1 + 1) / (tf + norm)).astype('float32'))
+        offsets[term_index + 1] = offsets[term_index] + df
+
+    np.save(os.path.join(directory, OFFSETS_FILENAME), offsets)
+    np.save(os.path.join(directory, POSTINGS_FILENAME),
+            np.concatenate(all_postings) if all_postings else np.zeros(0, dtype='int32'))
+    np.save(os.path.join(directory, WEIGHTS_FILENAME),
+            np.concatenate(all_weights) if all_weights else np.zeros(0, dtype='float32'))
+    np.save(os.path.join(directory, DOC_IDS_FILENAME), np.asarray(doc_ids, dtype='int64'))
+    with open(os.path.join(directory, VOCAB_FILENAME), 'w') as f:
+        json.dump({'k1': k1, 'b': b, 'n_docs': n_docs, 'avg_length': avg_length, 'terms': vocabulary}, f)
+    return n_docs
+
+
+class BM25Index:
+    """Memory-mapped BM25 inverted index persisted next to the FAISS index"""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, VOCAB_FILENAME), 'r') as f:
+            vocab = json.load(f)
+        self.k1 = vocab['k1']
+        self.b = vocab['b']
+        self.n_docs = vocab['n_docs']
+        self._terms = {term: index for index, term in enumerate(vocab['terms'])}
+        self._offsets = np.load(os.path.join(directory, OFFSETS_FILENAME), mmap_mode='r')
+        self._postings = np.load(os.path.join(directory, POSTINGS_FILENAME), mmap_mode='r')
+        self._weights = np.load(os.path.join(directory, WEIGHTS_FILENAME), mmap_mode='r')
+        self._doc_ids = np.load(os.path.join(directory, DOC_IDS_FILENAME), mmap_mode='r')
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Whether a complete BM25 index was written to directory"""
+        return all(os.path.exists(os.path.join(directory, name)) for name in BM25_FILES)
+
+    def __len__(self):
+        return self.n_docs
+
+    def search(self, query: str, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (chunk ids, BM25 scores) of the top k chunks, best first"""
+        query_terms = Counter(term for term in tokenize(query) if term in self._terms)
+        if not query_terms:
+            return np.zeros(0, dtype='int64'), np.zeros(0, dtype='float32')
+
+        positions = []
+        weights = []
+        for term, count in query_terms.items():
+            term_index = self._terms[term]
+            start, end = self._offsets[term_index], self._offsets[term_index + 1]
+            positions.append(self._postings[start:end])
+            weights.append(self._weights[start:end] * count)
+
+        # Only chunks containing a query term are scored
+        candidates, inverse = np.unique(np.concatenate(positions), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights)).astype('float32')
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        # Highest score first, earlier chunks first among ties
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return np.asarray(self._doc_ids[candidates[top]]), scores[top]
+
+
+def reciprocal_rank_fusion(rankings: Iterable, k: int, constant: int = 60) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists into the top k (id, score) pairs; score = sum of 1 / (constant + rank)"""
+    scores = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            if chunk_id >= 0:  # ANN indexes pad with -1
+                scores[int(chunk_id)] = scores.get(int(chunk_id), 0.0) + 1.0 / (constant + rank + 1)
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
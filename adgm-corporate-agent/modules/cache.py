@@ -0,0 +1,173 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, marking it most recently used"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Return hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class ParseCache:
+    """Two-tier (memory + optional disk) cache of parse results keyed by content hash"""
+
+    def __init__(self, max_entries: int = 128, disk_dir: Optional[str] = None,
+                 max_disk_mb: float = 256):
+        self.memory = LRUCache(max_entries)
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data: bytes, version: str) -> str:
+        """Build a cache key from the raw file bytes and the parser version"""
+        digest = hashlib.sha256()
+        digest.update(version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached parse result, or None on a miss"""
+        result = self.memory.get(key)
+        if result is None and self.disk_dir:
+            result = self._read_disk(key)
+            if result is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    # The memory tier counted this lookup as a miss
+                    self.memory.misses -= 1
+                    self.memory.hits += 1
+                self.memory.put(key, result)
+
+        return copy.deepcopy(result) if result is not None else None
+
+    def put(self, key: str, result: Dict):
+        """Store a parse result in memory and, if enabled, on disk"""
+        result = copy.deepcopy(result)
+        self.memory.put(key, result)
+        if self.disk_dir:
+            self._write_disk(key, result)
+
+    def stats(self) -> Dict:
+        """Return hit/miss statistics for both tiers"""
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        stats['disk_enabled'] = bool(self.disk_dir)
+        return stats
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            # Refresh the mtime so eviction treats this entry as recently used
+            os.utime(path)
+            return result
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Discarding unreadable parse cache entry {key}: {e}")
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_disk(self, key: str, result: Dict):
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"⚠️ Could not write parse cache entry {key}: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove least recently used disk entries until the tier fits its budget"""
+        with self._lock:
+            entries = []
+            total_size = 0
+            for entry in os.scandir(self.disk_dir):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+            if total_size <= self.max_disk_bytes:
+                return
+
+            for _, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                if total_size <= self.max_disk_bytes:
+                    break
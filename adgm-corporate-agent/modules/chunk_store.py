@@ -0,0 +1,110 @@
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+IDS_FILENAME = 'chunk_ids.npy'
+TEXT_FILENAME = 'chunk_text.bin'
+TEXT_OFFSETS_FILENAME = 'chunk_text_offsets.npy'
+META_FILENAME = 'chunk_meta.bin'
+META_OFFSETS_FILENAME = 'chunk_meta_offsets.npy'
+
+CHUNK_STORE_FILES = (IDS_FILENAME, TEXT_FILENAME, TEXT_OFFSETS_FILENAME, META_FILENAME, META_OFFSETS_FILENAME)
+
+
+def write_chunk_store(directory: str, chunks: Iterable[Tuple[int, str, Dict]]) -> int:
+    """Write (chunk id, text, metadata) triples, given in increasing id order; returns the count.
+
+    Texts are packed back to back as UTF-8 into one blob and metadata as JSON
+    into another; int64 offset arrays mark where each entry starts and ends.
+    """
+    ids = []
+    text_offsets = [0]
+    meta_offsets = [0]
+
+    with open(os.path.join(directory, TEXT_FILENAME), 'wb') as text_file, \
+            open(os.path.join(directory, META_FILENAME), 'wb') as meta_file:
+        for chunk_id, text, metadata in chunks:
+            if ids and chunk_id <= ids[-1]:
+                raise ValueError(f"Chunk ids must be strictly increasing ({chunk_id} after {ids[-1]})")
+            ids.append(chunk_id)
+
+            encoded_text = text.encode('utf-8')
+            text_file.write(encoded_text)
+            text_offsets.append(text_offsets[-1] + len(encoded_text))
+
+            encoded_meta = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+            meta_file.write(encoded_meta)
+            meta_offsets.append(meta_offsets[-1] + len(encoded_meta))
+
+    np.save(os.path.join(directory, IDS_FILENAME), np.asarray(ids, dtype='int64'))
+    np.save(os.path.join(directory, TEXT_OFFSETS_FILENAME), np.asarray(text_offsets, dtype='int64'))
+    np.save(os.path.join(directory, META_OFFSETS_FILENAME), np.asarray(meta_offsets, dtype='int64'))
+    return len(ids)
+
+
+def _map_blob(path: str):
+    """Memory-map a file read-only (empty files cannot be mapped)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ChunkStore:
+    """Read-only, memory-mapped view of the chunk texts and metadata in a store directory.
+
+    Nothing is read up front beyond the array headers: lookups binary-search the
+    sorted id array and slice the blobs, so resident memory does not grow with
+    the corpus and processes opening the same generation share the page cache.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._ids = np.load(os.path.join(directory, IDS_FILENAME), mmap_mode='r')
+        self._text_offsets = np.load(os.path.join(directory, TEXT_OFFSETS_FILENAME), mmap_mode='r')
+        self._meta_offsets = np.load(os.path.join(directory, META_OFFSETS_FILENAME), mmap_mode='r')
+        self._text = _map_blob(os.path.join(directory, TEXT_FILENAME))
+        self._meta = _map_blob(os.path.join(directory, META_FILENAME))
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Whether a complete chunk store was written to directory"""
+        return all(os.path.exists(os.path.join(directory, name)) for name in CHUNK_STORE_FILES)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, chunk_id) -> bool:
+        return self._position(chunk_id) is not None
+
+    def __iter__(self) -> Iterator[Tuple[int, str, Dict]]:
+        """Yield (chunk id, text, metadata) in id order"""
+        for position in range(len(self._ids)):
+            yield int(self._ids[position]), self._text_at(position), self._metadata_at(position)
+
+    def text(self, chunk_id: int) -> Optional[str]:
+        """Chunk text, or None for an unknown id"""
+        position = self._position(chunk_id)
+        return self._text_at(position) if position is not None else None
+
+    def metadata(self, chunk_id: int) -> Optional[Dict]:
+        """Chunk metadata, or None for an unknown id"""
+        position = self._position(chunk_id)
+        return self._metadata_at(position) if position is not None else None
+
+    def _position(self, chunk_id) -> Optional[int]:
+        position = int(np.searchsorted(self._ids, chunk_id))
+        if position < len(self._ids) and self._ids[position] == chunk_id:
+            return position
+        return None
+
+    def _text_at(self, position: int) -> str:
+        start, end = self._text_offsets[position], self._text_offsets[position + 1]
+        return self._text[start:end].decode('utf-8')
+
+    def _metadata_at(self, position: int) -> Dict:
+        start, end = self._meta_offsets[position], self._meta_offsets[position + 1]
+        return json.loads(self._meta[start:end])
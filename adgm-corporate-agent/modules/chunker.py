@@ -0,0 +1,114 @@
+import re
+from typing import Dict, Iterator, List, Tuple
+
+# Bump when chunk boundaries change so existing stores are rebuilt instead of mixed
+CHUNKER_VERSION = 1
+
+_LINE = re.compile(r'[^\n]+')
+_WORD = re.compile(r'\S+')
+
+# Lines that open a new unit of a legal text: numbered clauses ("3.", "4.2", "(a)", "b)")
+# and titled divisions ("Article 5", "PART II", "Schedule 1")
+_STRUCTURAL_LINE = re.compile(
+    r'\s*(?:\d{1,3}(?:\.\d{1,3})*[.)]?\s'
+    r'|\([a-zA-Z0-9]{1,4}\)\s'
+    r'|[a-zA-Z][.)]\s'
+    r'|(?:article|section|clause|part|chapter|schedule|regulation|rule|annex|appendix)\s+[\dIVXLC]+\b)',
+    re.IGNORECASE
+)
+
+# Boundary strength recorded before the first word of a line
+NO_BOUNDARY = 0
+PARAGRAPH_BOUNDARY = 1
+STRUCTURAL_BOUNDARY = 2
+
+
+def _is_heading(line: str) -> bool:
+    """Short all-capitals lines such as 'ARTICLES OF ASSOCIATION'"""
+    stripped = line.strip()
+    return 1 < len(stripped) <= 80 and stripped.isupper()
+
+
+class DocumentChunker:
+    """Split text into overlapping word windows that prefer to end at clause boundaries.
+
+    Chunks hold at most chunk_size words. When a window fills up it is cut at
+    the last heading or numbered clause in its second half, or failing that at
+    the last paragraph break, or failing that at the word limit. The next chunk
+    repeats the final `overlap` words of the previous one. Chunk text is a slice
+    of the input, so its start_char/end_char offsets point at the exact span.
+    """
+
+    def __init__(self, chunk_size: int = 500, overlap: int = 50):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1 word")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be between 0 and chunk_size - 1 words")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        # A structural cut may not leave a chunk shorter than this
+        self.min_cut = max(1, chunk_size // 2)
+
+    def settings(self) -> Dict:
+        """Parameters that determine chunk boundaries (stored with the vector store)"""
+        return {'version': CHUNKER_VERSION, 'chunk_size': self.chunk_size, 'overlap': self.overlap}
+
+    def chunks(self, text: str) -> Iterator[Dict]:
+        """Yield {'text', 'start_char', 'end_char'} for each chunk of text, in order"""
+        # Word spans of the current window, and (word index, strength) boundaries within it
+        words: List[Tuple[int, int]] = []
+        boundaries: List[Tuple[int, int]] = []
+        # Leading words of the window already emitted as the previous chunk's overlap
+        carried = 0
+
+        for position, strength in self._iter_words(text):
+            if len(words) == self.chunk_size:
+                cut = self._choose_cut(boundaries)
+                yield self._make_chunk(text, words, cut)
+
+                keep_from = cut - min(self.overlap, cut - 1)
+                carried = cut - keep_from
+                words = words[keep_from:]
+                boundaries = [(i - keep_from, s) for i, s in boundaries if i > keep_from]
+
+            if strength != NO_BOUNDARY:
+                boundaries.append((len(words), strength))
+            words.append(position)
+
+        if len(words) > carried:
+            yield self._make_chunk(text, words, len(words))
+
+    def _iter_words(self, text: str) -> Iterator[Tuple[Tuple[int, int], int]]:
+        """Yield ((start, end), boundary strength) for each word of text"""
+        previous_line_end = 0
+        for line in _LINE.finditer(text):
+            line_text = line.group()
+            if not line_text.strip():
+                continue
+
+            if _STRUCTURAL_LINE.match(line_text) or _is_heading(line_text):
+                strength = STRUCTURAL_BOUNDARY
+            elif text.count('\n', previous_line_end, line.start()) > 1:
+                strength = PARAGRAPH_BOUNDARY
+            else:
+                strength = NO_BOUNDARY
+            previous_line_end = line.end()
+
+            for word in _WORD.finditer(text, line.start(), line.end()):
+                yield word.span(), strength
+                strength = NO_BOUNDARY
+
+    def _choose_cut(self, boundaries: List[Tuple[int, int]]) -> int:
+        """Number of words to put in a full window's chunk"""
+        best_index, best_strength = self.chunk_size, NO_BOUNDARY
+        for index, strength in boundaries:
+            # Later boundaries of at least equal strength win
+            if index >= self.min_cut and strength >= best_strength:
+                best_index, best_strength = index, strength
+        return best_index
+
+    @staticmethod
+    def _make_chunk(text: str, words: List[Tuple[int, int]], count: int) -> Dict:
+        start_char = words[0][0]
+        end_char = words[count - 1][1]
+        return {'text': text[start_char:end_char], 'start_char': start_char, 'end_char': end_char}
@@ -1,57 +1,101 @@
 from docx import Document
 from docx.shared import RGBColor
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from bisect import bisect_left, bisect_right
+import io
 import os
+from modules.document_parser import build_paragraph_index
+from modules.docx_comments import DocxComments
 
 class CommentInserter:
     def __init__(self):
         pass
     
-    def add_comments_to_document(self, file_path: str, red_flags: List[Dict], output_path: str):
-        """Add inline comments to document"""
-        file_extension = os.path.splitext(file_path)[1].lower()
+    def add_comments_to_document(self, source, red_flags: List[Dict], output, filename: Optional[str] = None,
+                                 document=None, paragraphs: Optional[Tuple[List[int], List[int]]] = None):
+        """Add inline comments to document.
+        
+        source is a path or binary file-like object and output a path or writable
+        binary stream; filename gives the format and is required when source is
+        not a path.
+        document is an already parsed python-docx Document of source (the parse
+        result's DOCUMENT_HANDLE); it is annotated in place instead of parsing
+        source again. paragraphs is the parse result's paragraph_table, which
+        saves rebuilding the offset index from the document. Returns output, or
+        None on failure.
+        """
+        if filename is None:
+            if not isinstance(source, (str, os.PathLike)):
+                raise ValueError("filename is required when source is not a path")
+            filename = os.path.basename(source)
+        file_extension = os.path.splitext(filename)[1].lower()
         
         if file_extension == '.docx':
-            return self._add_comments_to_docx(file_path, red_flags, output_path)
+            return self._add_comments_to_docx(source, red_flags, output, document, paragraphs)
         elif file_extension == '.pdf':
-            return self._create_pdf_review_report(file_path, red_flags, output_path)
+            return self._create_pdf_review_report(filename, red_flags, output)
         else:
             return None
     
-    def _add_comments_to_docx(self, file_path: str, red_flags: List[Dict], output_path: str):
-        """Add inline comments to DOCX file"""
+    def review_document_bytes(self, data: bytes, filename: str, red_flags: List[Dict],
+                              document=None, paragraphs: Optional[Tuple[List[int], List[int]]] = None) -> Optional[bytes]:
+        """Return the reviewed DOCX for an in-memory document, or None on failure"""
+        output = io.BytesIO()
+        if self.add_comments_to_document(io.BytesIO(data), red_flags, output, filename, document, paragraphs) is None:
+            return None
+        return output.getvalue()
+    
+    def _add_comments_to_docx(self, source, red_flags: List[Dict], output, document=None, paragraphs=None):
+        """Attach each red flag as a native Word comment anchored to its evidence.
+        
+        A flag's content span is resolved to a paragraph through its
+        paragraph_index, an index into doc.paragraphs (or by bisecting the
+        paragraph start offsets), and then to the runs it overlaps. Flags without a span are anchored to the first
+        paragraph.
+        """
         try:
-            doc = Document(file_path)
-            
-            # Add a header comment
-            if red_flags:
-                header_paragraph = doc.paragraphs[0] if doc.paragraphs else doc.add_paragraph()
-                header_run = header_paragraph.add_run(f"\n[ADGM CORPORATE AGENT REVIEW - {len(red_flags)} ISSUE(S) FOUND]\n")
-                header_run.font.color.rgb = RGBColor(255, 0, 0)
-                header_run.bold = True
+            doc = document if document is not None else Document(source)
+            doc_paragraphs = doc.paragraphs
+            if not doc_paragraphs:
+                doc_paragraphs = [doc.add_paragraph()]
+            if paragraphs is not None:
+                starts, indices = paragraphs
+            else:
+                starts, indices = build_paragraph_index([paragraph.text for paragraph in doc_paragraphs])
+            comments = DocxComments(doc)
             
-            # Add comments for each red flag
             for i, flag in enumerate(red_flags, 1):
-                comment_paragraph = doc.add_paragraph()
-                comment_text = f"ISSUE #{i} - {flag.get('severity', 'MEDIUM').upper()}: {flag.get('message', 'No message')}"
+                lines = [f"ISSUE #{i} - {flag.get('severity', 'MEDIUM').upper()}: {flag.get('message', 'No message')}"]
                 if flag.get('suggestion'):
-                    comment_text += f"\nSUGGESTION: {flag['suggestion']}"
+                    lines.append(f"SUGGESTION: {flag['suggestion']}")
+                if flag.get('references'):
+                    lines.append(f"REFERENCES: {', '.join(flag['references'])}")
                 
-                comment_run = comment_paragraph.add_run(comment_text)
-                comment_run.font.color.rgb = RGBColor(255, 0, 0)
-                comment_run.italic = True
-                
-                comment_paragraph.add_run("\n" + "="*50 + "\n")
+                span = flag.get('span')
+                if span and starts:
+                    paragraph_index = flag.get('paragraph_index')
+                    position = bisect_left(indices, paragraph_index) if paragraph_index is not None else None
+                    if position is None or position == len(indices) or indices[position] != paragraph_index:
+                        position = max(bisect_right(starts, span[0]) - 1, 0)
+                    # A span starting on the space between paragraphs belongs to the next one
+                    if position + 1 < len(starts) and span[0] >= starts[position + 1] - 1:
+                        position += 1
+                    paragraph = doc_paragraphs[indices[position]]
+                    first_run, last_run = _runs_for_span(paragraph, span[0] - starts[position],
+                                                         span[1] - starts[position])
+                    comments.add(paragraph, lines, first_run, last_run)
+                else:
+                    comments.add(doc_paragraphs[indices[0]] if indices else doc_paragraphs[0], lines)
             
             # Save modified document
-            doc.save(output_path)
-            return output_path
+            doc.save(output)
+            return output
             
         except Exception as e:
             print(f"Error adding comments to DOCX: {e}")
             return None
     
-    def _create_pdf_review_report(self, file_path: str, red_flags: List[Dict], output_path: str):
+    def _create_pdf_review_report(self, filename: str, red_flags: List[Dict], output):
         """Create a separate review report for PDF files"""
         try:
             # Create a new Word document with the review
@@ -61,7 +105,7 @@ class CommentInserter:
             title = doc.add_heading(f'ADGM CORPORATE AGENT REVIEW REPORT', 0)
             
             # Add source file info
-            doc.add_paragraph(f"Original File: {os.path.basename(file_path)}")
+            doc.add_paragraph(f"Original File: {filename}")
             doc.add_paragraph(f"File Type: PDF Document")
             doc.add_paragraph(f"Issues Found: {len(red_flags)}")
             doc.add_paragraph("="*60)
@@ -95,9 +139,48 @@ class CommentInserter:
             doc.add_paragraph("Generated by ADGM Corporate Agent")
             
             # Save the review document
-            doc.save(output_path)
-            return output_path
+            doc.save(output)
+            return output
             
         except Exception as e:
             print(f"Error creating PDF review report: {e}")
             return None
+
+
+def _runs_for_span(paragraph, start: int, end: int) -> Tuple:
+    """First and last run overlapping [start, end) of the paragraph's normalized text.
+
+    Returns (None, None), meaning the whole paragraph, when the span cannot be
+    placed on runs.
+    """
+    text = paragraph.text
+    # Raw offset of every character kept by whitespace normalization
+    raw_offsets = []
+    previous_space = False
+    for offset in range(len(text) - len(text.lstrip()), len(text.rstrip())):
+        if text[offset].isspace():
+            if previous_space:
+                continue
+            previous_space = True
+        else:
+            previous_space = False
+        raw_offsets.append(offset)
+    
+    start = min(max(start, 0), len(raw_offsets) - 1)
+    end = min(max(end, start + 1), len(raw_offsets))
+    if start < 0:
+        return None, None
+    raw_start, raw_end = raw_offsets[start], raw_offsets[end - 1] + 1
+    
+    first_run = last_run = None
+    run_start = 0
+    for run in paragraph.runs:
+        run_end = run_start + len(run.text)
+        if run_end > raw_start and run_start < raw_end:
+            if first_run is None:
+                first_run = run
+            last_run = run
+        if run_start >= raw_end:
+            break
+        run_start = run_end
+    return first_run, last_run
@@ -1,39 +1,80 @@
 import json
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+from modules.red_flag_rules import RedFlagRules, load_red_flag_rules
+
+CHECKLISTS_PATH = 'templates/checklists.json'
+
+def load_checklists(path: str = CHECKLISTS_PATH) -> Dict:
+    """Load the ADGM process checklists"""
+    with open(path, 'r') as f:
+        return json.load(f)
 
 class DocumentChecker:
-    def __init__(self):
-        with open('templates/checklists.json', 'r') as f:
-            self.checklists = json.load(f)
-        
+    def __init__(self, checklists: Optional[Dict] = None, rules: Optional[Dict] = None):
+        # Callers may inject an already loaded (shared) checklist object
+        self.checklists = checklists if checklists is not None else load_checklists()
+        # Red flag rules from templates/red_flag_rules.json, compiled once
+        self.red_flag_rules = RedFlagRules(rules if rules is not None else load_red_flag_rules())
+        self._compile_checklists()
+        
+    def _compile_checklists(self):
+        """Index the checklists: document type -> bitmask of processes that accept it"""
+        self._processes = list(self.checklists)
+        self._required_documents = {}
+        self._doc_type_processes = {}
+        
+        for bit, (process, requirements) in enumerate(self.checklists.items()):
+            required_docs = requirements.get('required_documents', [])
+            optional_docs = requirements.get('optional_documents', [])
+            self._required_documents[process] = list(required_docs)
+            for doc_type in set(required_docs) | set(optional_docs):
+                self._doc_type_processes[doc_type] = self._doc_type_processes.get(doc_type, 0) | (1 << bit)
+    
+    def _process_matches(self, documents: List[Dict]) -> Tuple[Dict[int, int], int]:
+        """Matched document count per process index, and the number of typed documents"""
+        type_counts = Counter(doc.get('document_type', 'unknown') for doc in documents)
+        type_counts.pop('unknown', None)
+        
+        matches = {}
+        for doc_type, count in type_counts.items():
+            mask = self._doc_type_processes.get(doc_type, 0)
+            while mask:
+                bit = mask & -mask
+                index = bit.bit_length() - 1
+                matches[index] = matches.get(index, 0) + count
+                mask ^= bit
+        return matches, sum(type_counts.values())
+    
     def identify_process(self, documents: List[Dict]) -> str:
         """Identify which legal process user is attempting"""
-        doc_types = [doc.get('document_type', 'unknown') for doc in documents]
-        
-        # Remove unknown types
-        valid_doc_types = [dt for dt in doc_types if dt != 'unknown']
-        
-        if not valid_doc_types:
+        matches, _ = self._process_matches(documents)
+        if not matches:
             return 'unknown'
         
-        # Check against known processes
-        best_match = 'unknown'
-        highest_score = 0
-        
-        for process, requirements in self.checklists.items():
-            required_docs = requirements.get('required_documents', [])
-            optional_docs = requirements.get('optional_documents', [])
-            all_docs = required_docs + optional_docs
-            
-            # Calculate match score
-            matches = sum(1 for doc_type in valid_doc_types if doc_type in all_docs)
-            score = matches / len(valid_doc_types) if valid_doc_types else 0
-            
-            if score > highest_score and matches > 0:
-                highest_score = score
-                best_match = process
-        
-        return best_match
+        # Most matching documents wins; ties go to the process listed first
+        best = min(matches, key=lambda index: (-matches[index], index))
+        return self._processes[best]
+    
+    def suggest_processes(self, documents: List[Dict], top_n: int = 3) -> List[Dict]:
+        """Rank the processes the uploaded documents fit best, most likely first"""
+        matches, typed_documents = self._process_matches(documents)
+        uploaded_types = {doc.get('document_type', 'unknown') for doc in documents}
+        
+        suggestions = []
+        for index in sorted(matches, key=lambda index: (-matches[index], index))[:top_n]:
+            process = self._processes[index]
+            required_docs = self._required_documents[process]
+            missing_docs = [doc for doc in required_docs if doc not in uploaded_types]
+            suggestions.append({
+                'process': process,
+                'name': self.checklists[process].get('name', process),
+                'score': matches[index] / typed_documents,
+                'completion_rate': (len(required_docs) - len(missing_docs)) / len(required_docs) if required_docs else 0.0,
+                'missing_documents': missing_docs
+            })
+        return suggestions
     
     def check_completeness(self, documents: List[Dict], process: str) -> Dict:
         """Check if all required documents are present"""
@@ -46,18 +87,11 @@ class DocumentChecker:
                 'completion_rate': 0.0
             }
         
-        requirements = self.checklists[process]
-        uploaded_types = [doc.get('document_type', 'unknown') for doc in documents]
-        
-        # Remove unknown types for analysis
-        valid_uploaded_types = [dt for dt in uploaded_types if dt != 'unknown']
-        
-        required_docs = requirements.get('required_documents', [])
-        missing_docs = []
+        uploaded_types = {doc.get('document_type', 'unknown') for doc in documents}
+        uploaded_types.discard('unknown')
         
-        for required_doc in required_docs:
-            if required_doc not in valid_uploaded_types:
-                missing_docs.append(required_doc)
+        required_docs = self._required_documents[process]
+        missing_docs = [doc for doc in required_docs if doc not in uploaded_types]
         
         completion_rate = 0.0
         if required_docs:
@@ -73,86 +107,50 @@ class DocumentChecker:
         }
     
     def detect_red_flags(self, document: Dict) -> List[Dict]:
-        """Detect legal red flags in document"""
+        """Detect legal red flags in document.
+        
+        Each flag's span is a (start, end) range of document['content']. Its
+        paragraph_index is the index in the DOCX's doc.paragraphs (empty
+        paragraphs included) when the parse result has paragraph_anchors, and
+        otherwise the index of the non-empty line of extracted text (PDFs).
+        """
         red_flags = []
-        content = document.get('content', '').lower()
+        content = document.get('content', '')
         
         if not content:
             red_flags.append({
                 'type': 'empty_document',
                 'severity': 'high',
                 'message': 'Document appears to be empty or unreadable',
-                'suggestion': 'Please check the document format and content'
+                'suggestion': 'Please check the document format and content',
+                'span': [0, 0],
+                'paragraph_index': 0
             })
             return red_flags
         
-        # Check jurisdiction
-        has_adgm = 'adgm' in content or 'abu dhabi global market' in content
-        has_other_jurisdiction = any(term in content for term in [
-            'uae federal', 'dubai courts', 'dubai international financial centre',
-            'difc', 'emirates', 'sharjah', 'federal law'
-        ])
-        
-        if not has_adgm and has_other_jurisdiction:
-            red_flags.append({
-                'type': 'jurisdiction_error',
-                'severity': 'high',
-                'message': 'Document references non-ADGM jurisdiction',
-                'suggestion': 'Update jurisdiction clause to specify ADGM Courts and regulations'
-            })
-        elif not has_adgm:
-            red_flags.append({
-                'type': 'missing_jurisdiction',
-                'severity': 'medium',
-                'message': 'No clear ADGM jurisdiction specified',
-                'suggestion': 'Add explicit reference to ADGM jurisdiction and governing law'
-            })
-        
-        # Check for signature sections
-        if not any(term in content for term in ['signature', 'signed', 'executed', 'witness']):
-            red_flags.append({
-                'type': 'missing_signature',
-                'severity': 'medium',
-                'message': 'No signature section found',
-                'suggestion': 'Add proper signatory section with witness requirements'
-            })
-        
-        # Check for essential clauses based on document type
-        doc_type = document.get('document_type', 'unknown')
-        
-        if doc_type == 'articles_of_association':
-            if 'share capital' not in content and 'capital' not in content:
-                red_flags.append({
-                    'type': 'missing_clause',
-                    'severity': 'high',
-                    'message': 'Share capital clause appears to be missing',
-                    'suggestion': 'Include detailed share capital structure and nominal value'
-                })
-                
-            if 'registered office' not in content:
-                red_flags.append({
-                    'type': 'missing_clause',
-                    'severity': 'high',
-                    'message': 'Registered office clause appears to be missing',
-                    'suggestion': 'Include registered office address within ADGM'
-                })
-        
-        elif doc_type == 'board_resolution':
-            if not any(term in content for term in ['resolved', 'resolution', 'decided']):
-                red_flags.append({
-                    'type': 'missing_clause',
-                    'severity': 'medium',
-                    'message': 'Resolution language appears to be missing',
-                    'suggestion': 'Include proper resolution language (e.g., "IT WAS RESOLVED THAT...")'
-                })
-        
-        # Check for dates
-        if not any(term in content for term in ['date', '202', '2025', 'day of']):
-            red_flags.append({
-                'type': 'missing_date',
-                'severity': 'low',
-                'message': 'No date found in document',
-                'suggestion': 'Include execution date for legal validity'
-            })
+        # Jurisdiction, signature, clause and date rules, evaluated in one pass over the text
+        lowered = content.lower()
+        offsets = document.get('paragraph_offsets')
+        # Lowercasing can lengthen the text ('İ' becomes 'i̇'), shifting every later position
+        positions = _lowered_positions(content) if len(lowered) != len(content) else None
+        if positions is not None and offsets is not None:
+            offsets = [positions[offset] for offset in offsets]
+        red_flags.extend(self.red_flag_rules.evaluate(lowered, document.get('document_type', 'unknown'), offsets))
+        
+        anchors = document.get('paragraph_anchors')
+        for flag in red_flags:
+            if positions is not None:
+                start, end = flag['span']
+                flag['span'] = [bisect_right(positions, start) - 1, bisect_left(positions, end)]
+            if anchors:
+                flag['paragraph_index'] = anchors[flag['paragraph_index']]
         
         return red_flags
+
+
+def _lowered_positions(text: str) -> List[int]:
+    """Position in text.lower() of every offset of text, including its end"""
+    positions = [0]
+    for character in text:
+        positions.append(positions[-1] + len(character.lower()))
+    return positions
@@ -1,12 +1,138 @@
 from docx import Document
+from docx.document import Document as DocxDocument
+import io
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import PyPDF2
 import pdfplumber
 import os
+from modules.keyword_matcher import KeywordMatcher
+
+# Bump whenever extraction or analysis output changes so cached results are invalidated
+PARSER_VERSION = '5'
+
+# Common labels for legal document sections, in priority order per section.
+# Labels must not share a literal prefix: at any position only one can match.
+SECTION_LABELS = {
+    'company_name': [
+        r'company name',
+        r'name of the company',
+        r'proposed company name'
+    ],
+    'jurisdiction': [
+        r'jurisdiction',
+        r'governing law',
+        r'courts?'
+    ],
+    'registered_office': [
+        r'registered office',
+        r'office address'
+    ],
+    'share_capital': [
+        r'share capital',
+        r'capital',
+        r'nominal value'
+    ],
+    'directors': [
+        r'director[s]?',
+        r'appointment of director[s]?'
+    ]
+}
+
+# Only the first SECTION_SCAN_LIMIT characters are searched for section labels
+SECTION_SCAN_LIMIT = 256 * 1024
+
+# A value must end at a '.' or newline within this many characters. Bounding the
+# value keeps every candidate match linear, so text without terminators cannot
+# trigger the quadratic backtracking of an unbounded lazy group.
+SECTION_VALUE_LIMIT = 2000
+
+def _compile_section_regex():
+    """Merge every section label into one zero-width alternation"""
+    alternatives = []
+    group_sections = {}
+    for section, labels in SECTION_LABELS.items():
+        for priority, label in enumerate(labels):
+            index = len(alternatives)
+            group_sections[f'v{index}'] = (section, priority)
+            group_sections[f'e{index}'] = (section, priority)
+            # Value after the whole separator run, or an empty value when only the
+            # separator itself reaches a newline (e.g. "Director:\n")
+            alternatives.append(
+                rf'{label}(?:[:\s]+(?![:\s])(?P<v{index}>[^\n.]{{0,{SECTION_VALUE_LIMIT}}})[\n.]'
+                rf'|(?P<e{index}>[:\s]+)\n)'
+            )
+    # The lookahead lets labels nested inside other matches still be found
+    return re.compile('(?=(?:' + '|'.join(alternatives) + '))', re.IGNORECASE), group_sections
+
+_SECTION_REGEX, _SECTION_GROUPS = _compile_section_regex()
+
+# Optional result key holding the live python-docx Document of a parsed DOCX, so
+# the comment inserter can reuse it instead of parsing the file again. It cannot
+# be pickled or cached: it never leaves the process that parsed it.
+DOCUMENT_HANDLE = 'document_handle'
+
+# Parser reused by extract_text_from_bytes within one (worker) process
+_extraction_parser = None
+
+def _as_stream(source):
+    """Wrap raw file bytes in a stream; paths are passed through"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _read_bytes(source) -> bytes:
+    """Raw file bytes of a path or of bytes already in memory"""
+    if isinstance(source, bytes):
+        return source
+    with open(source, 'rb') as f:
+        return f.read()
+
+class _PyPDF2Pages:
+    """Lazily opened PyPDF2 reader used as a per-page fallback"""
+    
+    def __init__(self, source):
+        self.source = source  # Path or binary file-like object
+        self._file = None
+        self._reader = None
+        self._failed = False
+    
+    def _open(self):
+        if self._reader is None and not self._failed:
+            try:
+                if hasattr(self.source, 'read'):
+                    # Caller owns the stream; pdfplumber may have moved its position
+                    self.source.seek(0)
+                    self._reader = PyPDF2.PdfReader(self.source)
+                else:
+                    self._file = open(self.source, 'rb')
+                    self._reader = PyPDF2.PdfReader(self._file)
+            except Exception as e:
+                print(f"PyPDF2 failed: {e}")
+                self._failed = True
+                self.close()
+        return self._reader
+    
+    def page_count(self) -> int:
+        reader = self._open()
+        return len(reader.pages) if reader is not None else 0
+    
+    def page_text(self, page_number: int) -> str:
+        reader = self._open()
+        if reader is None or page_number >= len(reader.pages):
+            return ''
+        try:
+            return reader.pages[page_number].extract_text() or ''
+        except Exception as e:
+            print(f"PyPDF2 failed on page {page_number + 1}: {e}")
+            return ''
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 class DocumentParser:
-    def __init__(self):
+    def __init__(self, cache=None):
+        self.cache = cache  # Optional ParseCache shared across calls
         self.document_types = {
             'articles_of_association': [
                 'articles of association', 'aoa', 'articles', 
@@ -49,20 +175,41 @@ class DocumentParser:
                 'commercial agreement', 'service agreement', 'consultancy agreement'
             ]
         }
+        
+        # Compile every type keyword once so scoring needs a single pass over the text
+        self._keyword_matcher = KeywordMatcher(
+            keyword.lower() for keywords in self.document_types.values() for keyword in keywords
+        )
     
-    def parse_document(self, file_path: str) -> Dict:
-        """Parse document (docx or pdf) and extract information"""
+    def parse_document(self, file_path: str, keep_document: bool = False) -> Dict:
+        """Parse document (docx or pdf) and extract information.
+        
+        With keep_document, a DOCX result also carries its python-docx Document
+        under DOCUMENT_HANDLE; on a cache hit the Document is opened from the
+        file bytes without extracting or analysing the text again.
+        """
+        return self._parse(file_path, os.path.basename(file_path), keep_document)
+    
+    def parse_bytes(self, data: bytes, filename: str, keep_document: bool = False) -> Dict:
+        """Parse an in-memory document; filename supplies the name and format"""
+        return self._parse(bytes(data), os.path.basename(filename), keep_document)
+    
+    def _parse(self, source, filename: str, keep_document: bool = False) -> Dict:
+        """Parse a path or raw file bytes"""
         try:
-            file_extension = os.path.splitext(file_path)[1].lower()
+            file_extension = os.path.splitext(filename)[1].lower()
+            
+            if file_extension in ('.docx', '.pdf') and self.cache is not None:
+                return self._parse_cached(source, filename, keep_document)
             
             if file_extension == '.docx':
-                return self._parse_docx(file_path)
+                return self._parse_docx(_as_stream(source), filename, keep_document)
             elif file_extension == '.pdf':
-                return self._parse_pdf(file_path)
+                return self._parse_pdf(_as_stream(source), filename)
             else:
                 return {
                     'error': f'Unsupported file format: {file_extension}',
-                    'filename': os.path.basename(file_path),
+                    'filename': filename,
                     'document_type': 'unknown',
                     'content': '',
                     'sections': {},
@@ -73,7 +220,7 @@ class DocumentParser:
         except Exception as e:
             return {
                 'error': f"Failed to parse document: {str(e)}",
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'document_type': 'unknown',
                 'content': '',
                 'sections': {},
@@ -81,22 +228,60 @@ class DocumentParser:
                 'paragraph_count': 0
             }
     
-    def _parse_docx(self, file_path: str) -> Dict:
-        """Parse DOCX document"""
-        doc = Document(file_path)
+    def lookup(self, source, filename: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Look a path or raw file bytes up in the cache without parsing it.
         
-        # Extract text content
-        full_text = []
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                full_text.append(paragraph.text.strip())
+        Returns (cache key, cached parse result or None). The key is None when
+        the document cannot be cached; otherwise pass it to remember() once the
+        document has been parsed elsewhere, e.g. in a worker process.
+        """
+        if self.cache is None or os.path.splitext(filename)[1].lower() not in ('.docx', '.pdf'):
+            return None, None
+        data = _read_bytes(source)
+        key = self.cache.make_key(data, PARSER_VERSION)
+        return key, self._cached_result(key, filename)
+    
+    def remember(self, key: str, result: Dict):
+        """Cache a parse result under the key returned by lookup()"""
+        # Failed extractions are not cached so a fixed environment can retry them
+        if 'error' not in result:
+            self.cache.put(key, strip_document_handle(dict(result)))
+    
+    def _cached_result(self, key: str, filename: str) -> Optional[Dict]:
+        result = self.cache.get(key)
+        if result is not None:
+            result['filename'] = filename
+        return result
+    
+    def _parse_cached(self, source, filename: str, keep_document: bool = False) -> Dict:
+        """Parse through the cache so unchanged re-uploads skip extraction"""
+        data = _read_bytes(source)
+        key = self.cache.make_key(data, PARSER_VERSION)
         
-        content = '\n'.join(full_text)
+        is_docx = os.path.splitext(filename)[1].lower() == '.docx'
+        result = self._cached_result(key, filename)
+        if result is None:
+            # Parse the bytes already in memory instead of reading the file again
+            if is_docx:
+                result = self._parse_docx(io.BytesIO(data), filename, keep_document)
+            else:
+                result = self._parse_pdf(io.BytesIO(data), filename)
+            self.remember(key, result)
+        elif keep_document and is_docx:
+            result[DOCUMENT_HANDLE] = Document(io.BytesIO(data))
+        
+        result['filename'] = filename
+        return result
+    
+    def _parse_docx(self, source, filename: str, keep_document: bool = False) -> Dict:
+        """Parse DOCX document"""
+        doc, paragraph_texts, anchors = self._read_docx(source)
+        content = '\n'.join(paragraph_texts)
         
         if not content.strip():
             return {
                 'error': 'Document appears to be empty or unreadable',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'document_type': 'unknown',
                 'content': '',
                 'sections': {},
@@ -104,42 +289,50 @@ class DocumentParser:
                 'paragraph_count': 0
             }
         
-        return self._analyze_content(content, file_path)
+        result = self._analyze_content(content, filename, paragraph_texts)
+        result['paragraph_anchors'] = anchors
+        if keep_document:
+            result[DOCUMENT_HANDLE] = doc
+        return result
     
-    def _parse_pdf(self, file_path: str) -> Dict:
-        """Parse PDF document using multiple methods for better extraction"""
-        content = ""
+    def extract_text(self, source, file_extension: str) -> str:
+        """Extract raw text from a DOCX or PDF path or binary file-like object"""
+        if file_extension == '.docx':
+            return self.extract_docx_text(source)
+        if file_extension == '.pdf':
+            return '\n'.join(self.iter_pdf_pages(source))
+        raise ValueError(f'Unsupported file format: {file_extension}')
+    
+    def extract_docx_text(self, source) -> str:
+        """Extract non-empty paragraph text from a DOCX path or file-like object"""
+        return '\n'.join(self._read_docx(source)[1])
+    
+    def _read_docx(self, source) -> Tuple[DocxDocument, List[str], List[int]]:
+        """Return the parsed Document, its non-empty paragraph texts and their anchors.
         
-        # Method 1: Try pdfplumber (better for complex layouts)
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                text_parts = []
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                content = '\n'.join(text_parts)
-        except Exception as e:
-            print(f"pdfplumber failed: {e}")
-            
-        # Method 2: Fallback to PyPDF2 if pdfplumber fails
-        if not content.strip():
-            try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text_parts = []
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                    content = '\n'.join(text_parts)
-            except Exception as e:
-                print(f"PyPDF2 failed: {e}")
+        Anchors are the doc.paragraphs indices of those paragraphs.
+        """
+        doc = Document(source)
+        
+        # Extract text content
+        full_text = []
+        anchors = []
+        for index, paragraph in enumerate(doc.paragraphs):
+            text = paragraph.text.strip()
+            if text:
+                full_text.append(text)
+                anchors.append(index)
+        
+        return doc, full_text, anchors
+    
+    def _parse_pdf(self, source, filename: str) -> Dict:
+        """Parse PDF document using multiple methods for better extraction"""
+        content = '\n'.join(self.iter_pdf_pages(source))
         
         if not content.strip():
             return {
                 'error': 'Could not extract text from PDF. The file may be scanned or corrupted.',
-                'filename': os.path.basename(file_path),
+                'filename': filename,
                 'document_type': 'unknown',
                 'content': '',
                 'sections': {},
@@ -147,10 +340,70 @@ class DocumentParser:
                 'paragraph_count': 0
             }
         
-        return self._analyze_content(content, file_path)
+        return self._analyze_content(content, filename)
     
-    def _analyze_content(self, content: str, file_path: str) -> Dict:
-        """Analyze extracted content"""
+    def iter_pdf_pages(self, source) -> Iterator[str]:
+        """Yield PDF page text one page at a time, falling back to PyPDF2 per page.
+        
+        source is a path or a seekable binary file-like object (left open).
+        Pages pdfplumber cannot reach at all, because opening the file or
+        walking its page tree fails, are read with PyPDF2 instead. Pages are
+        read only as they are consumed, so a caller that stops early never
+        extracts the rest.
+        """
+        fallback = _PyPDF2Pages(source)
+        # Pages handled so far; everything from here on is left to PyPDF2
+        next_page = 0
+        try:
+            # Method 1: Try pdfplumber (better for complex layouts)
+            try:
+                pdf = pdfplumber.open(source)
+            except Exception as e:
+                print(f"pdfplumber failed: {e}")
+                pdf = None
+            
+            if pdf is not None:
+                with pdf:
+                    try:
+                        for page in pdf.pages:
+                            try:
+                                page_text = page.extract_text()
+                            except Exception as e:
+                                print(f"pdfplumber failed on page {next_page + 1}: {e}")
+                                page_text = ''
+                            finally:
+                                # Release the page's parsed layout so memory stays flat
+                                page.flush_cache()
+                            
+                            # Method 2: Fall back to PyPDF2 for pages pdfplumber cannot read
+                            if not page_text or not page_text.strip():
+                                page_text = fallback.page_text(next_page)
+                            
+                            next_page += 1
+                            if page_text:
+                                yield page_text
+                        return
+                    except Exception as e:
+                        print(f"pdfplumber failed after page {next_page}: {e}")
+            
+            # Method 2: PyPDF2 for every page pdfplumber could not reach
+            for page_number in range(next_page, fallback.page_count()):
+                page_text = fallback.page_text(page_number)
+                if page_text:
+                    yield page_text
+        finally:
+            fallback.close()
+    
+    def _analyze_content(self, content: str, filename: str, paragraph_texts: Optional[List[str]] = None) -> Dict:
+        """Analyze extracted content.
+        
+        paragraph_texts are the paragraphs content was joined from (default: its
+        lines); their start offsets in the normalized content are kept as
+        paragraph_offsets so positions map back to paragraphs by bisection.
+        """
+        paragraph_offsets = build_paragraph_index(
+            paragraph_texts if paragraph_texts is not None else content.split('\n'))[0]
+        
         # Clean up content
         content = re.sub(r'\s+', ' ', content)  # Normalize whitespace
         content = content.strip()
@@ -165,26 +418,26 @@ class DocumentParser:
         paragraphs = [p.strip() for p in re.split(r'[\n]{2,}|\.[\s]+[A-Z]', content) if p.strip()]
         
         return {
-            'filename': os.path.basename(file_path),
+            'filename': filename,
             'document_type': doc_type,
             'content': content,
             'sections': sections,
             'word_count': len(content.split()),
-            'paragraph_count': len(paragraphs)
+            'paragraph_count': len(paragraphs),
+            'paragraph_offsets': paragraph_offsets
         }
     
     def identify_document_type(self, content: str) -> str:
         """Identify document type based on content"""
-        content_lower = content.lower()
+        keyword_counts = self._keyword_matcher.count(content.lower())
         
         # Score each document type
         scores = {}
         for doc_type, keywords in self.document_types.items():
             score = 0
             for keyword in keywords:
-                # Count occurrences of each keyword
-                count = content_lower.count(keyword.lower())
-                score += count * len(keyword.split())  # Weight longer phrases more
+                # Weight longer phrases more
+                score += keyword_counts[keyword.lower()] * len(keyword.split())
             scores[doc_type] = score
         
         # Return the document type with highest score
@@ -195,40 +448,72 @@ class DocumentParser:
     
     def extract_sections(self, content: str) -> Dict:
         """Extract common legal document sections"""
-        sections = {}
-        
-        # Common patterns for legal documents
-        patterns = {
-            'company_name': [
-                r'company name[:\s]+(.*?)(?:\n|\.)',
-                r'name of the company[:\s]+(.*?)(?:\n|\.)',
-                r'proposed company name[:\s]+(.*?)(?:\n|\.)'
-            ],
-            'jurisdiction': [
-                r'jurisdiction[:\s]+(.*?)(?:\n|\.)',
-                r'governing law[:\s]+(.*?)(?:\n|\.)',
-                r'courts?[:\s]+(.*?)(?:\n|\.)'
-            ],
-            'registered_office': [
-                r'registered office[:\s]+(.*?)(?:\n|\.)',
-                r'office address[:\s]+(.*?)(?:\n|\.)'
-            ],
-            'share_capital': [
-                r'share capital[:\s]+(.*?)(?:\n|\.)',
-                r'capital[:\s]+(.*?)(?:\n|\.)',
-                r'nominal value[:\s]+(.*?)(?:\n|\.)'
-            ],
-            'directors': [
-                r'director[s]?[:\s]+(.*?)(?:\n|\.)',
-                r'appointment of director[s]?[:\s]+(.*?)(?:\n|\.)'
-            ]
-        }
+        # Best (lowest priority number) match found so far for each section
+        found = {}
         
-        for section, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-                if match:
-                    sections[section] = match.group(1).strip()[:200]  # Limit length
+        for match in _SECTION_REGEX.finditer(content, 0, SECTION_SCAN_LIMIT):
+            section, priority = _SECTION_GROUPS[match.lastgroup]
+            if section not in found or priority < found[section][0]:
+                value = match.group(match.lastgroup) if match.lastgroup[0] == 'v' else ''
+                found[section] = (priority, value)
+                
+                # Stop early once every section has its highest-priority label
+                if len(found) == len(SECTION_LABELS) and all(p == 0 for p, _ in found.values()):
                     break
         
+        sections = {}
+        for section in SECTION_LABELS:
+            if section in found:
+                sections[section] = found[section][1].strip()[:200]  # Limit length
+        
         return sections
+
+
+def extract_text_from_bytes(data: bytes, file_extension: str) -> str:
+    """Extract raw text from in-memory DOCX/PDF bytes (top-level so worker pools can pickle it)"""
+    global _extraction_parser
+    if _extraction_parser is None:
+        _extraction_parser = DocumentParser()
+    return _extraction_parser.extract_text(io.BytesIO(data), file_extension)
+
+
+def normalize_paragraph(text: str) -> str:
+    """Paragraph text as it appears in normalized content"""
+    return re.sub(r'\s+', ' ', text.strip())
+
+
+def build_paragraph_index(paragraph_texts: List[str]) -> Tuple[List[int], List[int]]:
+    """Return (content start offsets, paragraph indices) of the non-empty paragraphs.
+
+    _analyze_content collapses whitespace, so the stripped paragraphs joined by
+    newlines become the normalized paragraphs joined by single spaces. Bisecting
+    the starts maps a content offset to the paragraph that contains it.
+    """
+    starts = []
+    indices = []
+    offset = 0
+    for index, text in enumerate(paragraph_texts):
+        text = normalize_paragraph(text)
+        if text:
+            starts.append(offset)
+            indices.append(index)
+            offset += len(text) + 1
+    return starts, indices
+
+
+def paragraph_table(result: Dict) -> Optional[Tuple[List[int], List[int]]]:
+    """(paragraph_offsets, paragraph_anchors) of a DOCX parse result, if it has them"""
+    if 'paragraph_offsets' in result and 'paragraph_anchors' in result:
+        return result['paragraph_offsets'], result['paragraph_anchors']
+    return None
+
+
+def open_document(source) -> DocxDocument:
+    """Open a DOCX path or raw file bytes as a python-docx Document"""
+    return Document(_as_stream(source))
+
+
+def strip_document_handle(result: Dict) -> Dict:
+    """Drop the live Document from a parse result before it is cached or pickled"""
+    result.pop(DOCUMENT_HANDLE, None)
+    return result
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from typing import List
+
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import XmlPart
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+COMMENTS_PARTNAME = '/word/comments.xml'
+
+
+class DocxComments:
+    """Native Word comments (w:comment) for a python-docx Document.
+
+    Builds the word/comments.xml part directly and marks each comment's range in
+    the body with commentRangeStart/commentRangeEnd plus a commentReference run.
+    Existing comments in the document are kept.
+    """
+
+    def __init__(self, document, author: str = 'ADGM Corporate Agent', initials: str = 'ADGM'):
+        self.document = document
+        self.author = author
+        self.initials = initials
+        # w:date is read as UTC
+        self.date = datetime.now(timezone.utc).replace(microsecond=0, tzinfo=None).isoformat() + 'Z'
+        self._comments = self._comments_element()
+        ids = [int(comment.get(qn('w:id'))) for comment in self._comments.iterchildren(qn('w:comment'))]
+        self._next_id = max(ids) + 1 if ids else 0
+
+    def _comments_element(self):
+        document_part = self.document.part
+        for rId, rel in list(document_part.rels.items()):
+            if rel.reltype != RT.COMMENTS or rel.is_external:
+                continue
+            part = rel.target_part
+            if isinstance(part, XmlPart):
+                return part.element
+            # python-docx 0.8.11 has no comments support and loads the part as
+            # an opaque blob; swap in an XmlPart of it for this document only,
+            # so new comments serialize alongside the existing ones
+            element = parse_xml(part.blob)
+            document_part.drop_rel(rId)
+            document_part.relate_to(XmlPart(part.partname, CT.WML_COMMENTS, element, part.package), RT.COMMENTS)
+            return element
+
+        element = parse_xml(f'<w:comments {nsdecls("w")}/>')
+        part = XmlPart(PackURI(COMMENTS_PARTNAME), CT.WML_COMMENTS, element, document_part.package)
+        document_part.relate_to(part, RT.COMMENTS)
+        return element
+
+    def add(self, paragraph, lines: List[str], first_run=None, last_run=None) -> int:
+        """Attach a comment to paragraph, spanning first_run..last_run (default: all its runs).
+
+        The first line is shown bold. Returns the comment id.
+        """
+        comment_id = str(self._next_id)
+        self._next_id += 1
+
+        comment = OxmlElement('w:comment')
+        comment.set(qn('w:id'), comment_id)
+        comment.set(qn('w:author'), self.author)
+        comment.set(qn('w:date'), self.date)
+        comment.set(qn('w:initials'), self.initials)
+        for index, line in enumerate(lines):
+            comment.append(_text_paragraph(line, bold=index == 0))
+        self._comments.append(comment)
+
+        runs = paragraph.runs
+        first = (first_run or runs[0])._r if runs else None
+        last = (last_run or runs[-1])._r if runs else None
+
+        range_start = OxmlElement('w:commentRangeStart')
+        range_start.set(qn('w:id'), comment_id)
+        range_end = OxmlElement('w:commentRangeEnd')
+        range_end.set(qn('w:id'), comment_id)
+        reference_run = OxmlElement('w:r')
+        reference = OxmlElement('w:commentReference')
+        reference.set(qn('w:id'), comment_id)
+        reference_run.append(reference)
+
+        if first is None:
+            # Empty paragraph: a point comment at its end
+            paragraph._p.append(range_start)
+            paragraph._p.append(range_end)
+        else:
+            first.addprevious(range_start)
+            last.addnext(range_end)
+        range_end.addnext(reference_run)
+        return int(comment_id)
+
+
+def _text_paragraph(text: str, bold: bool = False):
+    paragraph = OxmlElement('w:p')
+    run = OxmlElement('w:r')
+    if bold:
+        properties = OxmlElement('w:rPr')
+        properties.append(OxmlElement('w:b'))
+        run.append(properties)
+    text_element = OxmlElement('w:t')
+    text_element.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+    text_element.text = text
+    run.append(text_element)
+    paragraph.append(run)
+    return paragraph
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: one writing process per cache directory
+    fcntl = None
+
+VECTORS_FILENAME = 'embeddings.f32'
+KEYS_FILENAME = 'keys.txt'
+META_FILENAME = 'meta.json'
+LOCK_FILENAME = 'lock'
+
+
+class EmbeddingCache:
+    """Persistent text-hash -> embedding cache backed by a memory-mapped float32 file.
+
+    Vectors are appended as raw float32 rows to embeddings.f32 and their keys,
+    one per line, to keys.txt; row i belongs to line i. Rows are always written
+    before keys, so a crash can leave an unreferenced trailing row but never a
+    key without its vector. Each embedding model gets its own directory, and
+    meta.json records the model name and dimension so a mismatched cache is
+    discarded instead of mixing vector spaces.
+
+    Several processes (a CLI build next to the app, say) may share a cache:
+    loading and appending hold an exclusive lock on the directory's lock
+    file, and an append first picks up the rows other processes added.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.model_name = model_name
+        slug = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+        self.directory = os.path.join(cache_dir, slug)
+        self.dimension = None
+        self.hits = 0
+        self.misses = 0
+        self._rows = {}       # key -> row number
+        self._vectors = None  # read-only memmap over the committed rows
+        self._row_count = 0   # rows in embeddings.f32, one per line of keys.txt
+        self._keys_size = 0   # bytes of keys.txt reflected in _rows
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._file_lock():
+            self._load()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Cache key for a chunk of text"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+    def get_many(self, keys: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """Look up keys; return ({position: vector} for hits, positions of misses)"""
+        found = {}
+        missing = []
+        with self._lock:
+            for position, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append(position)
+                else:
+                    found[position] = np.array(self._vectors[row])
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Append new vectors (rows of an (n, d) array) under their keys"""
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        with self._lock, self._file_lock():
+            # Another process may have appended since this one last read the files
+            if self._file_size(KEYS_FILENAME) != self._keys_size:
+                self._load()
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                self._write_meta()
+            if vectors.shape[1] != self.dimension:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match "
+                                 f"the cache's {self.dimension} for {self.model_name}")
+
+            # Keys not cached yet, each once even if repeated within the batch
+            new = list({key: i for i, key in enumerate(keys) if key not in self._rows}.items())
+            if not new:
+                return
+
+            with open(self._path(VECTORS_FILENAME), 'ab') as f:
+                f.write(vectors[[i for _, i in new]].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            key_lines = ''.join(f"{key}\n" for key, _ in new)
+            with open(self._path(KEYS_FILENAME), 'a', encoding='ascii') as f:
+                f.write(key_lines)
+            self._keys_size += len(key_lines)
+
+            for key, _ in new:
+                self._rows[key] = self._row_count
+                self._row_count += 1
+            self._map_vectors()
+
+    def stats(self) -> Dict:
+        """Return entry count and hit/miss statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._rows),
+                'dimension': self.dimension,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def _file_size(self, filename: str) -> int:
+        try:
+            return os.path.getsize(self._path(filename))
+        except FileNotFoundError:
+            return 0
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the cache directory's lock, shared with other processes"""
+        with open(self._path(LOCK_FILENAME), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Read the key list and map the vectors, resetting an incompatible cache"""
+        try:
+            with open(self._path(META_FILENAME), 'r') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            meta = None
+
+        if meta is None or meta.get('model_name') != self.model_name:
+            self._reset()
+            return
+
+        self.dimension = meta['dimension']
+        try:
+            with open(self._path(KEYS_FILENAME), 'r', encoding='ascii') as f:
+                raw_keys = f.read()
+            vector_bytes = os.path.getsize(self._path(VECTORS_FILENAME))
+        except (FileNotFoundError, UnicodeDecodeError):
+            self._reset()
+            return
+
+        # A key line without its newline was cut short by a crash
+        keys = raw_keys.split('\n')[:-1]
+        row_bytes = 4 * self.dimension
+        # Only rows that are fully written and have a key are usable
+        row_count = min(len(keys), vector_bytes // row_bytes)
+
+        if row_count != len(keys) or not raw_keys.endswith('\n') or vector_bytes != row_count * row_bytes:
+            # Trim both files back to the consistent prefix before appending again
+            os.truncate(self._path(VECTORS_FILENAME), row_count * row_bytes)
+            with open(self._path(KEYS_FILENAME), 'w', encoding='ascii') as f:
+                f.write(''.join(f"{key}\n" for key in keys[:row_count]))
+
+        self._rows = {key: row for row, key in enumerate(keys[:row_count])}
+        self._row_count = row_count
+        self._keys_size = self._file_size(KEYS_FILENAME)
+        self._map_vectors()
+
+    def _reset(self):
+        for filename in (VECTORS_FILENAME, KEYS_FILENAME, META_FILENAME):
+            try:
+                os.unlink(self._path(filename))
+            except FileNotFoundError:
+                pass
+        self.dimension = None
+        self._rows = {}
+        self._vectors = None
+        self._row_count = 0
+        self._keys_size = 0
+
+    def _write_meta(self):
+        path = self._path(META_FILENAME)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump({'model_name': self.model_name, 'dimension': self.dimension}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _map_vectors(self):
+        if self._row_count:
+            self._vectors = np.memmap(self._path(VECTORS_FILENAME), dtype='float32', mode='r',
+                                      shape=(self._row_count, self.dimension))
+        else:
+            self._vectors = None
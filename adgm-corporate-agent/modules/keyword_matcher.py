@@ -0,0 +1,87 @@
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional accelerator
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Compile a set of literal keywords once and find all of them in a single pass.
+
+    Counting follows ``str.count`` semantics for every keyword: occurrences of the
+    same keyword never overlap, while occurrences of different keywords may.
+    Uses an Aho-Corasick automaton when ``pyahocorasick`` is installed and falls
+    back to a single lookahead regex otherwise.
+    """
+
+    def __init__(self, keywords: Iterable[str], backend: Optional[str] = None):
+        # Unique keywords, first occurrence order preserved
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+
+        if backend is None:
+            backend = 'automaton' if ahocorasick is not None else 'regex'
+        if backend == 'automaton' and ahocorasick is None:
+            raise ValueError("The 'automaton' backend requires the pyahocorasick package")
+        if backend not in ('automaton', 'regex'):
+            raise ValueError(f"Unknown keyword matcher backend: {backend}")
+        self.backend = backend
+
+        if backend == 'automaton':
+            self._automaton = ahocorasick.Automaton()
+            for order, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword, (order, keyword, len(keyword)))
+            if self.keywords:
+                self._automaton.make_automaton()
+            self._longest = max(map(len, self.keywords), default=0)
+        else:
+            # The lookahead stops at every position where some keyword starts;
+            # candidates sharing that first character are then confirmed in place
+            self._by_first_char = defaultdict(list)
+            for keyword in self.keywords:
+                self._by_first_char[keyword[0]].append(keyword)
+            alternation = '|'.join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+            self._regex = re.compile(f'(?=(?:{alternation}))') if self.keywords else None
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, keyword) for each counted occurrence, in text order.
+
+        Occurrences starting at the same offset come in keyword order, so both
+        backends yield the same sequence.
+        """
+        if not self.keywords:
+            return
+
+        # End offset of the last counted occurrence of each keyword
+        last_end = {}
+
+        if self.backend == 'automaton':
+            # The automaton reports occurrences by where they end; hold them in a
+            # heap until no occurrence found later can start before them
+            pending = []
+            for end_index, (order, keyword, length) in self._automaton.iter(text):
+                start = end_index - length + 1
+                if start >= last_end.get(keyword, 0):
+                    last_end[keyword] = end_index + 1
+                    heapq.heappush(pending, (start, order, keyword))
+                while pending and pending[0][0] <= end_index - self._longest:
+                    yield pending[0][0], heapq.heappop(pending)[2]
+            while pending:
+                yield pending[0][0], heapq.heappop(pending)[2]
+        else:
+            for match in self._regex.finditer(text):
+                start = match.start()
+                for keyword in self._by_first_char[text[start]]:
+                    if start >= last_end.get(keyword, 0) and text.startswith(keyword, start):
+                        last_end[keyword] = start + len(keyword)
+                        yield start, keyword
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Return the number of occurrences of every keyword in text"""
+        counts = dict.fromkeys(self.keywords, 0)
+        for _, keyword in self.iter_matches(text):
+            counts[keyword] += 1
+        return counts
@@ -1,21 +1,92 @@
-import requests
 import os
 from bs4 import BeautifulSoup
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
-import pickle
 import json
-from config import ADGM_URLS, ADGM_URL_CATEGORIES, get_all_urls
-import time
+import copy
+import hashlib
+import itertools
+import re
+from concurrent.futures import ProcessPoolExecutor
+from config import (ADGM_URLS, ADGM_URL_CATEGORIES, CHUNK_OVERLAP, CHUNK_SIZE, DOWNLOAD_CACHE_DIR,
+                    DOWNLOAD_HOST_INTERVAL, DOWNLOAD_WORKERS, EMBEDDING_BATCH_SIZE, EMBEDDING_CACHE_DIR,
+                    EMBEDDING_MODEL, EXTRACTION_WORKERS, HYBRID_CANDIDATES, QUERY_CACHE_SIZE, RESULT_CACHE_SIZE,
+                    SEARCH_MODE, VECTOR_STORE_PATH, get_all_urls, get_index_config)
+from modules.adgm_downloader import ADGMDownloader
+from modules.bm25_index import BM25Index, build_bm25_index, reciprocal_rank_fusion
+from modules.cache import LRUCache
+from modules.chunk_store import ChunkStore, write_chunk_store
+from modules.chunker import DocumentChunker
+from modules.document_parser import extract_text_from_bytes
+from modules.embedding_cache import EmbeddingCache
+from modules.vector_index import (INDEX_FILENAME, apply_search_params, build_index_from_batches, build_params,
+                                  load_index, load_search_params, remove_vectors, save_index, save_search_params)
+from modules.vector_store import GenerationStore
 from urllib.parse import urlparse
 
+# Bump when text extraction changes so cached extracted text is regenerated
+TEXT_EXTRACTION_VERSION = 3
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+def _binary_document_extension(content_type, url):
+    """'.pdf' or '.docx' for responses that need DocumentParser extraction, else None"""
+    if 'application/pdf' in content_type:
+        return '.pdf'
+    if DOCX_CONTENT_TYPE in content_type:
+        return '.docx'
+    if 'text/html' in content_type:
+        return None
+    # Asset URLs are often served as application/octet-stream; fall back to the path
+    path = urlparse(url).path.lower()
+    for extension in ('.pdf', '.docx'):
+        if path.endswith(extension):
+            return extension
+    return None
+
+SEARCH_MODES = ('dense', 'sparse', 'hybrid')
+
+def _normalize_query(query):
+    """Cache key form of a query: surrounding and repeated whitespace does not change the embedding"""
+    return ' '.join(query.split())
+
+def _normalize_text(text):
+    """Collapse whitespace within lines but keep line and paragraph breaks for the chunker"""
+    text = '\n'.join(' '.join(line.split()) for line in text.splitlines())
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
 class ADGMRagSystem:
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, model=None, index_config=None, store_path=VECTOR_STORE_PATH,
+                 embedding_cache_dir=EMBEDDING_CACHE_DIR, query_cache_size=QUERY_CACHE_SIZE,
+                 result_cache_size=RESULT_CACHE_SIZE, search_mode=SEARCH_MODE):
+        # Pass a preloaded model to share it; see modules.resources
+        self.model = model if model is not None else SentenceTransformer(EMBEDDING_MODEL)
+        self.store_path = store_path
+        # Index type and parameters requested for builds (flat, ivf_flat, ivf_pq, hnsw)
+        self.build_index_config = index_config if index_config is not None else get_index_config()
+        # Effective parameters of the loaded index
+        self.index_config = dict(self.build_index_config)
         self.index = None
-        self.texts = []
-        self.metadata = []
+        # Generation number of the loaded index; part of every result cache key
+        self.index_version = 0
+        # Chunk id (as stored in the FAISS index) -> chunk text / metadata
+        self.chunks = None
+        # BM25 inverted index over the same chunks, for sparse and hybrid search
+        self.sparse_index = None
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}', expected one of {SEARCH_MODES}")
+        self.search_mode = search_mode
+        # url -> {'content_hash', 'chunk_ids'} for incremental updates
+        self.manifest = {'next_id': 0, 'documents': {}}
+        self.generations = GenerationStore(store_path)
+        self.chunker = DocumentChunker(CHUNK_SIZE, CHUNK_OVERLAP)
+        # Chunk embeddings persisted across rebuilds; None disables the cache
+        self.embedding_cache = EmbeddingCache(embedding_cache_dir, EMBEDDING_MODEL) if embedding_cache_dir else None
+        # Normalized query -> embedding, and (query, k, index version) -> results; 0 disables
+        self.query_cache = LRUCache(query_cache_size) if query_cache_size else None
+        self.result_cache = LRUCache(result_cache_size) if result_cache_size else None
+        self._downloader = None
         
         # Try to load existing vector store
         self.load_vector_store()
@@ -23,22 +94,44 @@ class ADGMRagSystem:
     def load_vector_store(self):
         """Load existing vector store if available"""
         try:
-            if os.path.exists('data/vector_store/adgm_index.faiss'):
-                self.index = faiss.read_index('data/vector_store/adgm_index.faiss')
+            store_dir = self.generations.current_dir()
+            if store_dir is None:
+                if os.path.exists(os.path.join(self.store_path, 'texts.pkl')):
+                    # Pickled stores are no longer loaded; a fresh build replaces them
+                    print("⚠️ Found a vector store in the old pickle format; run setup_rag.py to rebuild it")
+                return False
+            
+            if os.path.exists(os.path.join(store_dir, INDEX_FILENAME)) and ChunkStore.exists(store_dir):
+                self.index, self.index_config = load_index(store_dir)
+                self._apply_tuned_search_params()
+                # Memory-mapped: only the chunks actually returned by searches are read
+                self.chunks = ChunkStore(store_dir)
+                self.sparse_index = BM25Index(store_dir) if BM25Index.exists(store_dir) else None
+                self.index_version = self.generations.current_generation()
+                self._clear_result_cache()
                 
-                with open('data/vector_store/texts.pkl', 'rb') as f:
-                    self.texts = pickle.load(f)
-                    
-                with open('data/vector_store/metadata.pkl', 'rb') as f:
-                    self.metadata = pickle.load(f)
+                with open(os.path.join(store_dir, 'manifest.json'), 'r') as f:
+                    self.manifest = json.load(f)
                     
-                print(f"✅ Loaded existing vector store with {len(self.texts)} documents")
+                print(f"✅ Loaded existing vector store with {len(self.chunks)} documents "
+                      f"({self.index_config.get('type', 'flat')} index)")
                 return True
         except Exception as e:
             print(f"⚠️ Could not load existing vector store: {e}")
             
         return False
         
+    @property
+    def downloader(self):
+        """Shared downloader, created on first use"""
+        if self._downloader is None:
+            self._downloader = ADGMDownloader(
+                cache_dir=DOWNLOAD_CACHE_DIR,
+                max_workers=DOWNLOAD_WORKERS,
+                per_host_interval=DOWNLOAD_HOST_INTERVAL
+            )
+        return self._downloader
+    
     def download_adgm_documents(self, category=None):
         """Download documents from ADGM URLs"""
         if category:
@@ -46,47 +139,38 @@ class ADGMRagSystem:
         else:
             urls = get_all_urls()
         
+        print(f"📥 Downloading {len(urls)} URLs...")
         documents = []
+        results = []
+        texts = {}
         
-        for url in urls:
+        for result in self.downloader.fetch_all(urls):
+            url = result['url']
+            if result['error'] and not result['from_cache']:
+                print(f"❌ Error downloading {url}: {result['error']}")
+                continue
+            
+            results.append(result)
+            text_path = self.downloader.cache_path(url, f'.v{TEXT_EXTRACTION_VERSION}.txt')
+            if result['from_cache'] and os.path.exists(text_path):
+                # Unchanged since the last run: reuse the extracted text
+                with open(text_path, 'r', encoding='utf-8') as f:
+                    texts[url] = f.read()
+        
+        extracted = self._extract_texts([r for r in results if r['url'] not in texts])
+        for url, text in extracted.items():
+            texts[url] = text
+            with open(self.downloader.cache_path(url, f'.v{TEXT_EXTRACTION_VERSION}.txt'), 'w', encoding='utf-8') as f:
+                f.write(text)
+        
+        for result in results:
+            url = result['url']
+            if url not in texts:
+                continue  # Extraction failed and was reported
+            
             try:
-                print(f"📥 Downloading: {url}")
-                
-                # Add delay to be respectful to servers
-                time.sleep(1)
-                
-                # Set headers to mimic browser
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                # Handle different content types
-                content_type = response.headers.get('content-type', '').lower()
-                
-                if 'text/html' in content_type:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    text = soup.get_text()
-                    
-                elif 'application/pdf' in content_type:
-                    # For PDF files, you'd need to use PyPDF2 or similar
-                    text = f"PDF document from {url}"
-                    
-                elif 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' in content_type:
-                    # For DOCX files
-                    text = f"DOCX template from {url}"
-                    
-                else:
-                    # Try to get text anyway
-                    text = response.text
-                
-                # Clean and validate text
-                text = ' '.join(text.split())  # Clean whitespace
+                content_type = result['content_type']
+                text = texts[url]
                 
                 if len(text.strip()) > 100:  # Only add substantial content
                     documents.append({
@@ -96,75 +180,365 @@ class ADGMRagSystem:
                         'domain': urlparse(url).netloc,
                         'content_type': content_type
                     })
-                    print(f"✅ Successfully processed: {url}")
+                    if result['not_modified']:
+                        print(f"✅ Unchanged since last download: {url}")
+                    else:
+                        print(f"✅ Successfully processed: {url}")
                 else:
                     print(f"⚠️ Skipping (insufficient content): {url}")
                     
             except Exception as e:
-                print(f"❌ Error downloading {url}: {e}")
+                print(f"❌ Error processing {url}: {e}")
                 continue
         
         print(f"\n📊 Successfully downloaded {len(documents)} documents")
         return documents
     
-    def build_vector_store(self, documents):
-        """Create FAISS vector store"""
-        # Chunk documents
+    def _extract_texts(self, results):
+        """Extract text from many responses, url -> text.
+        
+        PDF and DOCX bodies are parsed in memory by DocumentParser in a process
+        pool, so large rulebooks do not serialize ingestion; HTML is handled here
+        meanwhile.
+        """
+        binary = {}
+        for result in results:
+            extension = _binary_document_extension(result['content_type'], result['url'])
+            if extension is not None:
+                binary[result['url']] = (result['content'], extension)
+        
+        executor = None
+        if binary:
+            workers = min(len(binary), EXTRACTION_WORKERS or os.cpu_count() or 1)
+            executor = ProcessPoolExecutor(max_workers=workers)
+        
+        try:
+            futures = {url: executor.submit(extract_text_from_bytes, content, extension)
+                       for url, (content, extension) in binary.items()}
+            
+            texts = {}
+            for result in results:
+                if result['url'] in futures:
+                    continue
+                text = self._extract_safely(result)
+                if text is not None:
+                    texts[result['url']] = text
+            
+            for url, future in futures.items():
+                try:
+                    texts[url] = _normalize_text(future.result())
+                except Exception as e:
+                    print(f"❌ Error extracting text from {url}: {e}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        return texts
+    
+    def _extract_safely(self, result):
+        """Extract one response in-process, reporting failures instead of raising"""
+        try:
+            return self._extract_text(result['content'], result['content_type'], result['url'])
+        except Exception as e:
+            print(f"❌ Error processing {result['url']}: {e}")
+            return None
+    
+    def _extract_text(self, content, content_type, url):
+        """Extract clean text from a downloaded response body"""
+        extension = _binary_document_extension(content_type, url)
+        
+        # Handle different content types
+        if extension is not None:
+            # PDF and DOCX go through the same extraction as uploaded documents
+            text = extract_text_from_bytes(content, extension)
+            
+        elif 'text/html' in content_type:
+            soup = BeautifulSoup(content, 'html.parser')
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
+            text = soup.get_text()
+            
+        else:
+            # Try to get text anyway
+            text = content.decode('utf-8', errors='replace')
+        
+        # Clean and validate text
+        return _normalize_text(text)
+    
+    def build_vector_store(self, documents, full_rebuild=False, prune_missing=False):
+        """Create or incrementally update the FAISS vector store.
+        
+        Only documents whose content hash changed are re-chunked and re-embedded;
+        their previous chunks are removed by id. Documents absent from this batch
+        are kept unless prune_missing is set (a failed download is not a deletion).
+        When the index build parameters changed since the last build, or a small
+        corpus fell back to a flat index, the index is rebuilt from every kept
+        chunk, whose embeddings come from the embedding cache.
+        """
+        index_params = build_params(self.build_index_config)
+        incremental = (not full_rebuild and self.index is not None
+                       and self.index_config.get('with_ids') and self.manifest['documents']
+                       and self.manifest.get('chunking') == self.chunker.settings())
+        rebuild_index = incremental and (
+            self.manifest.get('index_params') != index_params
+            or self.index_config.get('type') != self.index_config.get('requested_type'))
+        
+        if incremental:
+            previous = self.manifest['documents']
+            next_id = self.manifest['next_id']
+        else:
+            previous = {}
+            next_id = 0
+        
+        documents_state = dict(previous)
+        stale_ids = []
         chunks = []
+        chunk_ids = []
         metadata = []
         
         for doc in documents:
-            content = doc['content']
-            # Split into chunks of 500 words
-            words = content.split()
-            for i in range(0, len(words), 500):
-                chunk = ' '.join(words[i:i+500])
-                chunks.append(chunk)
+            content_hash = hashlib.sha256(doc['content'].encode('utf-8')).hexdigest()
+            entry = previous.get(doc['url'])
+            if entry is not None and entry['content_hash'] == content_hash:
+                continue  # Unchanged: keep its chunks and embeddings
+            if entry is not None:
+                stale_ids.extend(entry['chunk_ids'])
+            
+            doc_chunk_ids = []
+            for chunk_index, chunk in enumerate(self._chunk_document(doc['content'])):
+                chunks.append(chunk['text'])
+                chunk_ids.append(next_id)
+                doc_chunk_ids.append(next_id)
                 metadata.append({
                     'source': doc['source'],
                     'url': doc['url'],
-                    'chunk_id': i//500
+                    'chunk_id': chunk_index,
+                    'start_char': chunk['start_char'],
+                    'end_char': chunk['end_char']
                 })
+                next_id += 1
+            documents_state[doc['url']] = {'content_hash': content_hash, 'chunk_ids': doc_chunk_ids}
         
-        # Generate embeddings
-        embeddings = self.model.encode(chunks)
+        if prune_missing:
+            current_urls = {doc['url'] for doc in documents}
+            for url in list(documents_state):
+                if url not in current_urls:
+                    stale_ids.extend(documents_state.pop(url)['chunk_ids'])
+        
+        if incremental and not chunks and not stale_ids and not rebuild_index:
+            print("✅ Vector store is up to date; nothing to embed")
+            return
+        if not incremental and not chunks:
+            print("⚠️ No document content to index")
+            return
+        
+        if incremental and not rebuild_index:
+            # Embed new and changed chunks batch by batch, adding each batch as it is ready
+            batches = self._embed_batches(chunks, chunk_ids)
+            try:
+                index = remove_vectors(self.index, stale_ids, self.index_config)
+                for batch_ids, batch_embeddings in batches:
+                    index.add_with_ids(batch_embeddings, batch_ids)
+            except Exception:
+                # The in-memory index may be partly updated; go back to what is on disk
+                self.load_vector_store()
+                raise
+            index_config = self.index_config
+            stale = set(stale_ids)
+            # Surviving chunks keep their ids, all lower than the new ones
+            kept_chunks = (chunk for chunk in self.chunks if chunk[0] not in stale)
+        else:
+            if incremental:
+                # Surviving chunks go into the new index under their ids
+                stale = set(stale_ids)
+                kept_chunks = [chunk for chunk in self.chunks if chunk[0] not in stale]
+            else:
+                kept_chunks = []
+            index_ids = [chunk_id for chunk_id, _, _ in kept_chunks] + chunk_ids
+            batches = self._embed_batches([text for _, text, _ in kept_chunks] + chunks, index_ids)
+            # Create FAISS index of the configured type (trained on a sample for IVF/PQ)
+            index, index_config = build_index_from_batches(batches, len(index_ids), self.build_index_config)
+        
+        manifest = {'next_id': next_id, 'documents': documents_state, 'chunking': self.chunker.settings(),
+                    'index_params': index_params}
+        
+        # Write a complete new generation, then switch to it atomically
+        generation, store_dir = self.generations.begin()
+        try:
+            save_index(index, index_config, store_dir)
+            total = write_chunk_store(store_dir, itertools.chain(kept_chunks, zip(chunk_ids, chunks, metadata)))
+            # Corpus-wide BM25 statistics change with every update, so the sparse index is rebuilt
+            build_bm25_index(store_dir, ((chunk_id, text) for chunk_id, text, _ in ChunkStore(store_dir)))
+            with open(os.path.join(store_dir, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f)
+            store_dir = self.generations.commit(generation, store_dir)
+        except Exception:
+            self.generations.abort(store_dir)
+            # The in-memory index may already be modified; go back to what is on disk
+            self.load_vector_store()
+            raise
+        
+        self.index = index
+        self.index_config = index_config
+        self._apply_tuned_search_params()
+        # The previous store is left to the garbage collector so in-flight searches can finish
+        self.chunks = ChunkStore(store_dir)
+        self.sparse_index = BM25Index(store_dir)
+        self.index_version = generation
+        self._clear_result_cache()
+        self.manifest = manifest
+        print(f"✅ Vector store generation {generation}: {len(chunks)} chunks embedded, "
+              f"{len(set(stale_ids))} removed, {total} total")
+    
+    def _embed_batches(self, chunks, chunk_ids):
+        """Yield (ids, embeddings) for every EMBEDDING_BATCH_SIZE chunks"""
+        for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE):
+            end = start + EMBEDDING_BATCH_SIZE
+            yield np.asarray(chunk_ids[start:end], dtype='int64'), self._embed(chunks[start:end])
+    
+    def _embed(self, texts):
+        """Embed texts, encoding only those missing from the embedding cache"""
+        if self.embedding_cache is None:
+            return np.ascontiguousarray(self.model.encode(texts), dtype='float32')
         
-        # Create FAISS index
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings.astype('float32'))
+        keys = [EmbeddingCache.make_key(text) for text in texts]
+        vectors, missing = self.embedding_cache.get_many(keys)
+        if missing:
+            encoded = np.ascontiguousarray(self.model.encode([texts[i] for i in missing]), dtype='float32')
+            self.embedding_cache.put_many([keys[i] for i in missing], encoded)
+            vectors.update(zip(missing, encoded))
+        return np.stack([vectors[i] for i in range(len(texts))])
+    
+    def _chunk_document(self, content):
+        """Split document content into overlapping, clause-aligned chunks with character offsets"""
+        return self.chunker.chunks(content)
+    
+    def set_search_params(self, nprobe=None, ef_search=None, persist=True):
+        """Tune search-time recall/latency (IVF nprobe, HNSW efSearch).
         
-        self.texts = chunks
-        self.metadata = metadata
+        persist saves the knobs at the store root, where they apply to every
+        generation loaded later; committed generations are never modified.
+        """
+        for name, value in (('nprobe', nprobe), ('ef_search', ef_search)):
+            if value is not None:
+                self.index_config[name] = value
         
-        # Save index
-        os.makedirs('data/vector_store', exist_ok=True)
-        faiss.write_index(self.index, 'data/vector_store/adgm_index.faiss')
-        with open('data/vector_store/texts.pkl', 'wb') as f:
-            pickle.dump(self.texts, f)
-        with open('data/vector_store/metadata.pkl', 'wb') as f:
-            pickle.dump(self.metadata, f)
+        if self.index is not None:
+            apply_search_params(self.index, self.index_config)
+            # Different knobs can return different neighbours
+            self._clear_result_cache()
+        if persist:
+            os.makedirs(self.store_path, exist_ok=True)
+            save_search_params(self.index_config, self.store_path)
     
-    def search(self, query, k=5):
+    def _apply_tuned_search_params(self):
+        """Apply the search knobs persisted by set_search_params over the loaded index's own"""
+        tuned = load_search_params(self.store_path)
+        if tuned:
+            self.index_config.update(tuned)
+            apply_search_params(self.index, self.index_config)
+    
+    def search(self, query, k=5, mode=None):
         """Search relevant documents - THIS WAS MISSING!"""
-        if self.index is None or not self.texts:
+        return self.search_batch([query], k, mode)[0]
+    
+    def search_batch(self, queries, k=5, mode=None):
+        """Search several queries with one encode call and one index search.
+        
+        mode is 'dense' (FAISS; score is a distance, lower is better), 'sparse'
+        (BM25; higher is better) or 'hybrid' (both fused by reciprocal rank;
+        higher is better) and defaults to the configured search mode.
+        Repeated queries are answered from the result cache, and queries whose
+        embedding is cached skip the model entirely.
+        """
+        queries = [_normalize_query(query) for query in queries]
+        mode = mode or self.search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+        if self.index is None or not self.chunks:
             print("⚠️ Vector store not loaded. Returning empty results.")
+            return [[] for _ in queries]
+        if mode != 'dense' and self.sparse_index is None:
+            print("⚠️ Vector store has no BM25 index yet (rebuild it); using dense search.")
+            mode = 'dense'
+        
+        if not queries:
             return []
             
         try:
-            query_embedding = self.model.encode([query])
-            distances, indices = self.index.search(query_embedding.astype('float32'), k)
+            results = [None] * len(queries)
+            if self.result_cache is not None:
+                for position, query in enumerate(queries):
+                    results[position] = self.result_cache.get((query, k, mode, self.index_version))
             
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.texts):  # Ensure valid index
-                    results.append({
-                        'text': self.texts[idx],
-                        'metadata': self.metadata[idx],
-                        'score': distances[0][i]
-                    })
+            pending = [position for position, result in enumerate(results) if result is None]
+            if pending:
+                # Hybrid fusion needs deeper candidate lists from both sides
+                depth = max(k, HYBRID_CANDIDATES) if mode == 'hybrid' else k
+                if mode != 'sparse':
+                    query_embeddings = self._embed_queries([queries[position] for position in pending])
+                    distances, indices = self.index.search(query_embeddings, depth)
+                
+                for row, position in enumerate(pending):
+                    if mode == 'dense':
+                        hits = zip(indices[row], distances[row])
+                    else:
+                        sparse_ids, sparse_scores = self.sparse_index.search(queries[position], depth)
+                        if mode == 'sparse':
+                            hits = zip(sparse_ids, sparse_scores)
+                        else:
+                            hits = reciprocal_rank_fusion([indices[row], sparse_ids], k)
+                    
+                    results[position] = self._collect_results(hits)
+                    if self.result_cache is not None:
+                        self.result_cache.put((queries[position], k, mode, self.index_version), results[position])
             
-            return results
+            # Callers may annotate results; keep the cached copies pristine
+            return copy.deepcopy(results) if self.result_cache is not None else results
         except Exception as e:
             print(f"Error in search: {e}")
-            return []
+            return [[] for _ in queries]
+    
+    def _embed_queries(self, queries):
+        """Embed normalized queries, running the model only for those not in the query cache"""
+        if self.query_cache is None:
+            return np.ascontiguousarray(self.model.encode(queries), dtype='float32')
+        
+        vectors = [self.query_cache.get(query) for query in queries]
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Duplicates within the batch are encoded once
+            unique = list(dict.fromkeys(queries[position] for position in missing))
+            encoded = np.asarray(self.model.encode(unique), dtype='float32')
+            for query, vector in zip(unique, encoded):
+                self.query_cache.put(query, vector.copy())
+            by_query = dict(zip(unique, encoded))
+            for position in missing:
+                vectors[position] = by_query[queries[position]]
+        return np.ascontiguousarray(np.stack(vectors), dtype='float32')
+    
+    def cache_stats(self):
+        """Hit-rate statistics of the query embedding and result caches"""
+        return {
+            'query_embeddings': self.query_cache.stats() if self.query_cache is not None else None,
+            'results': self.result_cache.stats() if self.result_cache is not None else None,
+            'chunk_embeddings': self.embedding_cache.stats() if self.embedding_cache is not None else None
+        }
+    
+    def _clear_result_cache(self):
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def _collect_results(self, hits):
+        """Turn ranked (chunk id, score) pairs into result dicts"""
+        results = []
+        for idx, score in hits:
+            if idx in self.chunks:  # Ensure valid id (ANN indexes pad with -1)
+                results.append({
+                    'text': self.chunks.text(idx),
+                    'metadata': self.chunks.metadata(idx),
+                    'score': score
+                })
+        
+        return results
@@ -0,0 +1,137 @@
+import json
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from modules.keyword_matcher import KeywordMatcher
+
+RULES_PATH = 'templates/red_flag_rules.json'
+
+RULE_FLAG_FIELDS = ('type', 'severity', 'message', 'suggestion')
+
+# Where a flag without evidence points: the first or last paragraph, unless
+# its rule names a term group to anchor on
+ANCHOR_POSITIONS = ('start', 'end')
+
+
+def load_red_flag_rules(path: str = RULES_PATH) -> Dict:
+    """Load the declarative red flag rules"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class RedFlagRules:
+    """Red flag rules compiled into one keyword pass plus per-rule bitmask tests.
+
+    Each term group gets a bit. A single scan of the text collects the bits of
+    every group with at least one term present (substring match, like ``in``),
+    and a rule fires when all of its ``present`` bits are set and none of its
+    ``absent`` bits are. Adding rules or terms grows the automaton, not the
+    number of passes over the document.
+    """
+
+    def __init__(self, rule_config: Dict):
+        groups = rule_config.get('term_groups', {})
+        self.group_bits = {group: 1 << bit for bit, group in enumerate(groups)}
+
+        # Lowercased term -> bits of every group containing it
+        self._term_bits = {}
+        for group, terms in groups.items():
+            for term in terms:
+                term = term.lower()
+                self._term_bits[term] = self._term_bits.get(term, 0) | self.group_bits[group]
+        self._matcher = KeywordMatcher(self._term_bits)
+
+        self.rules = []
+        for rule in rule_config.get('rules', []):
+            for field in ('id',) + RULE_FLAG_FIELDS:
+                if field not in rule:
+                    raise ValueError(f"Red flag rule {rule.get('id', rule)} has no '{field}'")
+            anchor = rule.get('anchor', 'start')
+            if anchor not in ANCHOR_POSITIONS and anchor not in self.group_bits:
+                raise ValueError(f"Red flag rule {rule['id']} has unknown anchor '{anchor}'")
+            self.rules.append({
+                'rule': rule,
+                'present_mask': self._mask(rule, 'present'),
+                'absent_mask': self._mask(rule, 'absent'),
+                'anchor': anchor,
+                'anchor_mask': self.group_bits.get(anchor, 0),
+                'doc_types': set(rule['doc_types']) if rule.get('doc_types') else None
+            })
+
+        # Rules and the group bits they test, per document type (rule order kept)
+        self._plans = {}
+
+    def _mask(self, rule: Dict, key: str) -> int:
+        mask = 0
+        for group in rule.get(key, []):
+            if group not in self.group_bits:
+                raise ValueError(f"Red flag rule {rule['id']} refers to unknown term group '{group}'")
+            mask |= self.group_bits[group]
+        return mask
+
+    def _plan(self, doc_type: str):
+        plan = self._plans.get(doc_type)
+        if plan is None:
+            rules = [r for r in self.rules if r['doc_types'] is None or doc_type in r['doc_types']]
+            needed = 0
+            for rule in rules:
+                needed |= rule['present_mask'] | rule['absent_mask'] | rule['anchor_mask']
+            plan = self._plans[doc_type] = (rules, needed)
+        return plan
+
+    def _scan(self, content: str, needed: int = -1) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+        """Found group bits and the (start, end) of each group's first match"""
+        found = 0
+        first_match = {}
+        for start, term in self._matcher.iter_matches(content):
+            new = self._term_bits[term] & ~found
+            if new:
+                found |= new
+                while new:
+                    bit = new & -new
+                    first_match[bit] = (start, start + len(term))
+                    new ^= bit
+                if found & needed == needed:
+                    break
+        return found, first_match
+
+    def present_groups(self, content: str, needed: int = -1) -> int:
+        """Bitmask of the term groups found in lowercased content, stopping once every needed group is found"""
+        return self._scan(content, needed)[0]
+
+    def evaluate(self, content: str, doc_type: str = 'unknown',
+                 paragraph_offsets: Optional[List[int]] = None) -> List[Dict]:
+        """Return the flags raised for lowercased content, in rule file order.
+
+        Every flag carries a ``span`` (start, end) in content and the
+        ``paragraph_index`` containing it, the position in paragraph_offsets
+        found by bisecting them; the offsets must be paragraph starts in
+        content itself, not in the text before lowercasing. The span is
+        the earliest evidence of a rule's ``present`` groups or, for rules
+        without evidence, the rule's ``anchor``: a term group's first match,
+        or the first ('start') or last ('end') paragraph.
+        """
+        rules, needed = self._plan(doc_type)
+        found, first_match = self._scan(content, needed)
+        offsets = paragraph_offsets or [0]
+
+        flags = []
+        for compiled in rules:
+            if found & compiled['present_mask'] == compiled['present_mask'] and not found & compiled['absent_mask']:
+                flag = {field: compiled['rule'][field] for field in RULE_FLAG_FIELDS}
+                evidence = [span for bit, span in first_match.items() if bit & compiled['present_mask']]
+                span = min(evidence) if evidence else self._anchor_span(compiled, first_match, len(content), offsets)
+                flag['span'] = list(span)
+                flag['paragraph_index'] = max(bisect_right(offsets, span[0]) - 1, 0)
+                flags.append(flag)
+        return flags
+
+    @staticmethod
+    def _anchor_span(compiled: Dict, first_match: Dict, length: int, offsets: List[int]) -> Tuple[int, int]:
+        """Expected location of a flag without evidence"""
+        if compiled['anchor_mask'] in first_match:
+            return first_match[compiled['anchor_mask']]
+        if compiled['anchor'] == 'end':
+            return offsets[-1], length
+        # First paragraph; also the fallback when the anchor group is absent
+        return 0, offsets[1] - 1 if len(offsets) > 1 else length
@@ -45,6 +45,12 @@ class ReportGenerator:
                     "message": flag.get('message', ''),
                     "suggestion": flag.get('suggestion', '')
                 }
+                # Location in the document content, for linking back to the text. paragraph_index
+                # counts Word paragraphs for DOCX and extracted lines for PDF; it is unrelated to
+                # the estimated paragraph_count above
+                if 'span' in flag:
+                    issue["span"] = flag['span']
+                    issue["paragraph_index"] = flag.get('paragraph_index')
                 doc_detail["issues_found"].append(issue)
                 
                 # Update summary counts
@@ -71,7 +77,14 @@ class ReportGenerator:
         
         return report
     
-    def save_report(self, report: Dict, output_path: str):
-        """Save report to file"""
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+    def report_bytes(self, report: Dict) -> bytes:
+        """Serialize a report as UTF-8 JSON for downloads and API responses"""
+        return json.dumps(report, indent=2).encode('utf-8')
+    
+    def save_report(self, report: Dict, output):
+        """Save report to a path or writable binary stream"""
+        if hasattr(output, 'write'):
+            output.write(self.report_bytes(report))
+        else:
+            with open(output, 'wb') as f:
+                f.write(self.report_bytes(report))
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Dict
+
+from config import EMBEDDING_MODEL
+
+
+class ResourceManager:
+    """Process-wide owner of expensive shared resources (embedding model, RAG index).
+
+    Streamlit re-runs the app script on every interaction, but imported modules
+    persist for the life of the server process, so resources held here are loaded
+    once and shared by every session and rerun.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._models = {}
+        self._rag_system = None
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_thread = None
+        self.load_times = {}
+
+    def get_embedding_model(self, model_name: str = EMBEDDING_MODEL):
+        """Return the shared SentenceTransformer, loading it on first use"""
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if model_name not in self._models:
+                from sentence_transformers import SentenceTransformer
+
+                start = time.perf_counter()
+                self._models[model_name] = SentenceTransformer(model_name)
+                self.load_times[f'model:{model_name}'] = time.perf_counter() - start
+                print(f"✅ Loaded embedding model {model_name} in {self.load_times[f'model:{model_name}']:.2f}s")
+            return self._models[model_name]
+
+    def get_rag_system(self):
+        """Return the shared ADGMRagSystem with its vector store loaded"""
+        if self._rag_system is not None:
+            return self._rag_system
+
+        with self._lock:
+            if self._rag_system is None:
+                from modules.rag_system import ADGMRagSystem
+
+                model = self.get_embedding_model()
+                start = time.perf_counter()
+                self._rag_system = ADGMRagSystem(model=model)
+                self.load_times['rag_index'] = time.perf_counter() - start
+            return self._rag_system
+
+    def warm_up(self, background: bool = True):
+        """Load the model and index ahead of the first request.
+
+        Safe to call on every rerun: at most one background load runs at a
+        time, and nothing is started once the RAG system is loaded. Returns the
+        loading thread, if one is running.
+        """
+        if not background:
+            self.get_rag_system()
+            return None
+
+        with self._warm_up_lock:
+            if self._rag_system is None and (self._warm_up_thread is None or not self._warm_up_thread.is_alive()):
+                self._warm_up_thread = threading.Thread(target=self.get_rag_system, name='rag-warm-up', daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread if self._rag_system is None else None
+
+    def stats(self) -> Dict:
+        """Report which resources are loaded, how long each took and RAG cache hit rates"""
+        return {
+            'models_loaded': list(self._models),
+            'rag_system_loaded': self._rag_system is not None,
+            'rag_cache': self._rag_system.cache_stats() if self._rag_system is not None else None,
+            'load_times': dict(self.load_times)
+        }
+
+
+# Shared instance for the whole process
+resource_manager = ResourceManager()
+
+
+def get_rag_system():
+    """Return the process-wide ADGMRagSystem"""
+    return resource_manager.get_rag_system()
@@ -0,0 +1,139 @@
+import io
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from modules import batch_analyzer
+from modules.batch_analyzer import REVIEWED_DOCUMENT, analyze_document, needs_review
+from modules.comment_inserter import CommentInserter
+from modules.document_checker import DocumentChecker
+from modules.report_generator import ReportGenerator
+
+# Components owned by the current (worker) process
+_checker = None
+_comment_inserter = None
+_report_generator = None
+
+
+def init_worker(cache_options: Optional[Dict] = None, checklists: Optional[Dict] = None,
+                rules: Optional[Dict] = None):
+    """Create the components used by this process.
+
+    checklists and rules are templates already loaded by the parent process;
+    the analyzer and the completeness check share one checker built from them.
+    """
+    global _checker, _comment_inserter, _report_generator
+    batch_analyzer._init_worker(cache_options, checklists, rules)
+    _checker = batch_analyzer._checker
+    _comment_inserter = CommentInserter()
+    _report_generator = ReportGenerator()
+
+
+def reviewed_filename(filename: str) -> str:
+    """Output name used by the app: reviewed_<name>.docx, or a review report for PDFs"""
+    stem, extension = os.path.splitext(filename)
+    if extension.lower() == '.pdf':
+        return f"reviewed_{stem}_report.docx"
+    return f"reviewed_{filename}"
+
+
+def reviewed_filenames(filenames: List[str]) -> List[str]:
+    """reviewed_filename of each document, numbered where earlier documents already use the name"""
+    names = []
+    used = set()
+    for filename in filenames:
+        name = reviewed_filename(filename)
+        stem, extension = os.path.splitext(name)
+        number = 2
+        while name in used:
+            name = f"{stem} ({number}){extension}"
+            number += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def build_analysis_results(checker: DocumentChecker, documents: List[Dict],
+                           process: Optional[str] = None) -> Dict:
+    """Completeness check plus the analysis_results dict the report generator expects"""
+    valid_documents = [doc for doc in documents if 'error' not in doc]
+    process = process or checker.identify_process(valid_documents)
+    completeness = checker.check_completeness(valid_documents, process)
+    process_info = checker.checklists.get(process, {})
+    return {
+        'process': completeness.get('process', 'unknown'),
+        'process_name': process_info.get('name', process),
+        'process_description': process_info.get('description', ''),
+        'documents_uploaded': completeness.get('documents_uploaded', 0),
+        'required_documents': completeness.get('required_documents', 0),
+        'missing_documents': completeness.get('missing_documents', []),
+        'completion_rate': completeness.get('completion_rate', 0),
+        'document_analyses': documents
+    }
+
+
+def review_documents(sources: List[Union[str, bytes]], filenames: Optional[List[str]] = None,
+                     process: Optional[str] = None, cache_options: Optional[Dict] = None) -> Tuple[Dict, Dict[str, bytes]]:
+    """Parse, check, annotate and report one package of documents in memory.
+
+    sources are paths or raw file bytes (bytes need filenames). Returns the JSON
+    report and {reviewed filename: DOCX bytes} for every flagged document;
+    documents sharing a name get numbered reviewed names (see reviewed_filenames).
+    """
+    if _checker is None:
+        init_worker(cache_options)
+    if process and process not in _checker.checklists:
+        raise ValueError(f"Unknown process: {process}")
+    if filenames is None:
+        if any(isinstance(source, bytes) for source in sources):
+            raise ValueError("filenames are required for documents given as bytes")
+        filenames = [os.path.basename(source) for source in sources]
+
+    # Flagged DOCX files are annotated from the Document parsed during analysis
+    documents = [analyze_document(source, filename, cache_options, annotate=True)
+                 for source, filename in zip(sources, filenames)]
+
+    reviewed = {}
+    for source, filename, output_name, doc in zip(sources, filenames, reviewed_filenames(filenames), documents):
+        content = doc.pop(REVIEWED_DOCUMENT, None)
+        if content is None and doc.get('red_flags') and 'error' not in doc and not needs_review(doc):
+            # PDFs get a separate review report
+            source = io.BytesIO(source) if isinstance(source, bytes) else source
+            output = io.BytesIO()
+            if _comment_inserter.add_comments_to_document(source, doc['red_flags'], output, filename):
+                content = output.getvalue()
+        if content is not None:
+            reviewed[output_name] = content
+
+    report = _report_generator.generate_json_report(build_analysis_results(_checker, documents, process))
+    return report, reviewed
+
+
+def review_package(paths: List[str], output_dir: str, filenames: Optional[List[str]] = None,
+                   process: Optional[str] = None, cache_options: Optional[Dict] = None) -> Tuple[Dict, List[str]]:
+    """Review documents on disk and write the reviewed documents to output_dir.
+
+    Returns the JSON report and the paths of the reviewed documents.
+    """
+    report, reviewed = review_documents(paths, filenames, process, cache_options)
+    written = []
+    for name, content in reviewed.items():
+        output_path = os.path.join(output_dir, name)
+        temp_path = f"{output_path}.tmp"
+        # Write under a temporary name so an interrupted run never leaves a half-written file
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        written.append(output_path)
+    return report, written
+
+
+def review_uploads(files: List[Tuple[str, bytes]], process: Optional[str] = None,
+                   cache_options: Optional[Dict] = None) -> Dict:
+    """Review uploaded (filename, content) pairs; returns the report and reviewed documents as bytes"""
+    report, reviewed = review_documents([content for _, content in files],
+                                        [os.path.basename(name) for name, _ in files], process, cache_options)
+    return {'report': report, 'reviewed_documents': reviewed}
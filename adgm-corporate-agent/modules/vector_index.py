@@ -0,0 +1,287 @@
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'hnsw')
+
+DEFAULT_INDEX_CONFIG = {
+    'type': 'flat',
+    'nlist': 0,               # IVF cells; 0 = about 4 * sqrt(number of vectors)
+    'nprobe': 8,              # IVF cells visited per query (search-time)
+    'pq_m': 8,                # PQ sub-quantizers; must divide the embedding dimension
+    'pq_nbits': 8,            # bits per PQ code
+    'hnsw_m': 32,             # HNSW graph degree
+    'ef_construction': 200,   # HNSW build-time beam width
+    'ef_search': 64,          # HNSW search-time beam width
+    'train_sample': 50000     # vectors sampled to train IVF/PQ quantizers
+}
+
+INDEX_FILENAME = 'adgm_index.faiss'
+PARAMS_FILENAME = 'index_params.json'
+# Search-time knobs tuned after a build; kept at the store root, outside the immutable generations
+SEARCH_PARAMS_FILENAME = 'search_params.json'
+SEARCH_PARAM_KEYS = ('nprobe', 'ef_search')
+
+
+def resolve_index_config(index_config: Optional[Dict] = None) -> Dict:
+    """Merge an index configuration over the defaults and validate it"""
+    resolved = dict(DEFAULT_INDEX_CONFIG)
+    resolved.update({k: v for k, v in (index_config or {}).items() if v is not None})
+    if resolved['type'] not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{resolved['type']}', expected one of {INDEX_TYPES}")
+    return resolved
+
+
+def build_params(index_config: Optional[Dict] = None) -> Dict:
+    """Settings an index is built with; changing one needs a rebuild, unlike the search knobs"""
+    resolved = resolve_index_config(index_config)
+    return {key: resolved[key] for key in DEFAULT_INDEX_CONFIG if key not in SEARCH_PARAM_KEYS}
+
+
+def create_index(dimension: int, n_vectors: int, index_config: Optional[Dict] = None,
+                 with_ids: bool = False) -> Tuple[faiss.Index, Dict]:
+    """Create an empty (untrained) index and return it with its effective configuration.
+    
+    With with_ids the index accepts caller-chosen int64 ids (add_with_ids/remove_ids);
+    IVF indexes support this natively, flat and HNSW are wrapped in an IndexIDMap2.
+    """
+    config = resolve_index_config(index_config)
+    index_type = config['type']
+    # Remember what was asked for, since small corpora fall back to a flat index
+    config['requested_type'] = config.get('requested_type', index_type)
+
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        nlist = config['nlist'] or int(4 * np.sqrt(max(n_vectors, 1)))
+        # FAISS wants roughly 39 training points per cell
+        nlist = max(1, min(nlist, n_vectors // 39))
+        min_vectors = 2 ** config['pq_nbits'] if index_type == 'ivf_pq' else 39
+        if n_vectors < min_vectors:
+            print(f"⚠️ Only {n_vectors} vectors, too few to train {index_type}; using a flat index")
+            index_type = 'flat'
+        config['nlist'] = nlist
+
+    if index_type == 'flat':
+        index = faiss.IndexFlatL2(dimension)
+    elif index_type == 'ivf_flat':
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, config['nlist'], faiss.METRIC_L2)
+    elif index_type == 'ivf_pq':
+        if dimension % config['pq_m'] != 0:
+            raise ValueError(f"pq_m={config['pq_m']} must divide the embedding dimension {dimension}")
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, config['nlist'], config['pq_m'], config['pq_nbits'])
+    else:
+        index = faiss.IndexHNSWFlat(dimension, config['hnsw_m'])
+        index.hnsw.efConstruction = config['ef_construction']
+
+    if with_ids and index_type in ('flat', 'hnsw'):
+        index = faiss.IndexIDMap2(index)
+
+    config['type'] = index_type
+    config['dimension'] = dimension
+    config['with_ids'] = with_ids
+    return index, config
+
+
+def train_index(index: faiss.Index, embeddings: np.ndarray, index_config: Dict, seed: int = 0):
+    """Train the index quantizers on a random sample of the embeddings"""
+    if index.is_trained:
+        return
+    sample = embeddings[training_positions(len(embeddings), index_config, seed)]
+    index.train(np.ascontiguousarray(sample, dtype='float32'))
+
+
+def training_positions(n_vectors: int, index_config: Dict, seed: int = 0) -> np.ndarray:
+    """Positions of the vectors train_index samples, in training order"""
+    sample_size = min(n_vectors, index_config.get('train_sample') or n_vectors)
+    return np.random.default_rng(seed).choice(n_vectors, sample_size, replace=False)
+
+
+def apply_search_params(index: faiss.Index, index_config: Dict):
+    """Apply the persisted search-time knobs (nprobe, efSearch) to an index"""
+    params = faiss.ParameterSpace()
+    index_type = index_config.get('type', 'flat')
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        params.set_index_parameter(index, 'nprobe', int(index_config['nprobe']))
+    elif index_type == 'hnsw':
+        params.set_index_parameter(index, 'efSearch', int(index_config['ef_search']))
+
+
+def build_index(embeddings: np.ndarray, index_config: Optional[Dict] = None,
+                ids: Optional[np.ndarray] = None) -> Tuple[faiss.Index, Dict]:
+    """Create, train and fill an index from an (n, d) embedding matrix"""
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    index, config = create_index(embeddings.shape[1], len(embeddings), index_config,
+                                 with_ids=ids is not None)
+    train_index(index, embeddings, config)
+    if ids is not None:
+        index.add_with_ids(embeddings, np.asarray(ids, dtype='int64'))
+    else:
+        index.add(embeddings)
+    apply_search_params(index, config)
+    return index, config
+
+
+def build_index_from_batches(batches: Iterable[Tuple[np.ndarray, np.ndarray]], n_vectors: int,
+                             index_config: Optional[Dict] = None, seed: int = 0) -> Tuple[faiss.Index, Dict]:
+    """Create, train and fill an id-mapped index from (ids, embeddings) batches.
+    
+    Batches are added as they arrive. Indexes that need training draw the same
+    seeded random sample of the n_vectors positions as train_index, so a
+    streamed build trains exactly like build_index on the concatenated batches.
+    Until the last sampled vector has arrived, batches are spilled to a
+    temporary file rather than held in memory, then replayed into the index.
+    """
+    index = config = None
+    sampler = None
+    
+    try:
+        for ids, embeddings in batches:
+            embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+            ids = np.asarray(ids, dtype='int64')
+            if index is None:
+                index, config = create_index(embeddings.shape[1], n_vectors, index_config, with_ids=True)
+                if not index.is_trained:
+                    sampler = _TrainingSampler(n_vectors, embeddings.shape[1], config, seed)
+            
+            if index.is_trained:
+                index.add_with_ids(embeddings, ids)
+                continue
+            
+            sampler.add(ids, embeddings)
+            if sampler.complete():
+                sampler.train_and_replay(index)
+        
+        if index is None:
+            raise ValueError("No embeddings to index")
+        if not index.is_trained:
+            # Fewer vectors arrived than announced; train on everything that did
+            sampler.train_and_replay(index, resample=True)
+    finally:
+        if sampler is not None:
+            sampler.close()
+    
+    apply_search_params(index, config)
+    return index, config
+
+
+class _TrainingSampler:
+    """Spill untrained batches to disk while collecting train_index's sample"""
+
+    def __init__(self, n_vectors: int, dimension: int, index_config: Dict, seed: int):
+        self.index_config = index_config
+        self.seed = seed
+        self.dimension = dimension
+        positions = training_positions(n_vectors, index_config, seed)
+        # Sample slot of each position, -1 for vectors not used for training
+        self.slots = np.full(n_vectors, -1, dtype='int64')
+        self.slots[positions] = np.arange(len(positions))
+        self.sample = np.empty((len(positions), dimension), dtype='float32')
+        self.collected = 0
+        self.seen = 0
+        self.spilled_ids = []
+        self.spill = tempfile.TemporaryFile()
+
+    def add(self, ids: np.ndarray, embeddings: np.ndarray):
+        slots = self.slots[self.seen:self.seen + len(ids)]
+        chosen = slots >= 0
+        self.sample[slots[chosen]] = embeddings[:len(slots)][chosen]
+        self.collected += int(chosen.sum())
+        self.seen += len(ids)
+        self.spill.write(embeddings.tobytes())
+        self.spilled_ids.append(ids)
+
+    def complete(self) -> bool:
+        return self.collected == len(self.sample)
+
+    def train_and_replay(self, index: faiss.Index, resample: bool = False):
+        """Train the index, then add every spilled batch in arrival order"""
+        if resample:
+            spilled = np.frombuffer(self._rewind().read(), dtype='float32').reshape(-1, self.dimension)
+            train_index(index, spilled, self.index_config, self.seed)
+        else:
+            index.train(self.sample)
+        self.sample = None
+        
+        spill = self._rewind()
+        for ids in self.spilled_ids:
+            embeddings = np.frombuffer(spill.read(4 * self.dimension * len(ids)), dtype='float32')
+            index.add_with_ids(embeddings.reshape(len(ids), self.dimension), ids)
+        self.spilled_ids = []
+
+    def close(self):
+        self.spill.close()
+
+    def _rewind(self):
+        self.spill.flush()
+        self.spill.seek(0)
+        return self.spill
+
+
+def remove_vectors(index: faiss.Index, ids, index_config: Dict) -> faiss.Index:
+    """Remove vectors by id, returning the (possibly rebuilt) index"""
+    ids = np.asarray(list(ids), dtype='int64')
+    if len(ids) == 0:
+        return index
+
+    if index_config.get('type') != 'hnsw':
+        index.remove_ids(ids)
+        return index
+
+    # HNSW graphs cannot delete nodes, so rebuild from the surviving stored vectors
+    all_ids = faiss.vector_to_array(index.id_map)
+    keep = ~np.isin(all_ids, ids)
+    vectors = index.index.reconstruct_n(0, index.ntotal)[keep]
+    rebuilt, _ = create_index(index.d, int(keep.sum()), index_config, with_ids=True)
+    if keep.any():
+        rebuilt.add_with_ids(vectors, all_ids[keep])
+    apply_search_params(rebuilt, index_config)
+    return rebuilt
+
+
+def save_index(index: faiss.Index, index_config: Dict, directory: str):
+    """Write the index and its parameters to a directory"""
+    os.makedirs(directory, exist_ok=True)
+    faiss.write_index(index, os.path.join(directory, INDEX_FILENAME))
+    _write_json(os.path.join(directory, PARAMS_FILENAME), index_config)
+
+
+def save_search_params(index_config: Dict, directory: str):
+    """Atomically persist the tuned search knobs (nprobe, efSearch) of index_config"""
+    _write_json(os.path.join(directory, SEARCH_PARAMS_FILENAME),
+                {key: index_config[key] for key in SEARCH_PARAM_KEYS if key in index_config})
+
+
+def load_search_params(directory: str) -> Dict:
+    """Search knobs saved by save_search_params, or {} if none were tuned"""
+    try:
+        with open(os.path.join(directory, SEARCH_PARAMS_FILENAME), 'r') as f:
+            params = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {key: params[key] for key in SEARCH_PARAM_KEYS if key in params}
+
+
+def _write_json(path: str, data: Dict):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def load_index(directory: str) -> Tuple[faiss.Index, Dict]:
+    """Read an index and apply its persisted search parameters"""
+    index = faiss.read_index(os.path.join(directory, INDEX_FILENAME))
+    params_path = os.path.join(directory, PARAMS_FILENAME)
+    if os.path.exists(params_path):
+        with open(params_path, 'r') as f:
+            index_config = json.load(f)
+    else:
+        # Stores written before index types were configurable are flat
+        index_config = resolve_index_config({'type': 'flat'})
+    apply_search_params(index, index_config)
+    return index, index_config
@@ -0,0 +1,101 @@
+import os
+import shutil
+from typing import Optional, Tuple
+
+CURRENT_FILENAME = 'CURRENT'
+GENERATION_PREFIX = 'gen-'
+
+
+def _fsync_dir(path: str):
+    """Flush directory entries (renames) to disk where the platform allows it"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class GenerationStore:
+    """Vector store directory made of immutable generations.
+
+    Each update writes a complete new ``gen-NNNNNN`` directory (index, texts,
+    metadata, manifest) and then atomically repoints the ``CURRENT`` file at it
+    with os.replace. A crash at any point leaves CURRENT naming a generation
+    whose files were all written together, so the index and its chunk data can
+    never get out of step.
+    """
+
+    def __init__(self, root: str, keep_generations: int = 2):
+        self.root = root
+        self.keep_generations = keep_generations
+
+    def current_generation(self) -> int:
+        """Number of the committed generation, or 0 if there is none"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILENAME), 'r') as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return 0
+        return int(name[len(GENERATION_PREFIX):])
+
+    def current_dir(self) -> Optional[str]:
+        """Directory of the committed generation, or None if there is none"""
+        generation = self.current_generation()
+        if not generation:
+            return None
+        return os.path.join(self.root, self._name(generation))
+
+    def begin(self) -> Tuple[int, str]:
+        """Create a scratch directory for the next generation"""
+        generation = self.current_generation() + 1
+        path = os.path.join(self.root, self._name(generation) + '.tmp')
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return generation, path
+
+    def commit(self, generation: int, temp_path: str) -> str:
+        """Publish a fully written generation and drop old ones"""
+        for entry in os.scandir(temp_path):
+            if entry.is_file():
+                with open(entry.path, 'rb+') as f:
+                    os.fsync(f.fileno())
+
+        final_path = os.path.join(self.root, self._name(generation))
+        shutil.rmtree(final_path, ignore_errors=True)
+        os.rename(temp_path, final_path)
+
+        current_path = os.path.join(self.root, CURRENT_FILENAME)
+        with open(current_path + '.tmp', 'w') as f:
+            f.write(self._name(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(current_path + '.tmp', current_path)
+        _fsync_dir(self.root)
+
+        self._cleanup(generation)
+        return final_path
+
+    def abort(self, temp_path: str):
+        """Discard a generation that was not committed"""
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def _cleanup(self, current: int):
+        """Remove generations older than the retention window and stale scratch dirs"""
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or not entry.name.startswith(GENERATION_PREFIX):
+                continue
+            number = entry.name[len(GENERATION_PREFIX):].split('.')[0]
+            if not number.isdigit():
+                continue
+            stale_temp = entry.name.endswith('.tmp')
+            if stale_temp or int(number) <= current - self.keep_generations:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    @staticmethod
+    def _name(generation: int) -> str:
+        return f"{GENERATION_PREFIX}{generation:06d}"
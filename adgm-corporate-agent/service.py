@@ -0,0 +1,182 @@
+# service.py
+"""Async HTTP API around the document review pipeline.
+
+    POST /analyze   multipart upload: one or more "files" parts (.docx/.pdf) and
+                    an optional "process" field (checklist key, default: identify).
+                    Returns {"report": ..., "reviewed_documents": [{"filename", "content_base64"}]};
+                    add ?documents=0 to return the report only.
+    GET  /health    queue depth and capacity
+
+Parsing, checking and comment insertion run in a process pool, so the event
+loop only moves bytes. At most --workers requests run at once and at most
+--queue more wait for a slot; anything beyond that is rejected immediately
+with 429 and a Retry-After header, so memory stays bounded under overload.
+Uploads over MAX_UPLOAD_MB in total are cut off with 413 while being read.
+Needs no API keys.
+
+Usage: python service.py [--host 127.0.0.1] [--port 8080] [--workers N] [--queue N]
+"""
+import argparse
+import asyncio
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from modules.document_checker import load_checklists
+from modules.red_flag_rules import load_red_flag_rules
+from modules.review_pipeline import init_worker, review_uploads
+
+SUPPORTED_EXTENSIONS = ('.docx', '.pdf')
+MAX_UPLOAD_MB = 50  # all parts of one upload together
+RETRY_AFTER_SECONDS = 1
+
+
+class UploadTooLarge(Exception):
+    """The multipart upload exceeded the service's size limit"""
+
+
+class AnalysisService:
+    """Bounded admission in front of a process pool running the review pipeline"""
+
+    def __init__(self, workers: int, max_queue: int, cache_options: Optional[Dict] = None,
+                 max_upload_mb: float = MAX_UPLOAD_MB):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache_options = cache_options
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.executor = None
+        self.slots = None
+        self.pending = 0  # admitted requests, running or waiting for a slot
+        self.rejected = 0
+        self.completed = 0
+
+    async def start(self, app: web.Application):
+        # Templates are read once here and handed to the workers
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.cache_options, load_checklists(), load_red_flag_rules()))
+        self.slots = asyncio.Semaphore(self.workers)
+
+    async def stop(self, app: web.Application):
+        self.executor.shutdown(cancel_futures=True)
+
+    def overloaded(self) -> bool:
+        return self.pending >= self.workers + self.max_queue
+
+    async def analyze(self, request: web.Request) -> web.Response:
+        # Admission is decided before the body is read, so rejected uploads cost nothing
+        if self.overloaded():
+            self.rejected += 1
+            return web.json_response({'error': 'Server busy, retry later'}, status=429,
+                                     headers={'Retry-After': str(RETRY_AFTER_SECONDS)})
+
+        self.pending += 1
+        try:
+            files, process = await self._read_upload(request)
+            async with self.slots:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, review_uploads, files, process, self.cache_options)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        except UploadTooLarge as e:
+            return web.json_response({'error': str(e)}, status=413)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        response = {'report': result['report']}
+        if request.query.get('documents', '1') != '0':
+            response['reviewed_documents'] = [
+                {'filename': name, 'content_base64': base64.b64encode(content).decode('ascii')}
+                for name, content in result['reviewed_documents'].items()
+            ]
+        return web.json_response(response)
+
+    async def _read_upload(self, request: web.Request):
+        """Return ([(filename, bytes)], process) from a multipart request.
+
+        client_max_size does not apply to request.multipart(), so parts are
+        read chunk by chunk against max_upload_bytes for the whole upload.
+        """
+        if not request.content_type.startswith('multipart/'):
+            raise ValueError('Expected a multipart/form-data upload')
+
+        files = []
+        process = None
+        received = 0
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name == 'process':
+                data = await self._read_part(part, received)
+                received += len(data)
+                process = data.decode(part.get_charset(default='utf-8')).strip() or None
+            elif part.name == 'files' and part.filename:
+                if not part.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    raise ValueError(f"Unsupported file type: {part.filename}")
+                data = await self._read_part(part, received)
+                received += len(data)
+                files.append((part.filename, data))
+        if not files:
+            raise ValueError('No documents uploaded')
+        return files, process
+
+    async def _read_part(self, part, received: int) -> bytes:
+        """Read one part, raising UploadTooLarge once the upload passes the limit"""
+        data = bytearray()
+        while True:
+            chunk = await part.read_chunk()
+            if not chunk:
+                return bytes(data)
+            data.extend(chunk)
+            if received + len(data) > self.max_upload_bytes:
+                raise UploadTooLarge(f"Upload exceeds the limit of {self.max_upload_bytes} bytes")
+
+    async def health(self, request: web.Request) -> web.Response:
+        running = min(self.pending, self.workers)
+        return web.json_response({
+            'status': 'busy' if self.overloaded() else 'ok',
+            'running': running,
+            'queued': self.pending - running,
+            'capacity': self.workers + self.max_queue,
+            'completed': self.completed,
+            'rejected': self.rejected
+        })
+
+
+def create_app(workers: Optional[int] = None, max_queue: Optional[int] = None,
+               cache_options: Optional[Dict] = None, max_upload_mb: float = MAX_UPLOAD_MB) -> web.Application:
+    workers = workers or os.cpu_count() or 1
+    service = AnalysisService(workers, workers * 2 if max_queue is None else max_queue, cache_options,
+                              max_upload_mb)
+
+    # client_max_size only bounds bodies read whole (request.read/post); uploads are counted in _read_upload
+    app = web.Application(client_max_size=service.max_upload_bytes)
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app.router.add_post('/analyze', service.analyze)
+    app.router.add_get('/health', service.health)
+    return app
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    arg_parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--queue', type=int, help='requests allowed to wait for a worker (default: 2 x workers)')
+    arg_parser.add_argument('--cache-dir', help='on-disk parse cache')
+    args = arg_parser.parse_args()
+
+    cache_options = {'disk_dir': os.path.abspath(args.cache_dir)} if args.cache_dir else None
+    # Templates are resolved relative to the project, wherever the command is run from
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"🚀 ADGM analysis service on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    web.run_app(create_app(args.workers, args.queue, cache_options), host=args.host, port=args.port,
+                print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # setup_rag.py
 import os
 import sys
-from modules.rag_system import ADGMRagSystem
+from modules.resources import resource_manager
 import config
 
 def setup_rag_system():
@@ -12,8 +12,8 @@ def setup_rag_system():
         # Validate configuration
         config.validate_config()
         
-        # Initialize RAG system
-        rag_system = ADGMRagSystem()
+        # Initialize RAG system with the shared embedding model
+        rag_system = resource_manager.get_rag_system()
         
         # Download ADGM documents
         print("📥 Downloading ADGM documents...")
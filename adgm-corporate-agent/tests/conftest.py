@@ -0,0 +1,109 @@
+import glob
+import io
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+import pytest
+from docx import Document
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DIR = os.path.join(PROJECT_ROOT, 'Sample doc')
+
+sys.path.insert(0, PROJECT_ROOT)
+
+# config.py refuses to import without a key; none of the tested code calls OpenAI
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+
+@pytest.fixture(autouse=True)
+def project_cwd(monkeypatch):
+    """Templates are resolved relative to the project root, as in the app"""
+    monkeypatch.chdir(PROJECT_ROOT)
+
+
+@pytest.fixture
+def sample_paths():
+    paths = sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.docx')))
+    assert paths, 'sample documents are missing'
+    return paths
+
+
+@pytest.fixture
+def make_docx():
+    """Build DOCX bytes from paragraphs; a paragraph given as a list becomes one run per item"""
+
+    def build(paragraphs):
+        doc = Document()
+        for paragraph in paragraphs:
+            if isinstance(paragraph, str):
+                doc.add_paragraph(paragraph)
+            else:
+                runs = doc.add_paragraph()
+                for text in paragraph:
+                    runs.add_run(text)
+        output = io.BytesIO()
+        doc.save(output)
+        return output.getvalue()
+
+    return build
+
+
+class HashingModel:
+    """Deterministic stand-in for the embedding model: a hashed bag of words"""
+
+    dimension = 64
+
+    def __init__(self):
+        self.encoded = []  # texts of every encode call
+
+    def encode(self, texts):
+        self.encoded.append(list(texts))
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, zlib.crc32(word.encode('utf-8')) % self.dimension] += 1
+        # Unit length, so L2 distance ranks like cosine similarity
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+
+CORPUS = [
+    ('https://example.test/companies', 'Companies Regulations. Every company shall keep a register of members '
+     'and a register of directors at its registered office in Abu Dhabi Global Market.'),
+    ('https://example.test/courts', 'Court procedure. Disputes are heard by the ADGM Courts, which apply English '
+     'common law. Appeals go to the Court of Appeal.'),
+    ('https://example.test/employment', 'Employment Regulations. An employer shall give every employee a written '
+     'contract with salary, working hours and annual leave.'),
+    ('https://example.test/data', 'Data Protection Regulations. A controller shall process personal data '
+     'lawfully, fairly and transparently and report breaches to the Commissioner.'),
+    ('https://example.test/licensing', 'Financial services licensing. A firm needs a financial services '
+     'permission from the FSRA before carrying on a regulated activity.'),
+]
+
+
+@pytest.fixture
+def corpus():
+    return [{'url': url, 'content': content, 'source': 'test'} for url, content in CORPUS]
+
+
+@pytest.fixture
+def make_rag_system(tmp_path):
+    """ADGMRagSystem on a temporary store with the hashing model (needs the RAG dependencies)"""
+    pytest.importorskip('sentence_transformers')
+    from modules.rag_system import ADGMRagSystem
+
+    def build(**kwargs):
+        options = {
+            'model': HashingModel(),
+            'index_config': {'type': 'flat'},
+            'store_path': str(tmp_path / 'vector_store'),
+            'embedding_cache_dir': None,
+            'search_mode': 'dense'
+        }
+        options.update(kwargs)
+        return ADGMRagSystem(**options)
+
+    return build
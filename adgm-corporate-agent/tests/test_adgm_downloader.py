@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.adgm_downloader import ADGMDownloader
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """Serves server.pages with an ETag and honours If-None-Match"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        body = self.server.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ConditionalHandler)
+    httpd.pages = {'/rules': b'<html>Companies Regulations 2020</html>'}
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def url_for(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def make_downloader(tmp_path):
+    return ADGMDownloader(cache_dir=str(tmp_path / 'cache'), per_host_interval=0, timeout=5)
+
+
+def test_unchanged_page_is_revalidated_with_a_304(server, tmp_path):
+    url = url_for(server, '/rules')
+
+    first = make_downloader(tmp_path).fetch(url)
+    # A fresh downloader only has the on-disk cache to go on
+    second = make_downloader(tmp_path).fetch(url)
+
+    assert first['status'] == 200 and not first['from_cache']
+    assert second['status'] == 304 and second['not_modified'] and second['from_cache']
+    assert second['content'] == first['content'] == server.pages['/rules']
+    assert second['content_type'] == 'text/html; charset=utf-8'
+    assert server.requests[0][1] is None
+    assert server.requests[1][1] is not None
+
+
+def test_changed_page_is_downloaded_again(server, tmp_path):
+    url = url_for(server, '/rules')
+    downloader = make_downloader(tmp_path)
+    downloader.fetch(url)
+
+    server.pages['/rules'] = b'<html>Companies Regulations 2020, as amended</html>'
+    changed = downloader.fetch(url)
+    revalidated = downloader.fetch(url)
+
+    assert changed['status'] == 200 and not changed['from_cache']
+    assert changed['content'] == server.pages['/rules']
+    assert revalidated['not_modified']
+    assert revalidated['content'] == server.pages['/rules']
+
+
+def test_cached_copy_is_served_when_the_server_fails(server, tmp_path):
+    url = url_for(server, '/rules')
+    downloader = make_downloader(tmp_path)
+    original = downloader.fetch(url)['content']
+
+    del server.pages['/rules']
+    result = downloader.fetch(url)
+
+    assert result['from_cache'] and result['error']
+    assert result['content'] == original
+
+
+def test_fetch_all_keeps_input_order_and_reports_misses(server, tmp_path):
+    server.pages['/courts'] = b'<html>ADGM Courts</html>'
+    urls = [url_for(server, path) for path in ('/courts', '/missing', '/rules')]
+
+    results = make_downloader(tmp_path).fetch_all(urls)
+
+    assert [result['url'] for result in results] == urls
+    assert results[1]['status'] == 404 and results[1]['content'] == b''
+    assert results[2]['content'] == server.pages['/rules']
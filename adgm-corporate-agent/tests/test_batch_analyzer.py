@@ -0,0 +1,56 @@
+import os
+
+from modules.batch_analyzer import BatchAnalyzer, analyze_batch, analyze_document
+
+
+def test_pool_results_match_in_process_analysis(sample_paths):
+    expected = [analyze_document(path) for path in sample_paths]
+
+    results = dict(analyze_batch(sample_paths, workers=2))
+
+    assert sorted(results) == list(range(len(sample_paths)))
+    assert [results[index] for index in range(len(sample_paths))] == expected
+
+
+def test_bytes_sources_use_their_filenames(sample_paths):
+    contents = []
+    for path in sample_paths[:2]:
+        with open(path, 'rb') as f:
+            contents.append(f.read())
+    filenames = ['first.docx', 'second.docx']
+
+    results = dict(analyze_batch(contents, workers=2, filenames=filenames))
+
+    assert [results[index]['filename'] for index in range(2)] == filenames
+    assert results[0]['content'] == analyze_document(sample_paths[0])['content']
+
+
+def test_unreadable_document_gets_an_error_flag():
+    (index, result), = analyze_batch([b'not a document'], filenames=['broken.docx'])
+
+    assert index == 0
+    assert 'error' in result
+    flag, = result['red_flags']
+    assert flag['type'] == 'document_error'
+    assert (flag['span'], flag['paragraph_index']) == ([0, 0], 0)
+
+
+def test_analyzer_keeps_its_pool_between_batches(sample_paths):
+    with BatchAnalyzer(workers=2) as analyzer:
+        first = dict(analyzer.analyze(sample_paths[:2]))
+        executor = analyzer._executor
+        second = dict(analyzer.analyze(sample_paths[:2]))
+
+        assert analyzer._executor is executor
+    assert first == second
+    assert analyzer._executor is None
+
+
+def test_unsupported_format_is_reported(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('plain text')
+
+    (_, result), = analyze_batch([str(path)])
+
+    assert result['error'] == 'Unsupported file format: .txt'
+    assert result['filename'] == os.path.basename(path)
@@ -0,0 +1,85 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from modules.bm25_index import BM25Index, build_bm25_index, reciprocal_rank_fusion, tokenize
+
+VOCABULARY = ['company', 'director', 'register', 'members', 's.12', 'court', 'appeal', 'licence', 'data', '2020']
+
+
+def reference_scores(texts, query, k1=1.5, b=0.75):
+    """Textbook BM25 over every document, for comparison"""
+    documents = [Counter(tokenize(text)) for text in texts]
+    lengths = [sum(terms.values()) for terms in documents]
+    average = sum(lengths) / len(lengths)
+    scores = {}
+    for position, terms in enumerate(documents):
+        score = 0.0
+        for term, count in Counter(tokenize(query)).items():
+            df = sum(term in other for other in documents)
+            if term in terms:
+                idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+                tf = terms[term]
+                score += count * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[position] / average))
+        if score > 0:
+            scores[position] = score
+    return scores
+
+
+def test_scores_match_the_reference_formula(tmp_path):
+    rng = random.Random(0)
+    texts = [' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 40))) for _ in range(300)]
+    chunk_ids = [10 * position + 7 for position in range(len(texts))]
+    build_bm25_index(str(tmp_path), zip(chunk_ids, texts))
+    index = BM25Index(str(tmp_path))
+
+    for _ in range(100):
+        query = ' '.join(rng.choice(VOCABULARY + ['unknown']) for _ in range(rng.randint(1, 4)))
+        expected = reference_scores(texts, query)
+
+        ids, scores = index.search(query, k=10)
+
+        top = sorted(expected.values(), reverse=True)[:10]
+        assert np.allclose(scores, top, rtol=1e-4)
+        assert np.allclose(scores, [expected[(chunk_id - 7) // 10] for chunk_id in ids], rtol=1e-4)
+
+
+def test_citations_are_single_terms(tmp_path):
+    build_bm25_index(str(tmp_path), [(1, 'See s.12 of the 2020 Regulations'), (2, 'Section 12 applies')])
+
+    ids, _ = BM25Index(str(tmp_path)).search('s.12', k=5)
+
+    assert tokenize('See s.12, para 4.2-b') == ['see', 's.12', 'para', '4.2-b']
+    assert ids.tolist() == [1]
+
+
+def test_queries_without_known_terms_return_nothing(tmp_path):
+    build_bm25_index(str(tmp_path), [(1, 'register of members')])
+    index = BM25Index(str(tmp_path))
+
+    ids, scores = index.search('unrelated words', k=5)
+
+    assert len(ids) == 0 and len(scores) == 0
+    assert len(index) == 1 and BM25Index.exists(str(tmp_path))
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[3, 1, 2, -1], [1, 4]], k=3)
+
+    assert [chunk_id for chunk_id, _ in fused] == [1, 3, 4]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_hybrid_search_finds_exact_terms_dense_search_misses(make_rag_system, corpus):
+    rag = make_rag_system(search_mode='hybrid')
+    rag.build_vector_store(corpus)
+
+    sparse = rag.search('FSRA', k=1, mode='sparse')
+    hybrid = rag.search('FSRA', k=2)
+
+    assert sparse[0]['metadata']['url'] == 'https://example.test/licensing'
+    assert 'https://example.test/licensing' in [result['metadata']['url'] for result in hybrid]
+    assert all(result['score'] > 0 for result in hybrid)
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from modules.chunk_store import ChunkStore, write_chunk_store
+
+WORDS = ['register', 'محكمة', 'société', '公司', 'ADGM', '§ 4.2']
+
+
+def random_chunks(rng, count):
+    """Sparse increasing ids with multilingual text and nested metadata"""
+    chunk_id = 0
+    for i in range(count):
+        chunk_id += rng.randint(1, 50)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))
+        yield chunk_id, text, {'url': f"https://example.test/{i}", 'chunk_index': i, 'spans': [i, i + len(text)]}
+
+
+def test_round_trip_matches_the_input(tmp_path):
+    chunks = list(random_chunks(random.Random(0), 2000))
+
+    assert write_chunk_store(str(tmp_path), chunks) == len(chunks)
+    store = ChunkStore(str(tmp_path))
+
+    assert ChunkStore.exists(str(tmp_path))
+    assert len(store) == len(chunks)
+    assert list(store) == chunks
+    for chunk_id, text, metadata in random.Random(1).sample(chunks, 200):
+        assert chunk_id in store
+        assert store.text(chunk_id) == text
+        assert store.metadata(chunk_id) == metadata
+
+
+def test_unknown_ids_return_none(tmp_path):
+    write_chunk_store(str(tmp_path), [(5, 'five', {}), (9, 'nine', {})])
+    store = ChunkStore(str(tmp_path))
+
+    for chunk_id in (0, 6, 10):
+        assert chunk_id not in store
+        assert store.text(chunk_id) is None and store.metadata(chunk_id) is None
+
+
+def test_empty_store_can_be_opened(tmp_path):
+    write_chunk_store(str(tmp_path), [])
+    store = ChunkStore(str(tmp_path))
+
+    assert len(store) == 0 and list(store) == []
+    assert store.text(1) is None
+
+
+def test_ids_must_increase(tmp_path):
+    with pytest.raises(ValueError):
+        write_chunk_store(str(tmp_path), [(2, 'b', {}), (2, 'again', {})])
+
+
+def test_incomplete_store_does_not_exist(tmp_path):
+    assert not ChunkStore.exists(str(tmp_path))
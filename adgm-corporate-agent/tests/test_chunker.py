@@ -0,0 +1,88 @@
+import random
+import re
+
+import pytest
+
+from modules.chunker import DocumentChunker
+
+VOCABULARY = ['company', 'shall', 'director', 'register', 'members', 'the', 'of', 'ADGM', 'resolution', 'notice']
+
+
+def random_text(rng, paragraphs):
+    """Numbered clauses, headings and plain paragraphs of random words"""
+    lines = []
+    for number in range(1, paragraphs + 1):
+        kind = rng.random()
+        words = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 40)))
+        if kind < 0.3:
+            lines.append(f"{number}. {words}")
+        elif kind < 0.4:
+            lines.append(words.upper()[:60])
+        else:
+            lines.append(words)
+        lines.append('' if rng.random() < 0.5 else ' ')
+    return '\n'.join(lines)
+
+
+def words_of(chunks):
+    return [chunk['text'].split() for chunk in chunks]
+
+
+def test_chunks_are_exact_slices_within_the_size_limit():
+    rng = random.Random(0)
+    chunker = DocumentChunker(chunk_size=40, overlap=8)
+
+    for _ in range(200):
+        text = random_text(rng, rng.randint(1, 30))
+        chunks = list(chunker.chunks(text))
+
+        for chunk in chunks:
+            assert chunk['text'] == text[chunk['start_char']:chunk['end_char']]
+            assert 0 < len(chunk['text'].split()) <= 40
+
+
+def test_consecutive_chunks_overlap_and_cover_every_word():
+    rng = random.Random(1)
+    chunker = DocumentChunker(chunk_size=40, overlap=8)
+
+    for _ in range(200):
+        text = random_text(rng, rng.randint(1, 30))
+        starts = [word.start() for word in re.finditer(r'\S+', text)]
+        covered = [{i for i, start in enumerate(starts) if chunk['start_char'] <= start < chunk['end_char']}
+                   for chunk in chunker.chunks(text)]
+
+        for previous, current in zip(covered, covered[1:]):
+            assert min(current) > min(previous)
+            assert 1 <= len(previous & current) <= 8
+        assert set().union(*covered) == set(range(len(starts)))
+
+
+def test_plain_text_uses_the_full_window_and_overlap():
+    text = ' '.join(f"w{i}" for i in range(25))
+
+    chunks = words_of(DocumentChunker(chunk_size=10, overlap=3).chunks(text))
+
+    assert chunks[0] == [f"w{i}" for i in range(10)]
+    assert chunks[1][:3] == chunks[0][-3:]
+    assert chunks[-1][-1] == 'w24'
+
+
+def test_windows_prefer_to_end_before_a_numbered_clause():
+    text = '1. ' + ' '.join(['alpha'] * 6) + '\n2. ' + ' '.join(['beta'] * 10)
+
+    first = next(DocumentChunker(chunk_size=10, overlap=0).chunks(text))
+
+    assert first['text'].split() == ['1.'] + ['alpha'] * 6
+
+
+def test_short_text_is_one_chunk_and_empty_text_none():
+    chunker = DocumentChunker(chunk_size=10, overlap=2)
+
+    assert words_of(chunker.chunks('Register of members')) == [['Register', 'of', 'members']]
+    assert list(chunker.chunks('  \n\n ')) == []
+
+
+@pytest.mark.parametrize('chunk_size, overlap', [(0, 0), (10, 10), (10, -1)])
+def test_invalid_settings_are_rejected(chunk_size, overlap):
+    with pytest.raises(ValueError):
+        DocumentChunker(chunk_size=chunk_size, overlap=overlap)
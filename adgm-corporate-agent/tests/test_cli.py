@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import cli
+from modules import review_pipeline
+
+
+@pytest.fixture
+def input_tree(tmp_path, sample_paths):
+    """Two packages: acme/ with two documents and acme/branch/ with one"""
+    root = tmp_path / 'input'
+    (root / 'acme' / 'branch').mkdir(parents=True)
+    for path in sample_paths[:2]:
+        shutil.copy(path, root / 'acme')
+    shutil.copy(sample_paths[-1], root / 'acme' / 'branch')
+    return root
+
+
+def run(*args):
+    return cli.main([str(arg) for arg in args] + ['--workers', '1'])
+
+
+def report_mtimes(output):
+    return {path: os.stat(path).st_mtime_ns for path in sorted(output.glob('**/report.json'))}
+
+
+def test_run_writes_reports_and_resumes(input_tree, tmp_path, capsys):
+    output = tmp_path / 'output'
+
+    assert run(input_tree, '-o', output) == 0
+    reports = report_mtimes(output)
+    assert sorted(path.relative_to(output).parent.as_posix() for path in reports) == ['acme', 'acme/branch']
+    report = json.loads((output / 'acme' / 'report.json').read_text())
+    assert report['package_id'] == 'acme'
+    assert len(report['document_details']) == 2
+    assert all((output / 'acme' / name).exists() for name in report['reviewed_documents'])
+    assert not list(output.glob('**/*.tmp'))
+
+    capsys.readouterr()
+    assert run(input_tree, '-o', output) == 0
+    assert '2 already complete, 0 to review' in capsys.readouterr().out
+    assert report_mtimes(output) == reports
+
+    assert run(input_tree, '-o', output, '--force') == 0
+    assert all(report_mtimes(output)[path] > mtime for path, mtime in reports.items())
+
+
+def test_changed_inputs_are_reviewed_again(input_tree, tmp_path, capsys):
+    output = tmp_path / 'output'
+    run(input_tree, '-o', output)
+    reports = report_mtimes(output)
+
+    branch_document = next((input_tree / 'acme' / 'branch').iterdir())
+    os.utime(branch_document, ns=(0, os.stat(branch_document).st_mtime_ns + 10 ** 9))
+    capsys.readouterr()
+    run(input_tree, '-o', output)
+
+    assert '1 already complete, 1 to review' in capsys.readouterr().out
+    after = report_mtimes(output)
+    assert after[output / 'acme' / 'report.json'] == reports[output / 'acme' / 'report.json']
+    assert after[output / 'acme' / 'branch' / 'report.json'] > reports[output / 'acme' / 'branch' / 'report.json']
+
+
+def test_output_inside_the_input_tree_is_not_input(input_tree, capsys):
+    output = input_tree / 'reviewed'
+    run(input_tree, '-o', output)
+    assert list(output.glob('**/reviewed_*'))
+
+    packages = cli.discover_packages(str(input_tree), exclude=str(output))
+    capsys.readouterr()
+    run(input_tree, '-o', output)
+
+    assert [package['id'] for package in packages] == ['acme', os.path.join('acme', 'branch')]
+    assert '2 packages found, 2 already complete' in capsys.readouterr().out
+
+
+def test_manifest_ids_must_be_unique_and_relative(tmp_path, sample_paths):
+    manifest = tmp_path / 'manifest.json'
+    for entries in ([{'id': 'a', 'files': [sample_paths[0]]}, {'id': './a', 'files': [sample_paths[1]]}],
+                    [{'id': '../outside', 'files': [sample_paths[0]]}]):
+        manifest.write_text(json.dumps(entries))
+
+        with pytest.raises(ValueError):
+            cli.discover_packages(str(manifest))
+        assert run(manifest, '-o', tmp_path / 'output') == 2
+
+
+def test_manifest_packages_are_reviewed(tmp_path, sample_paths):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps({'packages': [
+        {'id': 'acme-2024', 'files': sample_paths[:2], 'process': 'company_incorporation'}
+    ]}))
+
+    assert run(manifest, '-o', tmp_path / 'output') == 0
+    report = json.loads((tmp_path / 'output' / 'acme-2024' / 'report.json').read_text())
+    assert report['analysis_summary']['process'] == 'company_incorporation'
+
+
+def test_failed_writes_leave_no_temporary_files(tmp_path, monkeypatch):
+    def fail(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(review_pipeline, 'review_documents', lambda *args: ({}, {'reviewed_a.docx': b'data'}))
+    monkeypatch.setattr(os, 'replace', fail)
+
+    with pytest.raises(OSError):
+        cli._atomic_write_text(str(tmp_path / 'report.json'), '{}')
+    with pytest.raises(OSError):
+        review_pipeline.review_package(['a.docx'], str(tmp_path))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,116 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+
+from modules import document_parser
+from modules.batch_analyzer import REVIEWED_DOCUMENT, BatchAnalyzer
+from modules.cache import ParseCache
+from modules.document_parser import DOCUMENT_HANDLE, DocumentParser
+
+FLAGGED = ['Service terms', 'Disputes go to the Dubai Courts.']
+CLEAN = ['ADGM company notice', 'Signed on the date below, 2024.']
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Count python-docx Document() calls made by the parser"""
+    calls = []
+    open_docx = document_parser.Document
+
+    def counting(source):
+        calls.append(source)
+        return open_docx(source)
+
+    monkeypatch.setattr(document_parser, 'Document', counting)
+    return calls
+
+
+def paragraphs(document):
+    return [paragraph.text for paragraph in document.paragraphs]
+
+
+def test_cache_hits_reopen_the_document_only_when_asked(make_docx, opened, monkeypatch):
+    parser = DocumentParser(cache=ParseCache())
+    data = make_docx(FLAGGED)
+    parser.parse_bytes(data, 'terms.docx')
+    opened.clear()
+
+    def fail(*args):
+        raise AssertionError('cache hits must not analyse the text again')
+
+    monkeypatch.setattr(parser, '_analyze_content', fail)
+    plain = parser.parse_bytes(data, 'terms.docx')
+    kept = parser.parse_bytes(data, 'terms.docx', keep_document=True)
+
+    assert DOCUMENT_HANDLE not in plain
+    assert len(opened) == 1
+    assert paragraphs(kept[DOCUMENT_HANDLE]) == FLAGGED
+    assert DOCUMENT_HANDLE not in parser.parse_bytes(data, 'terms.docx')
+
+
+def test_in_process_analyses_keep_their_document(make_docx):
+    sources = [make_docx(FLAGGED), make_docx(CLEAN)]
+
+    with BatchAnalyzer(1, cache_options={}, keep_documents=True) as analyzer:
+        for run in ('parsed', 'cached'):
+            results = dict(analyzer.analyze(sources, ['a.docx', 'b.docx']))
+
+            assert paragraphs(results[0][DOCUMENT_HANDLE]) == FLAGGED, run
+            assert not results[1]['red_flags']
+
+
+def test_pool_hands_out_documents_only_for_flagged_cache_hits(make_docx, opened):
+    sources = [make_docx(FLAGGED), make_docx(CLEAN), make_docx(FLAGGED)]
+    filenames = ['a.docx', 'b.docx', 'c.docx']
+
+    with BatchAnalyzer(2, cache_options={}, keep_documents=True) as analyzer:
+        parsed = dict(analyzer.analyze(sources, filenames))
+        cached = dict(analyzer.analyze(sources, filenames))
+
+    # Pool results cannot carry a handle, and the parent does not parse them again
+    assert all(DOCUMENT_HANDLE not in result for result in parsed.values())
+    assert paragraphs(cached[0][DOCUMENT_HANDLE]) == FLAGGED
+    assert paragraphs(cached[2][DOCUMENT_HANDLE]) == FLAGGED
+    assert DOCUMENT_HANDLE not in cached[1]
+    assert len(opened) == 2
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_annotated_documents_are_parsed_once(make_docx, opened, workers):
+    sources = [make_docx(FLAGGED), make_docx(CLEAN), make_docx(FLAGGED)]
+    filenames = ['a.docx', 'b.docx', 'c.docx']
+
+    with BatchAnalyzer(workers, cache_options={}, annotate=True) as analyzer:
+        parsed = dict(analyzer.analyze(sources, filenames))
+        parses_in_this_process = len(opened)
+        cached = dict(analyzer.analyze(sources, filenames))
+
+    # Pool workers annotate the Document they parsed; nothing is reopened here
+    assert parses_in_this_process == (3 if workers == 1 else 0)
+    for results in (parsed, cached):
+        assert REVIEWED_DOCUMENT not in results[1]
+        for index in (0, 2):
+            reviewed = results[index].pop(REVIEWED_DOCUMENT)
+            assert paragraphs(Document(io.BytesIO(reviewed))) == FLAGGED
+            with zipfile.ZipFile(io.BytesIO(reviewed)) as archive:
+                assert b'non-ADGM jurisdiction' in archive.read('word/comments.xml')
+        assert all(DOCUMENT_HANDLE not in result for result in results.values())
+
+
+def test_handles_are_off_by_default(make_docx):
+    with BatchAnalyzer(2, cache_options={}) as analyzer:
+        results = dict(analyzer.analyze([make_docx(FLAGGED), make_docx(FLAGGED)], ['a.docx', 'b.docx']))
+
+    assert all(DOCUMENT_HANDLE not in result for result in results.values())
+
+
+def test_cached_results_never_hold_a_handle(make_docx):
+    parser = DocumentParser(cache=ParseCache())
+    data = make_docx(FLAGGED)
+
+    parser.parse_bytes(data, 'terms.docx', keep_document=True)
+    key = parser.cache.make_key(data, document_parser.PARSER_VERSION)
+
+    assert DOCUMENT_HANDLE not in parser.cache.get(key)
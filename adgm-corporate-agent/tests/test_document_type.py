@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from modules import keyword_matcher
+from modules.document_parser import DocumentParser
+from modules.keyword_matcher import KeywordMatcher
+
+BACKENDS = ['regex', pytest.param('automaton', marks=pytest.mark.skipif(
+    keyword_matcher.ahocorasick is None, reason='pyahocorasick is not installed'))]
+
+
+def reference_document_type(document_types, content):
+    """identify_document_type as it was before the keyword automaton"""
+    content_lower = content.lower()
+    scores = {}
+    for doc_type, keywords in document_types.items():
+        scores[doc_type] = sum(content_lower.count(keyword.lower()) * len(keyword.split()) for keyword in keywords)
+    if scores and max(scores.values()) > 0:
+        return max(scores, key=scores.get)
+    return 'unknown'
+
+
+def random_text(rng, keywords, length):
+    """Keywords, keyword fragments and filler glued together, so matches overlap and nest"""
+    pieces = []
+    for _ in range(length):
+        choice = rng.random()
+        if choice < 0.4:
+            pieces.append(rng.choice(keywords))
+        elif choice < 0.6:
+            keyword = rng.choice(keywords)
+            pieces.append(keyword[:rng.randrange(1, len(keyword) + 1)])
+        else:
+            pieces.append(rng.choice(['the', 'company', 'of', 'and', 'Board', 'ARTICLES', '.', '\n']))
+        pieces.append(rng.choice(['', ' ', ' ', '  ']))
+    return ''.join(pieces)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_counts_match_str_count(backend):
+    keywords = ['aa', 'aaa', 'ab', 'resolution', 'board resolution', 'resolution of']
+    matcher = KeywordMatcher(keywords, backend=backend)
+    rng = random.Random(3)
+
+    for _ in range(500):
+        text = random_text(rng, keywords + ['a', 'b'], rng.randrange(1, 30))
+        assert matcher.count(text) == {keyword: text.count(keyword) for keyword in keywords}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_matches_are_yielded_in_text_order(backend):
+    matcher = KeywordMatcher(['articles', 'articles of association', 'association'], backend=backend)
+
+    matches = list(matcher.iter_matches('the articles of association'))
+
+    assert matches == [(4, 'articles'), (4, 'articles of association'), (16, 'association')]
+
+
+@pytest.mark.skipif(keyword_matcher.ahocorasick is None, reason='pyahocorasick is not installed')
+def test_backends_agree_on_overlapping_and_contained_keywords():
+    keywords = ['abcd', 'bc', 'b', 'cd', 'abc', 'dab', 'bcdab']
+    regex = KeywordMatcher(keywords, backend='regex')
+    automaton = KeywordMatcher(keywords, backend='automaton')
+    rng = random.Random(5)
+
+    assert list(automaton.iter_matches('abcd')) == [(0, 'abcd'), (0, 'abc'), (1, 'bc'), (1, 'b'), (2, 'cd')]
+    for _ in range(2000):
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randrange(0, 30)))
+        assert list(automaton.iter_matches(text)) == list(regex.iter_matches(text)), text
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordMatcher(['a'], backend='simd')
+
+
+def test_document_type_matches_reference_scoring():
+    parser = DocumentParser()
+    keywords = [keyword for keywords in parser.document_types.values() for keyword in keywords]
+    rng = random.Random(11)
+
+    for _ in range(2000):
+        content = random_text(rng, keywords, rng.randrange(0, 40))
+        assert parser.identify_document_type(content) == reference_document_type(parser.document_types, content)
+
+
+def test_sample_documents_are_typed_as_before(sample_paths):
+    parser = DocumentParser()
+
+    for path in sample_paths:
+        content = parser.extract_docx_text(path)
+        assert parser.identify_document_type(content) == reference_document_type(parser.document_types, content)
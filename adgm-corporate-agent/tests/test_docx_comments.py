@@ -0,0 +1,151 @@
+import io
+import random
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.part import PartFactory
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+
+from modules.comment_inserter import CommentInserter
+from modules.document_checker import DocumentChecker
+from modules.document_parser import DocumentParser, paragraph_table
+from modules.docx_comments import DocxComments
+
+JURISDICTIONS = ['Dubai Courts', 'DIFC', 'Sharjah', 'UAE Federal', 'federal law']
+FILLER = ['The company', 'shall keep', 'its books', 'at the office', 'of the secretary', 'in good order']
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return DocumentParser()
+
+
+@pytest.fixture(scope='module')
+def checker():
+    return DocumentChecker()
+
+
+def review(parser, checker, data):
+    """Analyse DOCX bytes and return (analysis, reviewed DOCX bytes)"""
+    analysis = parser.parse_bytes(data, 'contract.docx')
+    analysis['red_flags'] = checker.detect_red_flags(analysis)
+    reviewed = CommentInserter().review_document_bytes(data, 'contract.docx', analysis['red_flags'],
+                                                       paragraphs=paragraph_table(analysis))
+    assert reviewed is not None
+    return analysis, reviewed
+
+
+def comment_anchors(data):
+    """comment id -> (doc.paragraphs index, text of the runs inside its range)"""
+    anchors = {}
+    for index, paragraph in enumerate(Document(io.BytesIO(data)).paragraphs):
+        open_ranges = []
+        for child in paragraph._p.iterchildren():
+            if child.tag == qn('w:commentRangeStart'):
+                open_ranges.append(child.get(qn('w:id')))
+                anchors[child.get(qn('w:id'))] = (index, '')
+            elif child.tag == qn('w:commentRangeEnd'):
+                open_ranges.remove(child.get(qn('w:id')))
+            elif child.tag == qn('w:r'):
+                text = ''.join(t.text or '' for t in child.iter(qn('w:t')))
+                for comment_id in open_ranges:
+                    anchors[comment_id] = (index, anchors[comment_id][1] + text)
+    return anchors
+
+
+def comment_texts(data):
+    """comment id -> comment text"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        comments = parse_xml(archive.read('word/comments.xml'))
+    return {comment.get(qn('w:id')): ''.join(t.text for t in comment.iter(qn('w:t')))
+            for comment in comments.iterchildren(qn('w:comment'))}
+
+
+def test_importing_does_not_register_part_classes_globally():
+    assert CT.WML_COMMENTS not in PartFactory.part_type_for
+
+
+def test_comment_range_covers_evidence_split_across_runs(parser, checker, make_docx):
+    data = make_docx(['Employment terms', '', ['Disputes go to the Dub', 'ai Cou', 'rts only.'], 'Signed 2024'])
+
+    analysis, reviewed = review(parser, checker, data)
+
+    flag, = analysis['red_flags']
+    assert flag['type'] == 'jurisdiction_error'
+    (comment_id, (paragraph, covered)), = comment_anchors(reviewed).items()
+    assert paragraph == 2
+    assert covered == 'Disputes go to the Dubai Courts only.'
+    assert comment_texts(reviewed)[comment_id].startswith('ISSUE #1 - HIGH: Document references non-ADGM')
+
+
+def test_text_that_grows_when_lowercased_does_not_shift_the_comment(parser, checker, make_docx):
+    data = make_docx(['İ' * 200, '', 'Disputes go to the Dubai Courts.'])
+
+    analysis, reviewed = review(parser, checker, data)
+
+    flag, = [flag for flag in analysis['red_flags'] if flag['type'] == 'jurisdiction_error']
+    start, end = flag['span']
+    assert analysis['content'][start:end] == 'Dubai Courts'
+    assert flag['paragraph_index'] == 2
+    paragraph, covered = comment_anchors(reviewed)[str(analysis['red_flags'].index(flag))]
+    assert (paragraph, covered) == (2, 'Disputes go to the Dubai Courts.')
+
+
+def test_comment_ranges_land_on_the_evidence_in_random_documents(parser, checker, make_docx):
+    rng = random.Random(0)
+    for _ in range(50):
+        term = rng.choice(JURISDICTIONS)
+        paragraphs = []
+        for _ in range(rng.randint(1, 8)):
+            if rng.random() < 0.2:
+                paragraphs.append(rng.choice(['', '   ']))
+            elif rng.random() < 0.2:
+                # Grows when lowercased
+                paragraphs.append('İ' * rng.randint(1, 200))
+            else:
+                words = rng.sample(FILLER, rng.randint(1, 4))
+                paragraphs.append(words if rng.random() < 0.5 else ' '.join(words))
+        evidence_paragraph = rng.randrange(len(paragraphs) + 1)
+        words = rng.sample(FILLER, 2)
+        words.insert(rng.randint(0, 2), term)
+        paragraphs.insert(evidence_paragraph, [f"  {words[0]} ", words[1], f" {words[2]}"])
+
+        analysis, reviewed = review(parser, checker, make_docx(paragraphs))
+
+        types = [flag['type'] for flag in analysis['red_flags']]
+        anchors = comment_anchors(reviewed)
+        assert len(anchors) == len(types)
+        flag = analysis['red_flags'][types.index('jurisdiction_error')]
+        assert flag['paragraph_index'] == evidence_paragraph
+        paragraph, covered = anchors[str(types.index('jurisdiction_error'))]
+        assert paragraph == evidence_paragraph
+        assert term in covered
+
+
+def test_existing_comments_are_kept(parser, checker, make_docx):
+    _, reviewed = review(parser, checker, make_docx(['Governed by DIFC law.', 'Signed on 1 May 2024']))
+
+    document = Document(io.BytesIO(reviewed))
+    DocxComments(document).add(document.paragraphs[1], ['Second opinion'])
+    output = io.BytesIO()
+    document.save(output)
+
+    texts = comment_texts(output.getvalue())
+    assert list(texts) == ['0', '1']
+    assert texts['1'] == 'Second opinion'
+    assert {comment_id: anchor[0] for comment_id, anchor in comment_anchors(output.getvalue()).items()} == \
+        {'0': 0, '1': 1}
+
+
+def test_comment_dates_are_utc(make_docx):
+    document = Document(io.BytesIO(make_docx(['Governed by DIFC law.'])))
+    comments = DocxComments(document)
+    comments.add(document.paragraphs[0], ['Check the governing law'])
+
+    comment, = comments._comments.iterchildren(qn('w:comment'))
+    stamped = datetime.strptime(comment.get(qn('w:date')), '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    assert abs(datetime.now(timezone.utc) - stamped) < timedelta(minutes=1)
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from modules.embedding_cache import KEYS_FILENAME, VECTORS_FILENAME, EmbeddingCache
+
+
+def vectors(n, dimension=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dimension)).astype('float32')
+
+
+def test_vectors_round_trip_across_instances(tmp_path):
+    keys = [EmbeddingCache.make_key(f"chunk {i}") for i in range(5)]
+    stored = vectors(5)
+    EmbeddingCache(str(tmp_path), 'model-a').put_many(keys, stored)
+
+    cache = EmbeddingCache(str(tmp_path), 'model-a')
+    found, missing = cache.get_many(keys[::-1] + ['unknown'])
+
+    assert missing == [5]
+    assert all(np.array_equal(found[position], stored[4 - position]) for position in range(5))
+    assert cache.stats()['hits'] == 5 and cache.stats()['misses'] == 1
+
+
+def test_repeated_keys_are_stored_once(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'model-a')
+    stored = vectors(3)
+
+    cache.put_many(['a', 'b', 'a'], stored)
+    cache.put_many(['b'], vectors(1, seed=1))
+
+    assert len(cache) == 2
+    found, _ = cache.get_many(['a', 'b'])
+    assert np.array_equal(found[0], stored[2]) and np.array_equal(found[1], stored[1])
+
+
+def test_models_do_not_share_vectors(tmp_path):
+    EmbeddingCache(str(tmp_path), 'model-a').put_many(['a'], vectors(1))
+
+    other = EmbeddingCache(str(tmp_path), 'model-b')
+
+    assert other.get_many(['a']) == ({}, [0])
+    with pytest.raises(ValueError):
+        EmbeddingCache(str(tmp_path), 'model-a').put_many(['b'], vectors(1, dimension=4))
+
+
+def test_torn_writes_are_trimmed_on_load(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'model-a')
+    stored = vectors(3)
+    cache.put_many(['a', 'b', 'c'], stored)
+
+    # A crash after the vector rows of the next batch but before its keys
+    with open(os.path.join(cache.directory, VECTORS_FILENAME), 'ab') as f:
+        f.write(vectors(2, seed=1).tobytes()[:40])
+    with open(os.path.join(cache.directory, KEYS_FILENAME), 'a') as f:
+        f.write('d')
+
+    reloaded = EmbeddingCache(str(tmp_path), 'model-a')
+    found, missing = reloaded.get_many(['a', 'b', 'c', 'd'])
+
+    assert missing == [3]
+    assert np.array_equal(np.stack([found[i] for i in range(3)]), stored)
+    reloaded.put_many(['d'], vectors(1, seed=2))
+    assert np.array_equal(EmbeddingCache(str(tmp_path), 'model-a').get_many(['d'])[0][0], vectors(1, seed=2)[0])
+
+
+def test_instances_pick_up_each_others_appends(tmp_path):
+    first = EmbeddingCache(str(tmp_path), 'model-a')
+    second = EmbeddingCache(str(tmp_path), 'model-a')
+
+    first.put_many(['a', 'b'], vectors(2))
+    second.put_many(['b', 'c'], vectors(2, seed=1))
+
+    found, missing = EmbeddingCache(str(tmp_path), 'model-a').get_many(['a', 'b', 'c'])
+    assert missing == []
+    assert np.array_equal(found[1], vectors(2)[1])
+    assert np.array_equal(found[2], vectors(2, seed=1)[1])
+
+
+def append_batches(directory, worker):
+    cache = EmbeddingCache(directory, 'model-a')
+    for batch in range(20):
+        keys = [f"{worker}-{batch}-{i}" for i in range(5)] + [f"shared-{batch}"]
+        cache.put_many(keys, np.stack([key_vector(key) for key in keys]))
+
+
+def key_vector(key):
+    return np.frombuffer(key.ljust(32).encode('ascii'), dtype='float32')
+
+
+def test_concurrent_processes_keep_rows_and_keys_aligned(tmp_path):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=append_batches, args=(str(tmp_path), worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    keys = [f"{worker}-{batch}-{i}" for worker in range(4) for batch in range(20) for i in range(5)]
+    keys += [f"shared-{batch}" for batch in range(20)]
+    cache = EmbeddingCache(str(tmp_path), 'model-a')
+    found, missing = cache.get_many(keys)
+
+    assert missing == [] and len(cache) == len(keys)
+    assert all(np.array_equal(found[position], key_vector(key)) for position, key in enumerate(keys))
@@ -0,0 +1,61 @@
+import random
+import re
+import time
+
+from modules.document_parser import SECTION_LABELS, SECTION_SCAN_LIMIT, DocumentParser
+
+# extract_sections before the patterns were compiled into one bounded scan
+REFERENCE_PATTERNS = {
+    section: [rf'{label}[:\s]+(.*?)(?:\n|\.)' for label in labels]
+    for section, labels in SECTION_LABELS.items()
+}
+
+WORDS = ['Company Name', 'name of the company', 'jurisdiction', 'Governing Law', 'court', 'courts',
+         'registered office', 'office address', 'share capital', 'Capital', 'nominal value',
+         'Director', 'directors', 'appointment of directors', 'ADGM', 'Abu Dhabi', 'AED 1,000',
+         'Ltd', ':', ': ', '.', '\n', ' ', '  ', ':\n']
+
+
+def reference_sections(content):
+    sections = {}
+    for section, patterns in REFERENCE_PATTERNS.items():
+        for pattern in patterns:
+            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+            if match:
+                sections[section] = match.group(1).strip()[:200]
+                break
+    return sections
+
+
+def test_sections_match_reference_extraction():
+    parser = DocumentParser()
+    rng = random.Random(5)
+
+    for _ in range(3000):
+        content = ''.join(rng.choice(WORDS) + rng.choice(['', ' ']) for _ in range(rng.randrange(1, 25)))
+        assert parser.extract_sections(content) == reference_sections(content), content
+
+
+def test_sample_documents_match_reference_extraction(sample_paths):
+    parser = DocumentParser()
+
+    for path in sample_paths:
+        content = parser.parse_document(path)['content']
+        assert parser.extract_sections(content) == reference_sections(content)
+
+
+def test_text_without_terminators_is_scanned_in_bounded_time():
+    parser = DocumentParser()
+    content = 'director ' * 100000
+
+    start = time.perf_counter()
+    assert parser.extract_sections(content) == {}
+    assert time.perf_counter() - start < 5
+
+
+def test_labels_past_the_scan_limit_are_ignored():
+    parser = DocumentParser()
+    content = 'x' * SECTION_SCAN_LIMIT + ' jurisdiction: ADGM.'
+
+    assert parser.extract_sections(content) == {}
+    assert parser.extract_sections(content[-20:]) == {'jurisdiction': 'ADGM'}
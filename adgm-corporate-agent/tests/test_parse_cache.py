@@ -0,0 +1,107 @@
+import os
+
+from modules import document_parser
+from modules.batch_analyzer import BatchAnalyzer
+from modules.cache import LRUCache, ParseCache
+from modules.document_parser import DocumentParser
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['hits'] == 3
+    assert cache.stats()['misses'] == 1
+
+
+def test_key_depends_on_content_and_parser_version():
+    key = ParseCache.make_key(b'document', '1')
+
+    assert key == ParseCache.make_key(b'document', '1')
+    assert key != ParseCache.make_key(b'document!', '1')
+    assert key != ParseCache.make_key(b'document', '2')
+
+
+def test_cached_results_are_copies():
+    cache = ParseCache()
+    cache.put('key', {'sections': {'jurisdiction': 'ADGM'}})
+
+    cache.get('key')['sections']['jurisdiction'] = 'changed'
+
+    assert cache.get('key')['sections']['jurisdiction'] == 'ADGM'
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ParseCache(disk_dir=str(tmp_path)).put('key', {'content': 'text'})
+
+    cache = ParseCache(disk_dir=str(tmp_path))
+
+    assert cache.get('key') == {'content': 'text'}
+    assert cache.stats()['disk_hits'] == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 0
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = ParseCache(disk_dir=str(tmp_path), max_disk_mb=0.01)
+    for index in range(20):
+        cache.put(f'key{index}', {'content': 'x' * 1000})
+
+    total = sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+    assert total <= 0.01 * 1024 * 1024
+    assert cache.get('key19') is not None
+
+
+def test_corrupt_disk_entry_is_discarded(tmp_path):
+    (tmp_path / 'key.json').write_text('{not json')
+
+    assert ParseCache(disk_dir=str(tmp_path)).get('key') is None
+    assert not (tmp_path / 'key.json').exists()
+
+
+def test_unchanged_reupload_skips_extraction(sample_paths, monkeypatch):
+    parser = DocumentParser(cache=ParseCache())
+    first = parser.parse_document(sample_paths[0])
+
+    def fail(*args, **kwargs):
+        raise AssertionError('document parsed again')
+
+    monkeypatch.setattr(parser, '_parse_docx', fail)
+    with open(sample_paths[0], 'rb') as f:
+        second = parser.parse_bytes(f.read(), 'renamed.docx')
+
+    assert second == dict(first, filename='renamed.docx')
+
+
+def test_parser_version_bump_invalidates_entries(sample_paths, monkeypatch):
+    parser = DocumentParser(cache=ParseCache())
+    parser.parse_document(sample_paths[0])
+
+    monkeypatch.setattr(document_parser, 'PARSER_VERSION', 'next')
+    parser.parse_document(sample_paths[0])
+
+    assert parser.cache.stats()['hits'] == 0
+    assert parser.cache.stats()['misses'] == 2
+
+
+def test_failed_parses_are_not_cached():
+    parser = DocumentParser(cache=ParseCache())
+
+    assert 'error' in parser.parse_bytes(b'broken', 'broken.docx')
+    assert 'error' in parser.parse_bytes(b'broken', 'broken.docx')
+    assert len(parser.cache.memory) == 0
+
+
+def test_analyzer_answers_repeat_batches_from_its_own_cache(sample_paths):
+    with BatchAnalyzer(workers=2, cache_options={}) as analyzer:
+        first = dict(analyzer.analyze(sample_paths))
+        assert analyzer.cache_stats()['misses'] == len(sample_paths)
+
+        second = dict(analyzer.analyze(sample_paths))
+
+        assert analyzer.cache_stats()['hits'] == len(sample_paths)
+    assert second == first
@@ -0,0 +1,103 @@
+import io
+
+import pdfplumber
+import pytest
+
+from modules import document_parser
+from modules.document_parser import DocumentParser
+
+reportlab_canvas = pytest.importorskip('reportlab.pdfgen.canvas')
+
+open_pdf = pdfplumber.open
+
+PAGE_TEXTS = ['Articles of Association page one', 'Registered office page two', 'Directors page three']
+
+
+@pytest.fixture
+def pdf_bytes():
+    output = io.BytesIO()
+    canvas = reportlab_canvas.Canvas(output)
+    for text in PAGE_TEXTS:
+        canvas.drawString(72, 720, text)
+        canvas.showPage()
+    canvas.save()
+    return output.getvalue()
+
+
+class BrokenPageTree:
+    """pdfplumber document whose page iteration fails after the first page"""
+
+    def __init__(self, source):
+        self.pdf = open_pdf(source)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pdf.close()
+
+    @property
+    def pages(self):
+        yield self.pdf.pages[0]
+        raise RuntimeError('broken page tree')
+
+
+def stripped(pages):
+    # PyPDF2 ends its page text with a newline where pdfplumber does not
+    return [page.strip() for page in pages]
+
+
+def test_pages_are_yielded_in_order(pdf_bytes):
+    pages = list(DocumentParser().iter_pdf_pages(io.BytesIO(pdf_bytes)))
+
+    assert pages == PAGE_TEXTS
+
+
+def test_pages_are_only_extracted_as_they_are_consumed(pdf_bytes, monkeypatch):
+    extracted = []
+    extract_text = pdfplumber.page.Page.extract_text
+
+    def counting(page, **kwargs):
+        extracted.append(page.page_number)
+        return extract_text(page, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, 'extract_text', counting)
+    pages = DocumentParser().iter_pdf_pages(io.BytesIO(pdf_bytes))
+
+    assert next(pages) == PAGE_TEXTS[0]
+    pages.close()
+    assert extracted == [1]
+
+
+def test_empty_page_falls_back_to_pypdf2(pdf_bytes, monkeypatch):
+    monkeypatch.setattr(pdfplumber.page.Page, 'extract_text', lambda self, **kwargs: '')
+
+    assert stripped(DocumentParser().iter_pdf_pages(io.BytesIO(pdf_bytes))) == PAGE_TEXTS
+
+
+def test_unopenable_pdf_falls_back_to_pypdf2(pdf_bytes, monkeypatch):
+    def fail(source):
+        raise RuntimeError('cannot open')
+
+    monkeypatch.setattr(document_parser.pdfplumber, 'open', fail)
+
+    assert stripped(DocumentParser().iter_pdf_pages(io.BytesIO(pdf_bytes))) == PAGE_TEXTS
+
+
+def test_page_tree_failure_falls_back_for_the_remaining_pages(pdf_bytes, monkeypatch):
+    monkeypatch.setattr(document_parser.pdfplumber, 'open', BrokenPageTree)
+
+    assert stripped(DocumentParser().iter_pdf_pages(io.BytesIO(pdf_bytes))) == PAGE_TEXTS
+
+
+def test_parse_bytes_reads_pdfs(pdf_bytes):
+    result = DocumentParser().parse_bytes(pdf_bytes, 'filing.pdf')
+
+    assert result['content'] == ' '.join(PAGE_TEXTS)
+    assert result['document_type'] == 'articles_of_association'
+
+
+def test_unreadable_pdf_is_an_error():
+    result = DocumentParser().parse_bytes(b'%PDF-1.4 truncated', 'broken.pdf')
+
+    assert 'error' in result
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from modules.document_checker import DocumentChecker, load_checklists
+
+
+def baseline_identify_process(checklists, documents):
+    """Process identification as it was before the checklist index, kept to check parity"""
+    valid_doc_types = [doc.get('document_type', 'unknown') for doc in documents]
+    valid_doc_types = [dt for dt in valid_doc_types if dt != 'unknown']
+    if not valid_doc_types:
+        return 'unknown'
+
+    best_match = 'unknown'
+    highest_score = 0
+    for process, requirements in checklists.items():
+        all_docs = requirements.get('required_documents', []) + requirements.get('optional_documents', [])
+        matches = sum(1 for doc_type in valid_doc_types if doc_type in all_docs)
+        score = matches / len(valid_doc_types)
+        if score > highest_score and matches > 0:
+            highest_score = score
+            best_match = process
+    return best_match
+
+
+def baseline_missing_documents(checklists, documents, process):
+    uploaded = [doc.get('document_type', 'unknown') for doc in documents]
+    return [doc for doc in checklists[process].get('required_documents', []) if doc not in uploaded]
+
+
+def random_packages(checklists, seed, count):
+    doc_types = sorted({doc_type for requirements in checklists.values()
+                        for key in ('required_documents', 'optional_documents')
+                        for doc_type in requirements.get(key, [])})
+    doc_types += ['unknown', 'unlisted_type']
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield [{'document_type': rng.choice(doc_types)} for _ in range(rng.randint(0, 8))]
+
+
+@pytest.fixture
+def checklists():
+    return load_checklists()
+
+
+def test_identification_matches_the_original_on_random_packages(checklists):
+    checker = DocumentChecker(checklists)
+
+    for documents in random_packages(checklists, seed=0, count=20000):
+        process = checker.identify_process(documents)
+
+        assert process == baseline_identify_process(checklists, documents), documents
+        suggestions = checker.suggest_processes(documents)
+        assert (suggestions[0]['process'] if suggestions else 'unknown') == process
+
+
+def test_completeness_matches_the_original_on_random_packages(checklists):
+    checker = DocumentChecker(checklists)
+    processes = list(checklists) + ['unknown', 'unlisted_process']
+    rng = random.Random(1)
+
+    for documents in random_packages(checklists, seed=1, count=20000):
+        process = rng.choice(processes)
+        report = checker.check_completeness(documents, process)
+
+        assert report['documents_uploaded'] == len(documents)
+        if process not in checklists:
+            assert report['missing_documents'] == [] and report['completion_rate'] == 0.0
+            continue
+        required = checklists[process]['required_documents']
+        missing = baseline_missing_documents(checklists, documents, process)
+        assert report['missing_documents'] == missing
+        assert report['completion_rate'] == (len(required) - len(missing)) / len(required)
+
+
+def test_ties_go_to_the_process_listed_first():
+    checklists = {
+        'first': {'required_documents': ['a'], 'optional_documents': []},
+        'second': {'required_documents': ['b'], 'optional_documents': ['a']},
+    }
+    checker = DocumentChecker(checklists)
+
+    assert checker.identify_process([{'document_type': 'a'}]) == 'first'
+    assert checker.identify_process([{'document_type': 'a'}, {'document_type': 'b'}]) == 'second'
+    assert checker.identify_process([{'document_type': 'unknown'}]) == 'unknown'
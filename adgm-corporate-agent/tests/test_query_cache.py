@@ -0,0 +1,68 @@
+from modules.cache import LRUCache
+
+
+def test_lru_cache_evicts_the_least_recently_used_entry():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 1
+
+
+def test_repeated_queries_skip_the_model(make_rag_system, corpus):
+    rag = make_rag_system(result_cache_size=0)
+    rag.build_vector_store(corpus)
+    rag.model.encoded.clear()
+
+    first = rag.search_batch(['register of members', 'annual  leave ', 'register of members'], k=2)
+    second = rag.search_batch([' annual leave', 'register   of members'], k=2)
+
+    # Duplicates and whitespace variants are encoded once
+    assert rag.model.encoded == [['register of members', 'annual leave']]
+    assert second == [first[1], first[0]]
+
+
+def test_result_cache_answers_repeats_without_searching(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+    expected = rag.search('personal data breaches', k=3)
+    rag.model.encoded.clear()
+
+    assert rag.search('personal  data breaches', k=3) == expected
+    assert rag.model.encoded == []
+    assert rag.cache_stats()['results']['hits'] == 1
+
+
+def test_cached_results_are_not_shared_with_callers(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+
+    results = rag.search('ADGM Courts', k=2)
+    results[0]['metadata']['url'] = 'changed'
+    results.clear()
+
+    assert rag.search('ADGM Courts', k=2)[0]['metadata']['url'] == 'https://example.test/courts'
+
+
+def test_rebuilds_invalidate_cached_results(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus[1:])
+    assert rag.search('register of directors', k=1)[0]['metadata']['url'] != corpus[0]['url']
+
+    rag.build_vector_store(corpus)
+
+    assert rag.search('register of directors', k=1)[0]['metadata']['url'] == corpus[0]['url']
+
+
+def test_tuning_search_params_clears_cached_results(make_rag_system, corpus):
+    rag = make_rag_system(index_config={'type': 'hnsw'})
+    rag.build_vector_store(corpus)
+    rag.search('financial services permission', k=2)
+
+    rag.set_search_params(ef_search=32, persist=False)
+
+    assert len(rag.result_cache) == 0
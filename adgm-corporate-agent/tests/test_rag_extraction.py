@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from modules.document_parser import extract_text_from_bytes
+
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+@pytest.fixture
+def rag_system():
+    pytest.importorskip('sentence_transformers')
+    from modules import rag_system
+    return rag_system
+
+
+@pytest.fixture
+def pdf_bytes():
+    canvas_module = pytest.importorskip('reportlab.pdfgen.canvas')
+    output = io.BytesIO()
+    canvas = canvas_module.Canvas(output)
+    canvas.drawString(72, 720, 'Employment Regulations 2019')
+    canvas.showPage()
+    canvas.save()
+    return output.getvalue()
+
+
+def test_docx_and_pdf_bytes_are_extracted(make_docx, pdf_bytes):
+    docx_text = extract_text_from_bytes(make_docx(['Companies Regulations', ['Part ', '1']]), '.docx')
+
+    assert docx_text.split('\n') == ['Companies Regulations', 'Part 1']
+    assert 'Employment Regulations 2019' in extract_text_from_bytes(pdf_bytes, '.pdf')
+
+
+@pytest.mark.parametrize('content_type, url, expected', [
+    ('application/pdf', 'https://example.test/download', '.pdf'),
+    (DOCX, 'https://example.test/download', '.docx'),
+    ('text/html; charset=utf-8', 'https://example.test/rules.pdf', None),
+    ('application/octet-stream', 'https://example.test/Rules.PDF', '.pdf'),
+    ('application/octet-stream', 'https://example.test/form.docx?version=2', '.docx'),
+    ('application/octet-stream', 'https://example.test/rules.pdf.html', None),
+    ('application/octet-stream', 'https://example.test/docx-guides/index', None),
+    ('application/octet-stream', 'https://example.test/rules.docx.zip', None),
+])
+def test_binary_documents_are_recognised(rag_system, content_type, url, expected):
+    assert rag_system._binary_document_extension(content_type, url) == expected
+
+
+def test_responses_are_extracted_by_type(rag_system, make_rag_system, make_docx, pdf_bytes):
+    rag = make_rag_system()
+    html = b'<html><script>var x;</script><body><p>Court   procedure</p><p>Appeals</p></body></html>'
+    results = [
+        {'url': 'https://example.test/rules.pdf', 'content': pdf_bytes, 'content_type': 'application/pdf'},
+        {'url': 'https://example.test/form', 'content': make_docx(['Data  Protection', 'Controllers']),
+         'content_type': DOCX},
+        {'url': 'https://example.test/courts', 'content': html, 'content_type': 'text/html'},
+        {'url': 'https://example.test/notes.txt', 'content': b'Plain notes', 'content_type': 'text/plain'},
+    ]
+
+    texts = rag._extract_texts(results)
+
+    assert 'Employment Regulations 2019' in texts['https://example.test/rules.pdf']
+    assert texts['https://example.test/form'] == 'Data Protection\nControllers'
+    assert 'Court procedure' in texts['https://example.test/courts']
+    assert 'var x' not in texts['https://example.test/courts']
+    assert texts['https://example.test/notes.txt'] == 'Plain notes'
+
+
+def test_unreadable_documents_do_not_stop_extraction(rag_system, make_rag_system):
+    rag = make_rag_system()
+    results = [
+        {'url': 'https://example.test/broken.pdf', 'content': b'not a pdf', 'content_type': 'application/pdf'},
+        {'url': 'https://example.test/notes', 'content': b'Plain notes', 'content_type': 'text/plain'},
+    ]
+
+    texts = rag._extract_texts(results)
+
+    assert texts == {'https://example.test/broken.pdf': '', 'https://example.test/notes': 'Plain notes'}
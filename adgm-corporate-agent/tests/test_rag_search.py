@@ -0,0 +1,50 @@
+import pytest
+
+
+def test_batch_search_matches_single_queries(make_rag_system, corpus):
+    rag = make_rag_system(query_cache_size=0, result_cache_size=0)
+    rag.build_vector_store(corpus)
+    queries = ['register of directors', 'ADGM Courts appeal', 'personal data breaches']
+
+    batched = rag.search_batch(queries, k=2)
+
+    assert batched == [rag.search(query, k=2) for query in queries]
+    assert batched[0][0]['metadata']['url'] == 'https://example.test/companies'
+    assert batched[1][0]['metadata']['url'] == 'https://example.test/courts'
+
+
+def test_batch_search_encodes_all_queries_at_once(make_rag_system, corpus):
+    rag = make_rag_system(query_cache_size=0, result_cache_size=0)
+    rag.build_vector_store(corpus)
+    rag.model.encoded.clear()
+
+    rag.search_batch(['employee contract', 'financial services permission', 'registered office'], k=3)
+
+    assert len(rag.model.encoded) == 1
+    assert len(rag.model.encoded[0]) == 3
+
+
+def test_k_beyond_the_corpus_returns_every_chunk_once(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+
+    results, = rag.search_batch(['regulations'], k=50)
+
+    assert len(results) == len(rag.chunks)
+    assert len({result['text'] for result in results}) == len(results)
+
+
+def test_empty_and_unloaded_searches(make_rag_system, corpus):
+    rag = make_rag_system()
+
+    assert rag.search_batch(['anything', 'else']) == [[], []]
+    rag.build_vector_store(corpus)
+    assert rag.search_batch([]) == []
+
+
+def test_unknown_search_mode_is_rejected(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+
+    with pytest.raises(ValueError):
+        rag.search_batch(['query'], mode='fuzzy')
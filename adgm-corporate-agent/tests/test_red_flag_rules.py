@@ -0,0 +1,158 @@
+import random
+from bisect import bisect_right
+
+import pytest
+
+from modules.document_checker import DocumentChecker
+from modules.document_parser import build_paragraph_index, normalize_paragraph
+from modules.keyword_matcher import KeywordMatcher, ahocorasick
+from modules.red_flag_rules import RULE_FLAG_FIELDS, RedFlagRules, load_red_flag_rules
+
+FRAGMENTS = [
+    'ADGM', 'Abu Dhabi Global Market', 'abu dhabi', 'UAE Federal', 'Dubai Courts', 'DIFC', 'Emirates', 'Sharjah',
+    'federal law', 'signature', 'Signed', 'executed', 'witness', 'share capital', 'Capital', 'registered office',
+    'RESOLVED', 'resolution', 'decided', 'date', '2024', '2025', 'day of', 'company', 'director', 'shareholder',
+    'the', 'and', 'of', 'Articles', 'adg', 'dif', 'sign', 'capita', 'resolve', '20', '\n', '\n\n', '.', ','
+]
+
+DOC_TYPES = ['articles_of_association', 'board_resolution', 'employment_contract', 'unknown']
+
+
+def baseline_red_flags(document):
+    """Red flag detection as it was before the rule file, kept to check parity"""
+    red_flags = []
+    content = document.get('content', '').lower()
+
+    if not content:
+        return [('empty_document', 'high', 'Document appears to be empty or unreadable',
+                 'Please check the document format and content')]
+
+    has_adgm = 'adgm' in content or 'abu dhabi global market' in content
+    has_other_jurisdiction = any(term in content for term in [
+        'uae federal', 'dubai courts', 'dubai international financial centre',
+        'difc', 'emirates', 'sharjah', 'federal law'
+    ])
+    if not has_adgm and has_other_jurisdiction:
+        red_flags.append(('jurisdiction_error', 'high', 'Document references non-ADGM jurisdiction',
+                          'Update jurisdiction clause to specify ADGM Courts and regulations'))
+    elif not has_adgm:
+        red_flags.append(('missing_jurisdiction', 'medium', 'No clear ADGM jurisdiction specified',
+                          'Add explicit reference to ADGM jurisdiction and governing law'))
+
+    if not any(term in content for term in ['signature', 'signed', 'executed', 'witness']):
+        red_flags.append(('missing_signature', 'medium', 'No signature section found',
+                          'Add proper signatory section with witness requirements'))
+
+    doc_type = document.get('document_type', 'unknown')
+    if doc_type == 'articles_of_association':
+        if 'share capital' not in content and 'capital' not in content:
+            red_flags.append(('missing_clause', 'high', 'Share capital clause appears to be missing',
+                              'Include detailed share capital structure and nominal value'))
+        if 'registered office' not in content:
+            red_flags.append(('missing_clause', 'high', 'Registered office clause appears to be missing',
+                              'Include registered office address within ADGM'))
+    elif doc_type == 'board_resolution':
+        if not any(term in content for term in ['resolved', 'resolution', 'decided']):
+            red_flags.append(('missing_clause', 'medium', 'Resolution language appears to be missing',
+                              'Include proper resolution language (e.g., "IT WAS RESOLVED THAT...")'))
+
+    if not any(term in content for term in ['date', '202', '2025', 'day of']):
+        red_flags.append(('missing_date', 'low', 'No date found in document',
+                          'Include execution date for legal validity'))
+
+    return red_flags
+
+
+def random_documents(seed, count):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.choices(FRAGMENTS, k=rng.randint(0, 12))
+        yield {'content': ' '.join(words), 'document_type': rng.choice(DOC_TYPES)}
+
+
+@pytest.fixture(params=['regex', 'automaton'])
+def checker(request):
+    if request.param == 'automaton' and ahocorasick is None:
+        pytest.skip('pyahocorasick is not installed')
+    checker = DocumentChecker()
+    rules = checker.red_flag_rules
+    rules._matcher = KeywordMatcher(rules._term_bits, backend=request.param)
+    return checker
+
+
+def test_rules_match_the_original_checks_on_random_documents(checker):
+    for document in random_documents(seed=0, count=20000):
+        flags = checker.detect_red_flags(document)
+
+        assert [tuple(flag[field] for field in RULE_FLAG_FIELDS) for flag in flags] == \
+            baseline_red_flags(document), document
+
+
+def test_evidence_spans_point_at_a_term_of_the_rule(checker):
+    terms = load_red_flag_rules()['term_groups']['other_jurisdiction']
+
+    for document in random_documents(seed=1, count=2000):
+        content = document['content'].lower()
+        for flag in checker.detect_red_flags(document):
+            if flag['type'] == 'jurisdiction_error':
+                start, end = flag['span']
+                assert content[start:end] in terms
+
+
+def test_evidence_is_the_earliest_match_when_terms_contain_each_other(checker):
+    rules = RedFlagRules({
+        'term_groups': {'court': ['international court of appeal', 'court'], 'appeal': ['appeal']},
+        'rules': [{'id': 'courts', 'present': ['court', 'appeal'], 'type': 'courts', 'severity': 'low',
+                   'message': 'm', 'suggestion': 's'}]
+    })
+    rules._matcher = KeywordMatcher(rules._term_bits, backend=checker.red_flag_rules._matcher.backend)
+    content = 'first paragraph\nheard by the international court of appeal'
+
+    flag, = rules.evaluate(content, paragraph_offsets=[0, 16])
+
+    assert content[slice(*flag['span'])] == 'international court of appeal'
+    assert flag['paragraph_index'] == 1
+
+
+def lined_document(lines):
+    """Parse-result-like document of text lines, with the parser's paragraph offsets"""
+    content = ' '.join(filter(None, map(normalize_paragraph, lines)))
+    return {'content': content, 'document_type': 'unknown', 'paragraph_offsets': build_paragraph_index(lines)[0]}
+
+
+def test_text_that_grows_when_lowercased_keeps_spans_on_the_evidence(checker):
+    # 'İ'.lower() is two characters, so positions in the lowered text run ahead
+    document = lined_document(['İ' * 200, 'Disputes go to the Dubai Courts.'])
+
+    flag, = [flag for flag in checker.detect_red_flags(document) if flag['type'] == 'jurisdiction_error']
+
+    start, end = flag['span']
+    assert document['content'][start:end] == 'Dubai Courts'
+    assert flag['paragraph_index'] == 1
+
+
+def test_spans_and_paragraphs_index_the_original_content(checker):
+    terms = load_red_flag_rules()['term_groups']['other_jurisdiction']
+    fragments = [fragment for fragment in FRAGMENTS if not fragment.isspace()] + ['İ', 'İİİİ', 'İstanbul', 'ẞ']
+    rng = random.Random(2)
+
+    for _ in range(2000):
+        lines = [' '.join(rng.choices(fragments, k=rng.randint(0, 6))) for _ in range(rng.randint(1, 6))]
+        document = lined_document(lines)
+        content, offsets = document['content'], document['paragraph_offsets']
+
+        for flag in checker.detect_red_flags(document):
+            start, end = flag['span']
+            assert 0 <= start <= end <= len(content)
+            assert flag['paragraph_index'] == max(bisect_right(offsets, start) - 1, 0)
+            if flag['type'] == 'jurisdiction_error':
+                assert content[start:end].lower() in terms
+
+
+def test_rules_referring_to_unknown_groups_are_rejected():
+    rule = {'id': 'broken', 'present': ['nowhere'], 'type': 't', 'severity': 'low', 'message': 'm', 'suggestion': 's'}
+
+    with pytest.raises(ValueError):
+        RedFlagRules({'term_groups': {}, 'rules': [rule]})
+    with pytest.raises(ValueError):
+        RedFlagRules({'term_groups': {}, 'rules': [{'id': 'incomplete'}]})
@@ -0,0 +1,83 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from modules.resources import ResourceManager
+
+
+@pytest.fixture
+def model_loads(monkeypatch):
+    """Replace sentence_transformers with a slow stand-in that records each load"""
+    loads = []
+
+    class SentenceTransformer:
+        def __init__(self, name):
+            time.sleep(0.05)
+            loads.append(name)
+            self.name = name
+
+    monkeypatch.setitem(sys.modules, 'sentence_transformers',
+                        types.SimpleNamespace(SentenceTransformer=SentenceTransformer))
+    return loads
+
+
+def test_model_is_loaded_once_per_process(model_loads):
+    manager = ResourceManager()
+
+    assert manager.get_embedding_model('model-a') is manager.get_embedding_model('model-a')
+    assert model_loads == ['model-a']
+    assert 'model:model-a' in manager.load_times
+
+
+def test_concurrent_first_requests_share_one_load(model_loads):
+    manager = ResourceManager()
+    models = []
+
+    threads = [threading.Thread(target=lambda: models.append(manager.get_embedding_model('model-a')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model_loads == ['model-a']
+    assert len({id(model) for model in models}) == 1
+
+
+def test_each_model_name_is_loaded_separately(model_loads):
+    manager = ResourceManager()
+
+    manager.get_embedding_model('model-a')
+    manager.get_embedding_model('model-b')
+
+    assert model_loads == ['model-a', 'model-b']
+    assert manager.stats()['models_loaded'] == ['model-a', 'model-b']
+    assert manager.stats()['rag_system_loaded'] is False
+
+
+def test_repeated_warm_ups_load_the_rag_system_once(model_loads, monkeypatch):
+    systems = []
+
+    class ADGMRagSystem:
+        def __init__(self, model):
+            time.sleep(0.05)
+            systems.append(model)
+
+        def cache_stats(self):
+            return {}
+
+    monkeypatch.setitem(sys.modules, 'modules.rag_system', types.SimpleNamespace(ADGMRagSystem=ADGMRagSystem))
+    manager = ResourceManager()
+
+    threads = {manager.warm_up() for _ in range(5)}
+    for thread in threads:
+        thread.join()
+
+    assert len(threads) == 1
+    assert len(systems) == 1 and model_loads == [systems[0].name]
+    assert manager.warm_up() is None
+    assert manager.stats()['rag_system_loaded'] is True
+    assert set(manager.stats()['load_times']) == {f'model:{systems[0].name}', 'rag_index'}
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+from docx import Document
+
+from modules.comment_inserter import CommentInserter
+from modules.review_pipeline import review_documents, review_uploads, reviewed_filenames
+
+
+def document_text(data):
+    return '\n'.join(paragraph.text for paragraph in Document(io.BytesIO(data)).paragraphs)
+
+
+def test_reviewed_names_are_unique_and_keep_their_order():
+    names = reviewed_filenames(['a.docx', 'b.pdf', 'a.docx', 'A.docx', 'a (2).docx', 'a.docx'])
+
+    assert names == ['reviewed_a.docx', 'reviewed_b_report.docx', 'reviewed_a (2).docx', 'reviewed_A.docx',
+                     'reviewed_a (2) (2).docx', 'reviewed_a (3).docx']
+
+
+def test_uploads_sharing_a_name_are_reviewed_separately(make_docx):
+    first = make_docx(['Employment contract', 'Disputes go to the Dubai Courts.'])
+    second = make_docx(['Employment contract', 'Governed by the laws of Sharjah.'])
+
+    result = review_uploads([('contract.docx', first), ('uploads/contract.docx', second)])
+
+    reviewed = result['reviewed_documents']
+    assert list(reviewed) == ['reviewed_contract.docx', 'reviewed_contract (2).docx']
+    assert 'Dubai Courts' in document_text(reviewed['reviewed_contract.docx'])
+    assert 'Sharjah' in document_text(reviewed['reviewed_contract (2).docx'])
+    assert len(result['report']['document_details']) == 2
+
+
+def test_bytes_sources_need_filenames(make_docx):
+    with pytest.raises(ValueError):
+        review_documents([make_docx(['Articles'])])
+
+
+def test_streams_need_a_filename(make_docx, tmp_path):
+    inserter = CommentInserter()
+    flags = [{'severity': 'high', 'message': 'Check this', 'span': [0, 8], 'paragraph_index': 0}]
+    data = make_docx(['Articles of Association'])
+    path = tmp_path / 'aoa.docx'
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        inserter.add_comments_to_document(io.BytesIO(data), flags, io.BytesIO())
+    assert inserter.add_comments_to_document(io.BytesIO(data), flags, io.BytesIO(), 'aoa.docx') is not None
+    assert inserter.add_comments_to_document(str(path), flags, str(tmp_path / 'out.docx')) is not None
@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import io
+import os
+import zipfile
+
+import pytest
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+from service import create_app
+
+BOUNDARY = 'test-boundary'
+
+
+def serve(scenario, **options):
+    """Run scenario(client) against a fresh service with one worker"""
+    async def run():
+        async with TestClient(TestServer(create_app(workers=1, **options))) as client:
+            return await scenario(client)
+    return asyncio.run(run())
+
+
+def upload(paths, process=None):
+    form = FormData()
+    if process:
+        form.add_field('process', process)
+    for path in paths:
+        with open(path, 'rb') as f:
+            form.add_field('files', f.read(), filename=os.path.basename(path))
+    return form
+
+
+def test_upload_returns_the_report_and_reviewed_documents(sample_paths):
+    async def scenario(client):
+        response = await client.post('/analyze', data=upload(sample_paths[:2], 'company_incorporation'))
+        report_only = await client.post('/analyze?documents=0', data=upload(sample_paths[:2]))
+        return response.status, await response.json(), report_only.status, await report_only.json()
+
+    status, body, report_only_status, report_only = serve(scenario)
+
+    assert status == 200
+    assert body['report']['analysis_summary']['process'] == 'company_incorporation'
+    assert len(body['report']['document_details']) == 2
+    for document in body['reviewed_documents']:
+        assert zipfile.is_zipfile(io.BytesIO(base64.b64decode(document['content_base64'])))
+    assert report_only_status == 200 and 'reviewed_documents' not in report_only
+
+
+def form(**fields):
+    """Multipart form; a (filename, bytes) value becomes a file part"""
+    data = FormData()
+    for name, value in fields.items():
+        if isinstance(value, tuple):
+            data.add_field(name, value[1], filename=value[0])
+        else:
+            data.add_field(name, value)
+    return data
+
+
+@pytest.mark.parametrize('make_data', [
+    lambda: b'not multipart',
+    lambda: form(process='licensing'),
+    lambda: form(files=('notes.txt', b'plain text')),
+])
+def test_invalid_uploads_are_rejected_with_400(make_data):
+    async def scenario(client):
+        response = await client.post('/analyze', data=make_data())
+        return response.status, await response.json()
+
+    status, body = serve(scenario)
+
+    assert status == 400 and body['error']
+
+
+@pytest.mark.parametrize('fields', [
+    {'files': ('large.docx', b'x' * 40000)},
+    {'process': 'x' * 40000, 'files': ('small.docx', b'small')},
+])
+def test_oversized_uploads_are_rejected_with_413(fields):
+    async def scenario(client):
+        response = await client.post('/analyze', data=form(**fields))
+        health = await (await client.get('/health')).json()
+        return response.status, health
+
+    status, health = serve(scenario, max_upload_mb=32 / 1024)
+
+    assert status == 413
+    assert health['running'] == 0 and health['queued'] == 0
+
+
+def test_requests_beyond_the_queue_are_rejected_with_429(sample_paths):
+    with open(sample_paths[0], 'rb') as f:
+        document = f.read()
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"aoa.docx\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n").encode('ascii')
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode('ascii')
+
+    async def scenario(client):
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield head + document[:100]
+            await release.wait()
+            yield document[100:] + tail
+
+        # Admitted and still uploading, so it holds the only slot
+        first = asyncio.ensure_future(client.post(
+            '/analyze', data=slow_body(), headers={'Content-Type': f"multipart/form-data; boundary={BOUNDARY}"}))
+        while (await (await client.get('/health')).json())['running'] == 0:
+            await asyncio.sleep(0.01)
+
+        rejected = await client.post('/analyze', data=upload(sample_paths[:1]))
+        busy = await (await client.get('/health')).json()
+        release.set()
+        accepted = await first
+        health = await (await client.get('/health')).json()
+        return rejected, busy, accepted.status, health
+
+    rejected, busy, accepted_status, health = serve(scenario, max_queue=0)
+
+    assert rejected.status == 429
+    assert rejected.headers['Retry-After'] == '1'
+    assert busy['status'] == 'busy'
+    assert accepted_status == 200
+    assert health == {'status': 'ok', 'running': 0, 'queued': 0, 'capacity': 1, 'completed': 1, 'rejected': 1}
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from modules import batch_analyzer, review_pipeline
+from modules.batch_analyzer import BatchAnalyzer
+from modules.document_checker import CHECKLISTS_PATH, load_checklists
+from modules.red_flag_rules import RULES_PATH
+
+CUSTOM_RULES = {
+    'term_groups': {'company': ['company']},
+    'rules': [{
+        'id': 'custom', 'present': ['company'], 'type': 'custom_flag', 'severity': 'low',
+        'message': 'Injected rule', 'suggestion': 'None'
+    }]
+}
+
+
+def test_workers_use_the_templates_passed_in(sample_paths):
+    checklists = {'custom_process': {'name': 'Custom', 'required_documents': []}}
+
+    with BatchAnalyzer(workers=2, checklists=checklists, rules=CUSTOM_RULES) as analyzer:
+        results = dict(analyzer.analyze(sample_paths))
+
+    flag_types = {flag['type'] for result in results.values() for flag in result['red_flags']}
+    assert flag_types == {'custom_flag'}
+
+
+def test_workers_do_not_read_the_template_files(sample_paths, monkeypatch, tmp_path):
+    with BatchAnalyzer(workers=2, rules=CUSTOM_RULES) as analyzer:
+        # Templates are gone by the time the pool starts; workers must not need them
+        monkeypatch.chdir(tmp_path)
+        results = dict(analyzer.analyze(sample_paths[:2]))
+
+    assert all('error' not in result for result in results.values())
+    assert not os.path.exists(CHECKLISTS_PATH) and not os.path.exists(RULES_PATH)
+
+
+def test_pipeline_worker_shares_one_checker(monkeypatch):
+    # Restore the process-wide components afterwards
+    for module, names in ((batch_analyzer, ('_parser', '_checker', '_cache_options')),
+                          (review_pipeline, ('_checker', '_comment_inserter', '_report_generator'))):
+        for name in names:
+            monkeypatch.setattr(module, name, getattr(module, name))
+
+    review_pipeline.init_worker(None, load_checklists(), CUSTOM_RULES)
+
+    assert review_pipeline._checker is batch_analyzer._checker
+    assert [rule['rule']['id'] for rule in review_pipeline._checker.red_flag_rules.rules] == ['custom']
+
+
+def test_app_builds_components_once_per_template_version():
+    pytest.importorskip('streamlit')
+    import app
+
+    first = app.load_components(1.0, 1.0)
+
+    assert app.load_components(1.0, 1.0) is first
+    assert app.load_components(2.0, 1.0) is not first
@@ -0,0 +1,133 @@
+import faiss
+import numpy as np
+import pytest
+
+from modules.vector_index import (INDEX_FILENAME, apply_search_params, build_index, build_index_from_batches,
+                                  create_index, load_index, remove_vectors, resolve_index_config, save_index)
+
+DIMENSION = 32
+
+
+def clustered(n, n_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, DIMENSION)) * 4
+    labels = rng.integers(0, n_clusters, size=n)
+    return (centers[labels] + rng.normal(size=(n, DIMENSION))).astype('float32')
+
+
+def recall_at_k(index, vectors, queries, k=10):
+    exact = faiss.IndexFlatL2(DIMENSION)
+    exact.add(vectors)
+    _, expected = exact.search(queries, k)
+    _, found = index.search(queries, k)
+    return np.mean([len(set(e) & set(f)) / k for e, f in zip(expected, found)])
+
+
+@pytest.mark.parametrize('index_type, config, min_recall', [
+    ('flat', {}, 1.0),
+    ('ivf_flat', {'nprobe': 8}, 0.8),
+    ('ivf_pq', {'nprobe': 8, 'pq_m': 8}, 0.3),
+    ('hnsw', {'ef_search': 64}, 0.9),
+])
+def test_index_types_build_and_search(index_type, config, min_recall):
+    vectors = clustered(4000)
+    queries = clustered(50, seed=1)
+
+    index, effective = build_index(vectors, dict(config, type=index_type))
+
+    assert effective['type'] == index_type
+    assert index.ntotal == len(vectors)
+    assert recall_at_k(index, vectors, queries) >= min_recall
+
+
+def test_probing_every_ivf_cell_is_exact():
+    vectors = clustered(4000)
+    index, config = build_index(vectors, {'type': 'ivf_flat'})
+
+    config['nprobe'] = config['nlist']
+    apply_search_params(index, config)
+
+    assert recall_at_k(index, vectors, clustered(50, seed=1)) == 1.0
+
+
+def test_small_corpus_falls_back_to_flat():
+    index, config = build_index(clustered(100), {'type': 'ivf_pq'})
+
+    assert config['type'] == 'flat'
+    assert config['requested_type'] == 'ivf_pq'
+    assert isinstance(index, faiss.IndexFlatL2)
+
+
+def test_invalid_configurations_are_rejected():
+    with pytest.raises(ValueError):
+        resolve_index_config({'type': 'lsh'})
+    with pytest.raises(ValueError):
+        create_index(DIMENSION, 10000, {'type': 'ivf_pq', 'pq_m': 5})
+
+
+@pytest.mark.parametrize('index_type', ['flat', 'ivf_flat', 'hnsw'])
+def test_ids_can_be_removed(index_type):
+    vectors = clustered(2000)
+    ids = np.arange(1000, 3000)
+    index, config = build_index(vectors, {'type': index_type}, ids=ids)
+
+    index = remove_vectors(index, ids[:500], config)
+
+    assert index.ntotal == 1500
+    _, found = index.search(vectors[:5], 1)
+    assert not np.isin(found, ids[:500]).any()
+
+
+def test_search_params_survive_save_and_load(tmp_path):
+    index, config = build_index(clustered(4000), {'type': 'ivf_flat', 'nprobe': 3})
+
+    save_index(index, config, str(tmp_path))
+    loaded, loaded_config = load_index(str(tmp_path))
+
+    assert loaded_config == config
+    assert faiss.extract_index_ivf(loaded).nprobe == 3
+
+
+def test_stores_without_parameters_load_as_flat(tmp_path):
+    faiss.write_index(faiss.IndexFlatL2(DIMENSION), str(tmp_path / INDEX_FILENAME))
+
+    _, config = load_index(str(tmp_path))
+
+    assert config['type'] == 'flat'
+
+
+def batched(vectors, ids, size):
+    for start in range(0, len(vectors), size):
+        yield ids[start:start + size], vectors[start:start + size]
+
+
+@pytest.mark.parametrize('index_type', ['ivf_flat', 'ivf_pq'])
+def test_streamed_build_trains_like_the_eager_build(index_type):
+    # Sorted by cluster, so a prefix sample would see only the first few clusters
+    vectors = clustered(4000)
+    vectors = vectors[np.argsort(vectors[:, 0])]
+    ids = np.arange(4000)
+    config = {'type': index_type, 'train_sample': 1000, 'pq_m': 8}
+
+    eager, _ = build_index(vectors, config, ids=ids)
+    streamed, _ = build_index_from_batches(batched(vectors, ids, 300), len(vectors), config)
+
+    queries = clustered(50, seed=1)
+    assert streamed.ntotal == eager.ntotal
+    assert np.array_equal(streamed.search(queries, 10)[1], eager.search(queries, 10)[1])
+
+
+def test_streamed_build_handles_fewer_vectors_than_announced():
+    vectors = clustered(2000)
+    ids = np.arange(2000)
+
+    index, config = build_index_from_batches(batched(vectors, ids, 256), 2500, {'type': 'ivf_flat'})
+
+    assert config['type'] == 'ivf_flat'
+    assert index.ntotal == 2000
+    assert recall_at_k(index, vectors, clustered(50, seed=1)) >= 0.8
+
+
+def test_streamed_build_of_nothing_is_rejected():
+    with pytest.raises(ValueError):
+        build_index_from_batches(iter([]), 0, {'type': 'flat'})
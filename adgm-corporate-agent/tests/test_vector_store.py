@@ -0,0 +1,153 @@
+import hashlib
+import os
+
+import faiss
+import pytest
+
+from modules.vector_store import CURRENT_FILENAME, GenerationStore
+
+
+def directory_digest(path):
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(path, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def write_generation(store, content):
+    generation, path = store.begin()
+    with open(os.path.join(path, 'data.txt'), 'w') as f:
+        f.write(content)
+    return store.commit(generation, path)
+
+
+def test_empty_store_has_no_generation(tmp_path):
+    store = GenerationStore(str(tmp_path))
+
+    assert store.current_generation() == 0
+    assert store.current_dir() is None
+
+
+def test_commit_publishes_and_keeps_a_retention_window(tmp_path):
+    store = GenerationStore(str(tmp_path), keep_generations=2)
+
+    for content in ('one', 'two', 'three'):
+        current = write_generation(store, content)
+
+    assert store.current_generation() == 3
+    assert store.current_dir() == current
+    assert sorted(name for name in os.listdir(tmp_path) if name != CURRENT_FILENAME) == ['gen-000002', 'gen-000003']
+
+
+def test_aborted_generation_leaves_current_untouched(tmp_path):
+    store = GenerationStore(str(tmp_path))
+    current = write_generation(store, 'one')
+
+    generation, path = store.begin()
+    store.abort(path)
+
+    assert store.current_dir() == current
+    assert not os.path.exists(path)
+
+
+def test_incremental_update_embeds_only_changed_documents(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+    rag.model.encoded.clear()
+
+    corpus[1]['content'] += ' Judgments are published online.'
+    rag.build_vector_store(corpus)
+
+    embedded = [text for call in rag.model.encoded for text in call]
+    assert embedded and all('Court' in text or 'Judgments' in text for text in embedded)
+    assert rag.generations.current_generation() == 2
+    results = rag.search('judgments published online', k=1)
+    assert results[0]['metadata']['url'] == 'https://example.test/courts'
+
+
+def test_missing_documents_are_pruned_only_on_request(make_rag_system, corpus):
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+    total = len(rag.chunks)
+
+    rag.build_vector_store(corpus[1:])
+    assert len(rag.chunks) == total
+
+    rag.build_vector_store(corpus[1:], prune_missing=True)
+    assert len(rag.chunks) < total
+    assert all(rag.chunks.metadata(chunk_id)['url'] != corpus[0]['url'] for chunk_id, _, _ in rag.chunks)
+
+
+def test_failed_update_keeps_the_previous_generation(make_rag_system, corpus, monkeypatch):
+    from modules import rag_system
+
+    rag = make_rag_system()
+    rag.build_vector_store(corpus)
+    before = rag.search_batch(['register of members', 'annual leave'], k=2)
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(rag_system, 'write_chunk_store', fail)
+    corpus[0]['content'] += ' Amended.'
+    with pytest.raises(OSError):
+        rag.build_vector_store(corpus)
+
+    assert rag.generations.current_generation() == 1
+    assert rag.search_batch(['register of members', 'annual leave'], k=2) == before
+    assert make_rag_system().search_batch(['register of members', 'annual leave'], k=2) == before
+
+
+def test_tuning_search_params_leaves_committed_generations_alone(make_rag_system, corpus):
+    rag = make_rag_system(index_config={'type': 'hnsw', 'ef_search': 16})
+    rag.build_vector_store(corpus)
+    generation_dir = rag.generations.current_dir()
+    before = directory_digest(generation_dir)
+
+    rag.set_search_params(ef_search=128)
+
+    assert directory_digest(generation_dir) == before
+    reloaded = make_rag_system(index_config={'type': 'hnsw', 'ef_search': 16})
+    assert reloaded.index_config['ef_search'] == 128
+    assert faiss.downcast_index(reloaded.index.index).hnsw.efSearch == 128
+
+
+def test_changed_index_parameters_rebuild_from_the_stored_chunks(make_rag_system, corpus):
+    make_rag_system(index_config={'type': 'hnsw', 'hnsw_m': 16}).build_vector_store(corpus)
+
+    rag = make_rag_system(index_config={'type': 'hnsw', 'hnsw_m': 8})
+    total = len(rag.chunks)
+    rag.model.encoded.clear()
+    rag.build_vector_store(corpus[:1])
+
+    assert rag.generations.current_generation() == 2
+    assert rag.index_config['hnsw_m'] == 8 and rag.index.ntotal == len(rag.chunks) == total
+    # Documents missing from the batch stay searchable
+    assert rag.search('annual leave', k=1)[0]['metadata']['url'] == 'https://example.test/employment'
+
+
+def test_search_knobs_alone_do_not_rebuild(make_rag_system, corpus):
+    make_rag_system(index_config={'type': 'hnsw', 'ef_search': 16}).build_vector_store(corpus)
+
+    rag = make_rag_system(index_config={'type': 'hnsw', 'ef_search': 32})
+    rag.build_vector_store(corpus)
+
+    assert rag.generations.current_generation() == 1
+
+
+def test_flat_fallback_is_replaced_once_the_corpus_can_train(make_rag_system, corpus):
+    rag = make_rag_system(index_config={'type': 'ivf_flat'})
+    rag.build_vector_store(corpus)
+    assert rag.index_config['type'] == 'flat'
+
+    words = ['company', 'court', 'employee', 'licence', 'register', 'appeal', 'data', 'office']
+    extra = [{'url': f'https://example.test/notice-{i}', 'source': 'test',
+              'content': f'Notice {i}. ' + ' '.join(words[(i + j) % len(words)] for j in range(12))}
+             for i in range(60)]
+    rag.build_vector_store(corpus + extra)
+
+    assert rag.index_config['type'] == 'ivf_flat'
+    assert rag.index.ntotal == len(rag.chunks)
+    assert rag.search('annual leave', k=1)[0]['metadata']['url'] == 'https://example.test/employment'